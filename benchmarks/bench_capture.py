@@ -0,0 +1,113 @@
+"""
+Capture latency: age of the frame a slow consumer gets, read directly vs
+through FrameGrabber.
+
+A simulated camera produces frames at --fps into a driver queue of
+--queue frames (oldest dropped when full, like V4L2's default buffers).
+The consumer takes --work ms per frame. Reading the camera directly, it
+gets the oldest queued frame, so frames age by up to the queue length;
+the grab thread drains the queue and hands out the newest one.
+
+Run from the repo root:
+    python -m benchmarks.bench_capture [--fps 30] [--queue 4] [--work 50]
+"""
+import argparse
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from src.camera.capture import FrameGrabber
+
+
+class QueuedCamera:
+    """Frame source filling a bounded driver queue at a fixed rate; frames carry their time."""
+
+    mirrored = False
+
+    def __init__(self, fps, queue, shape=(720, 1280, 3)):
+        self.fps = fps
+        self.shape = shape
+        self.queue = deque(maxlen=queue)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self.times = {}  # id of the last array returned -> its capture time
+
+    def _produce(self):
+        next_time = time.perf_counter()
+        while not self._stop.is_set():
+            next_time += 1.0 / self.fps
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+            with self._cond:
+                self.queue.append(time.perf_counter())
+                self._cond.notify()
+
+    def open(self):
+        threading.Thread(target=self._produce, daemon=True).start()
+        return True
+
+    def read(self, image=None):
+        with self._cond:
+            self._cond.wait_for(lambda: self.queue or self._stop.is_set())
+            if not self.queue:
+                return False, None
+            t = self.queue.popleft()
+        if image is None or image.shape != self.shape:
+            image = np.zeros(self.shape, dtype=np.uint8)
+        image[0, 0, 0] = 1
+        self.times[id(image)] = t
+        return True, image
+
+    def release(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def describe(self):
+        return {"source": "simulated camera", "fps": self.fps}
+
+
+def consume(take, camera, work_s, seconds):
+    """Median / max ms between capture and the consumer getting each frame."""
+    ages = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        frame = take()
+        if frame is None:
+            continue
+        ages.append((time.perf_counter() - camera.times[id(frame)]) * 1000)
+        time.sleep(work_s)
+    return float(np.median(ages)), float(np.max(ages)), len(ages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark capture frame age")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--queue", type=int, default=4, help="driver queue length")
+    parser.add_argument("--work", type=float, default=50, help="consumer ms per frame")
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+    work_s = args.work / 1000
+
+    camera = QueuedCamera(args.fps, args.queue)
+    camera.open()
+    direct = consume(lambda: camera.read()[1], camera, work_s, args.seconds)
+    camera.release()
+
+    camera = QueuedCamera(args.fps, args.queue)
+    grabber = FrameGrabber(camera)
+    grabber.start()
+    grabbed = consume(lambda: (grabber.take(timeout=0.5) or (None,))[0], camera, work_s, args.seconds)
+    grabber.stop()
+    grabber.join()
+
+    print(f"{args.fps:g} fps camera, {args.queue}-frame driver queue, {args.work:g} ms consumer")
+    print(f"{'':>8} {'p50 age ms':>11} {'max age ms':>11} {'frames':>7}")
+    for name, (p50, peak, n) in (("direct", direct), ("grabber", grabbed)):
+        print(f"{name:>8} {p50:>11.1f} {peak:>11.1f} {n:>7}")
+    print(f"grabber: {grabber.fps():.1f} fps measured, {grabber.drops} frames dropped")
+
+
+if __name__ == "__main__":
+    main()
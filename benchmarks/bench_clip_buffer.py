@@ -0,0 +1,72 @@
+"""
+Instant-replay buffer: memory use, JPEG cost on the render path, clip encode throughput.
+
+Feeds filtered fixture frames into a ClipBuffer at --fps for --seconds
+(real time, like the render thread), then saves the buffer as MP4 and GIF
+in the background encoder process and reports its throughput.
+
+Run from the repo root:
+    python -m benchmarks.bench_clip_buffer [--res 1080p] [--seconds 12]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import fixture_frames, load_fixture, results_at
+from benchmarks.suite import RESOLUTIONS
+from src.filters.manager import apply_filters
+from src.recording.clip_buffer import CLIP_SECONDS, ClipBuffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the instant-replay clip buffer")
+    parser.add_argument("--fixture", help="landmark fixture .npz or session directory")
+    parser.add_argument("--res", default="1080p", choices=list(RESOLUTIONS))
+    parser.add_argument("--level", type=int, default=4)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--seconds", type=float, default=CLIP_SECONDS + 2)
+    parser.add_argument("--clip-seconds", type=float, default=CLIP_SECONDS)
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.fixture)
+    camera_frames = fixture_frames(fixture, RESOLUTIONS[args.res])
+    frames = [apply_filters(frame.copy(), results_at(fixture, i), args.level)
+              for i, frame in enumerate(camera_frames)]
+
+    clips = ClipBuffer(args.clip_seconds)
+    latencies = []
+    period = 1.0 / args.fps
+    next_t = time.perf_counter()
+    for i in range(int(args.seconds * args.fps)):
+        t0 = time.perf_counter()
+        clips.submit(frames[i % len(frames)])
+        latencies.append((time.perf_counter() - t0) * 1000)
+        next_t += period
+        time.sleep(max(0.0, next_t - time.perf_counter()))
+    time.sleep(0.2)  # last encodes
+
+    stats = clips.stats()
+    latencies = np.array(latencies)
+    print(f"buffer: {stats['frames']} frames, {stats['seconds']:.1f} s, "
+          f"{stats['memory_bytes'] / 2**20:.1f} MiB ({stats['jpeg_kib_mean']:.1f} KiB/frame)")
+    print(f"jpeg: {stats['jpeg_ms_mean']:.2f} ms/frame on the encoder thread, {stats['jpeg_drops']} dropped")
+    print(f"submit() ms on the render thread: p50 {np.percentile(latencies, 50):.3f}"
+          f"  p99 {np.percentile(latencies, 99):.3f}  max {latencies.max():.3f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ("mp4", "gif"):
+            t0 = time.perf_counter()
+            future = clips.save(os.path.join(tmp, f"clip.{ext}"))
+            submit_ms = (time.perf_counter() - t0) * 1000
+            result = future.result()
+            size = os.path.getsize(result["path"]) / 2**20
+            print(f"{ext}: save() returned in {submit_ms:.1f} ms; encoded {result['frames']} frames "
+                  f"in {result['encode_s']:.2f} s ({result['encode_fps']:.0f} fps), {size:.1f} MiB")
+        clips.close()
+
+
+if __name__ == "__main__":
+    main()
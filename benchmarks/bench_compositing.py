@@ -0,0 +1,66 @@
+"""
+Per-sticker compositing cost vs. frame size and sticker size.
+
+Compares the old full-frame float blend with the ROI-bounded premultiplied
+path in src.filters.compositing. The ROI path should scale with sticker
+area and stay flat across frame sizes.
+
+Run from the repo root:
+    python -m benchmarks.bench_compositing
+"""
+import time
+
+import cv2
+import numpy as np
+
+from src.filters.compositing import premultiply, overlay_affine
+
+FRAME_SIZES = {"480p": (480, 640), "720p": (720, 1280), "1080p": (1080, 1920)}
+STICKER_SIZES = [64, 128, 256, 512]
+REPEATS = 30
+
+
+def legacy_overlay(image, sticker_bgra, M):
+    """The pre-ROI implementation: full-frame warp + float64 per-channel blend."""
+    h, w, _ = image.shape
+    warped = cv2.warpAffine(sticker_bgra, M, (w, h),
+                            flags=cv2.INTER_LINEAR,
+                            borderMode=cv2.BORDER_CONSTANT,
+                            borderValue=[0, 0, 0])
+    alpha_mask = warped[:, :, 3] / 255.0
+    for c in range(3):
+        image[:, :, c] = (1 - alpha_mask) * image[:, :, c] + alpha_mask * warped[:, :, c]
+    return image
+
+
+def time_ms(fn, *args):
+    samples = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1000
+
+
+def main():
+    sticker = cv2.imread("assets/stickers/pig_nose.png", cv2.IMREAD_UNCHANGED)
+    sticker_pm = premultiply(sticker)
+    sh, sw = sticker.shape[:2]
+
+    print(f"{'frame':>6} {'sticker':>8} {'legacy ms':>10} {'roi ms':>8} {'speedup':>8}")
+    for name, (h, w) in FRAME_SIZES.items():
+        frame = np.random.default_rng(0).integers(0, 255, (h, w, 3), dtype=np.uint8)
+        for size in STICKER_SIZES:
+            # Scale the sticker to `size` px wide, slightly rotated, centred in frame
+            s = size / sw
+            M = cv2.getRotationMatrix2D((sw / 2, sh / 2), 15, s)
+            M[0, 2] += w / 2 - sw / 2
+            M[1, 2] += h / 2 - sh / 2
+
+            legacy = time_ms(legacy_overlay, frame.copy(), sticker, M)
+            roi = time_ms(overlay_affine, frame.copy(), sticker_pm, M)
+            print(f"{name:>6} {size:>8} {legacy:>10.3f} {roi:>8.3f} {legacy / roi:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Temporal layer cache: frame time and hit rate for a person holding still.
+
+Renders the first fixture frame's landmarks again and again with Gaussian
+jitter of a given size (in pixels, like tracker noise on a still face),
+with LAYER_CACHE off and on, and reports median frame time, hit rate and
+the largest pixel difference between the cached and uncached renders.
+For scale, "jitter |diff|" is the largest difference between consecutive
+uncached renders: what the jitter itself already does to hard sticker
+edges. The last row uses the moving fixture (every frame a miss: the
+overhead).
+
+Run from the repo root:
+    python -m benchmarks.bench_layer_cache [--res 1080p] [--tolerance 0.5]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import fixture_frames, load_fixture, results_at
+from benchmarks.suite import RESOLUTIONS
+from src.filters.layer_cache import DEFAULT_TOLERANCE, LAYER_CACHE
+from src.filters.manager import apply_filters
+from src.vision.landmarks import LandmarkFrame
+
+LEVELS = (2, 4)
+JITTER_PX = (0.0, 0.1, 0.3, 1.0)
+
+
+def jittered(lf, sigma_px, shape, n, seed=0):
+    """n copies of a LandmarkFrame with Gaussian jitter of sigma_px pixels."""
+    rng = np.random.default_rng(seed)
+    h, w = shape[:2]
+    frames = []
+    for _ in range(n):
+        sets = {}
+        for name, arr in lf.arrays().items():
+            moved = arr.copy()
+            moved[:, 0] += rng.normal(0, sigma_px / w, len(arr))
+            moved[:, 1] += rng.normal(0, sigma_px / h, len(arr))
+            sets[name] = moved
+        frames.append(LandmarkFrame(sets))
+    return frames
+
+
+def render(frame, results, level, enabled):
+    """(median ms, hit rate, outputs) for rendering every results entry."""
+    LAYER_CACHE.enabled = enabled
+    LAYER_CACHE.clear()
+    LAYER_CACHE.reset_stats()
+    outputs, samples = [], []
+    for res in results:
+        out = frame.copy()
+        t0 = time.perf_counter()
+        apply_filters(out, res, level)
+        samples.append(time.perf_counter() - t0)
+        outputs.append(out)
+    return float(np.median(samples)) * 1000, LAYER_CACHE.hit_rate(), outputs
+
+
+def max_diff(a_frames, b_frames):
+    return max(int(np.abs(a.astype(np.int16) - b).max()) for a, b in zip(a_frames, b_frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the temporal layer cache")
+    parser.add_argument("--fixture", help="landmark fixture .npz or session directory")
+    parser.add_argument("--res", default="1080p", choices=list(RESOLUTIONS))
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.fixture)
+    shape = RESOLUTIONS[args.res]
+    frame = fixture_frames(fixture, shape, count=1)[0]
+    LAYER_CACHE.tolerance = args.tolerance
+    n_fixture = len(next(v for k, v in fixture.items() if k != "frames"))
+    moving = [results_at(fixture, i % n_fixture) for i in range(args.frames)]
+
+    print(f"tolerance {args.tolerance:g} px, {args.res}")
+    print(f"{'level':>5} {'jitter px':>10} {'off ms':>8} {'on ms':>8} {'hit rate':>9} {'max |diff|':>11} {'jitter |diff|':>14}")
+    for level in LEVELS:
+        cases = [(f"{s:g}", jittered(moving[0], s, frame.shape, args.frames)) for s in JITTER_PX]
+        cases.append(("moving", moving))
+        for label, results in cases:
+            off_ms, _, reference = render(frame, results, level, False)
+            on_ms, hit_rate, cached = render(frame, results, level, True)
+            diff = max_diff(reference, cached)
+            noise = max_diff(reference[:-1], reference[1:])
+            print(f"{level:>5} {label:>10} {off_ms:>8.2f} {on_ms:>8.2f} {hit_rate:>9.0%} {diff:>11} {noise:>14}")
+    LAYER_CACHE.enabled = True
+
+
+if __name__ == "__main__":
+    main()
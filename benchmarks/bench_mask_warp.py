@@ -0,0 +1,51 @@
+"""
+Mask-warp backends ("triangles" vs "remap") on landmark fixtures.
+
+Reports median / p95 per-frame time at each resolution and the mean
+absolute pixel difference between the two backends' output.
+
+Run from the repo root:
+    python -m benchmarks.bench_mask_warp [fixture.npz]
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import load_fixture, results_at, synthetic_frame
+from src.filters.mask_warp import MASK_WARP_BACKENDS, warp_mask_onto_face
+from src.filters.pig_full import pig_mesh
+
+RESOLUTIONS = {"480p": (480, 640), "720p": (720, 1280), "1080p": (1080, 1920)}
+
+
+def main():
+    fixture = load_fixture(sys.argv[1] if len(sys.argv) > 1 else None)
+    n_frames = len(fixture["face"])
+    results = [results_at(fixture, i) for i in range(n_frames)]
+    mesh = pig_mesh()
+
+    print(f"{'res':>6} {'backend':>10} {'median ms':>10} {'p95 ms':>8} {'mean |diff|':>12}")
+    for name, shape in RESOLUTIONS.items():
+        frame = synthetic_frame(shape)
+        outputs = {}
+        for backend in MASK_WARP_BACKENDS:
+            samples = []
+            outputs[backend] = []
+            for r in results:
+                img = frame.copy()
+                t0 = time.perf_counter()
+                warp_mask_onto_face(img, r, mesh, backend)
+                samples.append(time.perf_counter() - t0)
+                outputs[backend].append(img)
+            samples = np.array(samples) * 1000
+            diff = np.mean([
+                np.abs(a.astype(np.int16) - b).mean()
+                for a, b in zip(outputs[backend], outputs[MASK_WARP_BACKENDS[0]])
+            ])
+            print(f"{name:>6} {backend:>10} {np.median(samples):>10.3f} "
+                  f"{np.percentile(samples, 95):>8.3f} {diff:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Multi-person pigification: per-frame cost for 1, 4 and 8 people.
+
+Each fixture frame's person is cloned onto a grid of N people (same size
+each), and every sticker level is rendered with the resulting
+LandmarkBatch. The table shows the median frame time next to the total
+sticker area (sum of layer patch sizes) and N times the one-person time:
+cost should follow the area, not N full-frame passes.
+
+Run from the repo root:
+    python -m benchmarks.bench_multi_person [--res 1080p] [--people 1 4 8]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import fixture_frames, load_fixture, results_at
+from benchmarks.suite import RESOLUTIONS
+from src.filters.manager import LEVEL_PLANS, apply_filters
+from src.vision.landmarks import LandmarkBatch, LandmarkFrame
+
+LEVELS = (2, 4, 5)
+
+
+def crowd(lf, n, scale):
+    """n copies of one person's landmarks, each `scale` times smaller, on a grid."""
+    arrays = lf.arrays()
+    if not arrays:
+        return LandmarkBatch([])
+    center = np.concatenate([arr[:, :2] for arr in arrays.values()]).mean(axis=0)
+    cols = math.ceil(math.sqrt(n))
+    rows = math.ceil(n / cols)
+    people = []
+    for k in range(n):
+        cell = np.array([(k % cols + 0.5) / cols, (k // cols + 0.5) / rows], dtype=np.float32)
+        sets = {}
+        for name, arr in arrays.items():
+            moved = arr.copy()
+            moved[:, :2] = cell + (arr[:, :2] - center) * scale
+            moved[:, 2] *= scale
+            sets[name] = moved
+        people.append(LandmarkFrame(sets))
+    return LandmarkBatch(people)
+
+
+def sticker_area(batch, level, shape):
+    """Total pixels of the ROI layers a level composites for a batch."""
+    batch = batch.sized(shape)
+    area = 0
+    for step in LEVEL_PLANS[level].steps:
+        if step.spec.output == "roi" and step.ready(batch):
+            area += sum(patch.shape[0] * patch.shape[1]
+                        for patch, _, _ in step.spec.fn(batch, shape, **step.params))
+    return area
+
+
+def time_level(frames, batches, level, rounds):
+    """Median ms per frame over `rounds` passes of the fixture."""
+    out = np.empty_like(frames[0])
+    samples = []
+    for _ in range(rounds):
+        for i, batch in enumerate(batches):
+            np.copyto(out, frames[i % len(frames)])
+            t0 = time.perf_counter()
+            apply_filters(out, batch, level)
+            samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-person pigification")
+    parser.add_argument("--fixture", help="landmark fixture .npz or session directory")
+    parser.add_argument("--res", default="1080p", choices=list(RESOLUTIONS))
+    parser.add_argument("--people", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--scale", type=float, default=0.4, help="size of each person vs the fixture")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.fixture)
+    shape = RESOLUTIONS[args.res]
+    frames = fixture_frames(fixture, shape)
+    results = [results_at(fixture, i) for i in range(args.frames)]
+
+    print(f"{'level':>5} {'people':>6} {'ms':>8} {'sticker Mpx':>12} {'ms/Mpx':>8} {'N x 1-person ms':>16}")
+    for level in LEVELS:
+        single_ms = None
+        for n in args.people:
+            batches = [crowd(lf, n, args.scale) for lf in results]
+            ms = time_level(frames, batches, level, args.rounds)
+            area = np.mean([sticker_area(b, level, frames[0].shape) for b in batches]) / 1e6
+            if single_ms is None:
+                single_ms = ms / n
+            per_mpx = f"{ms / area:8.1f}" if area else f"{'-':>8}"
+            print(f"{level:>5} {n:>6} {ms:>8.2f} {area:>12.3f} {per_mpx} {n * single_ms:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+pig_vision_filter: float32 reference path vs uint8 LUT path.
+
+Reports median per-frame time at each resolution and the max absolute
+difference between the two outputs (must stay within FAST_PATH_TOLERANCE).
+
+Run from the repo root:
+    python -m benchmarks.bench_pig_vision
+"""
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import synthetic_frame
+from src.filters.pig_vision import FAST_PATH_TOLERANCE, pig_vision_filter
+
+RESOLUTIONS = {"480p": (480, 640), "720p": (720, 1280), "1080p": (1080, 1920)}
+REPEATS = 30
+PARAMS = {"intensity": 0.8, "blur_ksize": 3}  # level 3 settings
+
+
+def time_ms(fn):
+    samples = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1000
+
+
+def main():
+    print(f"{'res':>6} {'float ms':>9} {'uint8 ms':>9} {'speedup':>8} {'max |diff|':>11}")
+    for name, shape in RESOLUTIONS.items():
+        frame = synthetic_frame(shape)
+        out = np.empty_like(frame)
+
+        reference = pig_vision_filter(frame, precise=True, **PARAMS)
+        fast = pig_vision_filter(frame, dst=out, **PARAMS)
+        diff = int(np.abs(reference.astype(np.int16) - fast).max())
+
+        slow_ms = time_ms(lambda: pig_vision_filter(frame, precise=True, **PARAMS))
+        fast_ms = time_ms(lambda: pig_vision_filter(frame, dst=out, **PARAMS))
+        flag = "" if diff <= FAST_PATH_TOLERANCE else "  OUT OF TOLERANCE"
+        print(f"{name:>6} {slow_ms:>9.3f} {fast_ms:>9.3f} {slow_ms / fast_ms:>7.1f}x {diff:>11}{flag}")
+
+
+if __name__ == "__main__":
+    main()
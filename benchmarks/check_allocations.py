@@ -0,0 +1,90 @@
+"""
+Steady-state allocation check for the per-frame path.
+
+Replays landmark fixtures through the same buffer-reusing path WebcamWorker
+uses (flip into a FrameRing, RGB conversion into the thread workspace,
+apply_filters in place, DisplaySlot scaling) for every pig level, and
+records the peak traced allocation of each frame with tracemalloc after a
+warm-up pass over the whole fixture (workspaces grow to the largest face
+box once, then stay). A frame that allocates more than LIMIT_FRACTION of
+one frame's bytes (at least MIN_LIMIT) counts as a large allocation; the exit status is 1 if
+any level has one.
+
+Run from the repo root:
+    python -m benchmarks.check_allocations [--res 1080p] [--frames 60]
+"""
+import argparse
+import sys
+import tracemalloc
+
+import cv2
+
+from benchmarks.fixtures import fixture_frames, load_fixture, results_at
+from benchmarks.suite import RESOLUTIONS
+from src.camera.pipeline import DisplaySlot
+from src.filters.manager import LEVEL_PLANS, apply_filters
+from src.perf.buffers import FrameRing, scratch
+
+LIMIT_FRACTION = 0.05
+# Floor for small frames: numpy ufuncs use fixed-size internal buffers (~32 KiB)
+MIN_LIMIT = 64 * 1024
+
+
+def frame_path(ring, display, camera_frame, results, level):
+    """One frame of WebcamWorker's capture -> inference input -> render -> display path."""
+    frame = cv2.flip(camera_frame, 1, dst=ring.get("frame", camera_frame.shape))
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=scratch().get("rgb", frame.shape))
+    filtered = apply_filters(frame, results, level)
+    display.publish(display.scaled(filtered))
+    display.take()
+
+
+def check_level(level, camera_frames, results, n_frames):
+    """Peak per-frame allocation (bytes) in steady state for one level."""
+    ring = FrameRing(8)
+    display = DisplaySlot()
+    h, w = camera_frames[0].shape[:2]
+    display.target_size = (w * 2 // 3, h * 2 // 3)  # a window smaller than the frame
+
+    for i in range(len(results)):
+        frame_path(ring, display, camera_frames[i % len(camera_frames)], results[i % len(results)], level)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(n_frames):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            frame_path(ring, display, camera_frames[i % len(camera_frames)],
+                       results[i % len(results)], level)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return max(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the frame path for large per-frame allocations")
+    parser.add_argument("--fixture", help="landmark fixture .npz or session directory")
+    parser.add_argument("--res", default="1080p", choices=list(RESOLUTIONS))
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.fixture)
+    n = len(next(v for k, v in fixture.items() if k != "frames"))
+    results = [results_at(fixture, i) for i in range(n)]
+    camera_frames = fixture_frames(fixture, RESOLUTIONS[args.res])
+    limit = max(camera_frames[0].nbytes * LIMIT_FRACTION, MIN_LIMIT)
+
+    failed = False
+    print(f"{'level':>5} {'peak KiB/frame':>15} {'limit KiB':>10}")
+    for level in sorted(LEVEL_PLANS):
+        peak = check_level(level, camera_frames, results, args.frames)
+        flag = "" if peak <= limit else "  LARGE ALLOCATION"
+        failed |= peak > limit
+        print(f"{level:>5} {peak / 1024:>15.1f} {limit / 1024:>10.1f}{flag}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Output check: the "remap" mask-warp backend against "triangles".
+
+Renders the pig mask with both backends on every fixture frame and compares
+them. The two sample triangle edges differently (the triangles backend pads
+each patch by EDGE_PAD pixels), so 1-2 pixel seams along the mesh edges
+are expected; a hole (a region one backend covers and the other leaves
+transparent, e.g. a folded ear or chin triangle drawn in the wrong order)
+is not. A pixel counts as different when any channel is off by more than
+DIFF_LEVELS; the differing pixels inside the destination mesh that survive
+a 3x3 erosion (wider than a seam) must stay under MAX_HOLE_PIXELS, and all
+differing pixels (including the padding the triangles backend draws past
+the mesh outline) under MAX_SEAM_FRACTION of the mask. The exit status is
+1 if a frame fails.
+
+Run from the repo root (pass a recorded session to check on a real face):
+    python -m benchmarks.check_mask_backends [--fixture session_dir] [--res 720p]
+"""
+import argparse
+import sys
+
+import cv2
+import numpy as np
+
+from benchmarks.fixtures import fixture_frames, load_fixture, results_at
+from benchmarks.suite import RESOLUTIONS
+from src.filters.mask_warp import warp_mask_onto_face
+from src.filters.pig_full import pig_mesh
+from src.vision.landmarks import LandmarkFrame
+
+DIFF_LEVELS = 32
+MAX_HOLE_PIXELS = 64
+MAX_SEAM_FRACTION = 0.02
+
+
+def compare(frame, results, mesh):
+    """(hole pixels, differing fraction of the mask) between the two backends on one frame."""
+    triangles = warp_mask_onto_face(frame.copy(), results, mesh, "triangles")
+    remap = warp_mask_onto_face(frame.copy(), results, mesh, "remap")
+    differs = np.abs(triangles.astype(np.int16) - remap).max(axis=2) > DIFF_LEVELS
+    covered = np.count_nonzero((triangles != frame).any(axis=2) | (remap != frame).any(axis=2))
+    inside = np.zeros(frame.shape[:2], np.uint8)
+    lf = LandmarkFrame.ensure(results, frame.shape)
+    if lf.has("face"):
+        fixed = np.int32(np.round(mesh.dst_points(lf, frame.shape) * 16))
+        for simplex in mesh.simplices:
+            cv2.fillConvexPoly(inside, fixed[simplex], 1, lineType=cv2.LINE_8, shift=4)
+    holes = cv2.erode(differs.astype(np.uint8), np.ones((3, 3), np.uint8)) & inside
+    return int(np.count_nonzero(holes)), np.count_nonzero(differs) / max(covered, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the remap mask backend against triangles")
+    parser.add_argument("--fixture", help="landmark fixture .npz or session directory")
+    parser.add_argument("--res", default="720p", choices=list(RESOLUTIONS))
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.fixture)
+    n = len(next(v for k, v in fixture.items() if k != "frames"))
+    camera_frames = fixture_frames(fixture, RESOLUTIONS[args.res])
+    mesh = pig_mesh()
+
+    worst_holes, worst_fraction, failures = 0, 0.0, 0
+    for i in range(n):
+        holes, fraction = compare(camera_frames[i % len(camera_frames)], results_at(fixture, i), mesh)
+        worst_holes = max(worst_holes, holes)
+        worst_fraction = max(worst_fraction, fraction)
+        failures += holes > MAX_HOLE_PIXELS or fraction > MAX_SEAM_FRACTION
+
+    print(f"{n} frames at {args.res}")
+    print(f"{'':>16} {'worst':>8} {'limit':>8}")
+    print(f"{'hole pixels':>16} {worst_holes:>8} {MAX_HOLE_PIXELS:>8}")
+    print(f"{'differing mask':>16} {worst_fraction:>8.2%} {MAX_SEAM_FRACTION:>8.2%}")
+    if failures:
+        print(f"{failures} frames differ beyond the limits")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
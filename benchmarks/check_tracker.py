@@ -0,0 +1,98 @@
+"""
+Tier-0 passthrough check for the governed inference chain.
+
+A governed WebcamWorker always wraps the model in RoiInference and
+LandmarkTracker so the governor can retune them live. At the best quality
+tier (full-resolution input, inference every frame) that chain must hand
+out the model's landmarks unchanged. This replays fixture landmarks as the
+model's output through the same chain, first at tier 0 from the start,
+then at tier 0 after running at the lowest tier (the governor stepping
+back up), and requires every landmark to match exactly. The exit status
+is 1 if any frame differs.
+
+Run from the repo root:
+    python -m benchmarks.check_tracker [--fixture session_dir] [--frames 60]
+"""
+import argparse
+import sys
+
+import cv2
+import numpy as np
+
+from benchmarks.fixtures import fixture_frames, load_fixture, results_at
+from src.perf.governor import QUALITY_TIERS
+from src.vision.landmarks import LandmarkFrame
+from src.vision.roi import RoiInference
+from src.vision.tracking import LandmarkTracker
+
+SHAPE = (480, 640)
+
+
+class ReplayModel:
+    """Returns the fixture's landmarks for frame i on the i-th process() call."""
+
+    def __init__(self, fixture):
+        self.fixture = fixture
+        self.calls = 0
+
+    def process(self, rgb):
+        results = results_at(self.fixture, self.calls)
+        self.calls += 1
+        return results
+
+
+def governed_chain(model, tier):
+    """The RoiInference + LandmarkTracker wrappers of a governed WebcamWorker, at `tier`."""
+    roi = RoiInference(model, tier["infer_scale"])
+    tracker = LandmarkTracker(roi, tier["infer_every"])
+    return roi, tracker
+
+
+def set_tier(roi, tracker, tier):
+    """What WebcamWorker._apply_tier changes on the wrappers."""
+    roi.scale = tier["infer_scale"]
+    tracker.every_n = tier["infer_every"]
+
+
+def mismatches(fixture, frames, model, tracker, start, n):
+    """Frames among start..start+n-1 where the chain's output differs from the model's."""
+    bad = 0
+    for i in range(start, start + n):
+        rgb = cv2.cvtColor(frames[i % len(frames)], cv2.COLOR_BGR2RGB)
+        model.calls = i  # predicted frames skip model calls: realign with frame i
+        got = LandmarkFrame.ensure(tracker.process(rgb), None).arrays()
+        want = results_at(fixture, i).arrays()
+        if got.keys() != want.keys() or not all(np.array_equal(got[k], want[k]) for k in want):
+            bad += 1
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the governed tier-0 chain passes landmarks through")
+    parser.add_argument("--fixture", help="landmark fixture .npz or session directory")
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.fixture)
+    frames = fixture_frames(fixture, SHAPE + (3,))
+    n = args.frames
+
+    model = ReplayModel(fixture)
+    _, tracker = governed_chain(model, QUALITY_TIERS[0])
+    cold = mismatches(fixture, frames, model, tracker, 0, n)
+
+    model = ReplayModel(fixture)
+    roi, tracker = governed_chain(model, QUALITY_TIERS[-1])
+    for i in range(n):
+        tracker.process(cv2.cvtColor(frames[i % len(frames)], cv2.COLOR_BGR2RGB))
+    set_tier(roi, tracker, QUALITY_TIERS[0])
+    stepped_up = mismatches(fixture, frames, model, tracker, n, n)
+
+    print(f"{'tier 0 run':>24} {'frames changed':>15}")
+    print(f"{'from the start':>24} {cold:>15}")
+    print(f"{'after the lowest tier':>24} {stepped_up:>15}")
+    sys.exit(1 if cold or stepped_up else 0)
+
+
+if __name__ == "__main__":
+    main()
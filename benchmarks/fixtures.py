@@ -0,0 +1,160 @@
+"""
+Landmark fixtures for the benchmarks.
+
+A fixture is an .npz holding per-frame landmark arrays in MediaPipe's
+normalized image coordinates:
+    face  (T, 468, 3)  x, y, z
+    pose  (T, 33, 4)   x, y, z, visibility
+Missing sets are stored as NaN rows. `results_at` turns one frame into the
+LandmarkFrame the filters consume. A fixture may also store the recorded
+camera frames the landmarks came from:
+    frames (T, H, W, 3) uint8 BGR
+
+A session recorded with src.recording (e.g. WebcamWorker(record=...)) can
+be used as a fixture directly: pass its directory to `load_fixture`.
+
+Without a recorded fixture, `synthetic_fixture` builds a deterministic one:
+a face laid out on the pig mask annotation (so the mesh warps sensibly)
+drifting, rotating and scaling across the frame.
+
+Generate the default fixture:
+    python -m benchmarks.fixtures benchmarks/data/synthetic.npz
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from src.assets import asset_path
+from src.filters.mask_warp import load_mask_points
+from src.recording.session import Session
+from src.vision.landmarks import LandmarkFrame
+from src.vision.results import LANDMARK_SETS
+
+MASK_SIZE = (532, 722)  # pig_full.png (w, h), the space the CSV is annotated in
+
+# Rough mask-space positions for face landmarks the stickers use but the CSV lacks
+EXTRA_FACE_POINTS = {
+    127: (90, 270), 356: (425, 270),   # temples
+    195: (256, 345),                   # nose bridge
+    48: (215, 400), 278: (300, 400),   # nostrils
+}
+
+# Rough pose layout in a unit body box (x, y), person seen from the back
+POSE_POINTS = {
+    0: (0.50, 0.10), 7: (0.58, 0.10), 8: (0.42, 0.10),
+    11: (0.35, 0.30), 12: (0.65, 0.30),
+    17: (0.10, 0.55), 18: (0.90, 0.55), 19: (0.12, 0.57), 20: (0.88, 0.57),
+    23: (0.40, 0.65), 24: (0.60, 0.65),
+}
+
+
+def canonical_face(seed=0):
+    """(468, 2) face landmarks in unit mask coords."""
+    rng = np.random.default_rng(seed)
+    face = np.column_stack([rng.uniform(0.25, 0.75, 468), rng.uniform(0.25, 0.75, 468)])
+    face_indices, mask_points = load_mask_points(asset_path("assets", "stickers", "pig_full_points.csv"))
+    for idx, pt in zip(face_indices, mask_points):
+        face[idx] = pt
+    for idx, pt in EXTRA_FACE_POINTS.items():
+        face[idx] = pt
+    face[list(face_indices) + list(EXTRA_FACE_POINTS)] /= MASK_SIZE
+    return face
+
+
+def canonical_pose():
+    """(33, 2) pose landmarks in a unit body box."""
+    pose = np.full((33, 2), 0.5)
+    for idx, pt in POSE_POINTS.items():
+        pose[idx] = pt
+    return pose
+
+
+def synthetic_fixture(n_frames=60, seed=0):
+    """Deterministic moving-person fixture; see module docstring for the layout."""
+    face_unit = canonical_face(seed)
+    pose_unit = canonical_pose()
+    t = np.linspace(0, 2 * np.pi, n_frames, endpoint=False)
+
+    face = np.zeros((n_frames, 468, 3), dtype=np.float32)
+    pose = np.zeros((n_frames, 33, 4), dtype=np.float32)
+    for i, phase in enumerate(t):
+        cx, cy = 0.5 + 0.08 * np.sin(phase), 0.35 + 0.03 * np.cos(phase)
+        size = 0.3 + 0.04 * np.sin(2 * phase)
+        angle = 0.15 * np.sin(phase)
+        rot = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+
+        pts = (face_unit - 0.5) @ rot.T * (size, size * 16 / 9 * MASK_SIZE[1] / MASK_SIZE[0])
+        face[i, :, :2] = pts + (cx, cy)
+
+        body = (pose_unit - 0.5) * (0.6, 0.9) + (cx, 0.5)
+        pose[i, :, :2] = body
+        pose[i, :, 3] = 0.9
+
+    return {"face": face, "pose": pose}
+
+
+def save_fixture(path, fixture):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez(path, **fixture)
+
+
+def load_fixture(path=None):
+    """Load a fixture .npz or session directory, or build the synthetic one when path is None."""
+    if path is None:
+        return synthetic_fixture()
+    if os.path.isdir(path):
+        return session_fixture(path)
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+def session_fixture(path, max_frames=None):
+    """Fixture arrays from a recorded session directory (absent sets become NaN rows)."""
+    session = Session(path)
+    n = len(session) if max_frames is None else min(len(session), max_frames)
+    fixture = {name: session.landmark_arrays(name)[:n] for name in LANDMARK_SETS}
+    if session.has_frames:
+        fixture["frames"] = np.stack([session.frame(i) for i in range(n)])
+    return fixture
+
+
+def results_at(fixture, i):
+    """Frame i of a fixture as a LandmarkFrame."""
+    sets = {}
+    for name in LANDMARK_SETS:
+        arr = fixture.get(name)
+        if arr is not None:
+            rows = arr[i % len(arr)]
+            if not np.isnan(rows).any():
+                sets[name] = rows
+    return LandmarkFrame(sets)
+
+
+def synthetic_frame(shape, seed=0):
+    """A textured BGR frame (gradient + noise) so blends are not trivially uniform."""
+    h, w = shape[:2]
+    rng = np.random.default_rng(seed)
+    grad = np.linspace(40, 200, w, dtype=np.float32)[None, :, None]
+    noise = rng.normal(0, 12, (h, w, 3)).astype(np.float32)
+    return np.clip(grad + noise, 0, 255).astype(np.uint8)
+
+
+def fixture_frames(fixture, shape, count=4):
+    """
+    Up to `count` BGR frames at `shape`: the fixture's stored frames resized,
+    or textured synthetic frames when it has none.
+    """
+    h, w = shape[:2]
+    stored = fixture.get("frames")
+    if stored is None:
+        return [synthetic_frame(shape, seed) for seed in range(count)]
+    picks = np.linspace(0, len(stored) - 1, min(count, len(stored))).astype(int)
+    return [cv2.resize(stored[i], (w, h), interpolation=cv2.INTER_AREA) for i in picks]
+
+
+if __name__ == "__main__":
+    out = sys.argv[1] if len(sys.argv) > 1 else "benchmarks/data/synthetic.npz"
+    save_fixture(out, synthetic_fixture())
+    print(f"Wrote {out}")
@@ -0,0 +1,156 @@
+"""
+Load test for the MJPEG streaming server with many simulated viewers.
+
+Starts a FrameBroadcaster + StreamServer on localhost, feeds it filtered
+fixture frames at --fps from a producer thread (standing in for the render
+thread), and connects --clients MJPEG readers, --slow of which sleep
+--slow-delay seconds after each frame (a viewer on bad Wi-Fi). Reports
+received frame rates per client group, encoder work, and the producer's
+submit() latency. The exit status is 1 if submit() ever took longer than
+STALL_FRACTION of the frame budget (a viewer stalled capture) or the fast
+clients received less than MIN_FAST_SHARE of the encoded frames.
+
+Run from the repo root:
+    python -m benchmarks.load_stream [--clients 50] [--slow 10] [--seconds 10]
+"""
+import argparse
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import fixture_frames, load_fixture, results_at
+from benchmarks.suite import RESOLUTIONS
+from src.filters.manager import apply_filters
+from src.serve.stream import FrameBroadcaster, StreamServer
+
+STALL_FRACTION = 0.5
+MIN_FAST_SHARE = 0.8
+
+
+class MjpegClient(threading.Thread):
+    """Reads /stream.mjpg and counts frames; `delay` seconds of sleep after each one."""
+
+    def __init__(self, address, delay=0.0):
+        super().__init__(daemon=True)
+        self.address = address
+        self.delay = delay
+        self.frames = 0
+        self.bytes = 0
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            sock = socket.create_connection(self.address)
+            # A small receive buffer so a slow reader really backs up the server's send
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024)
+            sock.sendall(b"GET /stream.mjpg HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            f = sock.makefile("rb")
+            while f.readline() not in (b"\r\n", b""):
+                pass  # response headers
+            while not self._stop_event.is_set():
+                length = None
+                while True:
+                    line = f.readline()
+                    if not line:
+                        return
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                    elif line == b"\r\n" and length is not None:
+                        break
+                self.bytes += len(f.read(length + 2))  # JPEG + trailing CRLF
+                self.frames += 1
+                if self.delay:
+                    time.sleep(self.delay)
+            sock.close()
+        except OSError as e:
+            self.error = e
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def produce(broadcaster, frames, fps, seconds):
+    """Submit frames at `fps`; returns the submit() latencies in ms."""
+    latencies = []
+    period = 1.0 / fps
+    deadline = time.perf_counter() + seconds
+    next_t = time.perf_counter()
+    i = 0
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        broadcaster.submit(frames[i % len(frames)])
+        latencies.append((time.perf_counter() - t0) * 1000)
+        i += 1
+        next_t += period
+        time.sleep(max(0.0, next_t - time.perf_counter()))
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the MJPEG streaming server")
+    parser.add_argument("--fixture", help="landmark fixture .npz or session directory")
+    parser.add_argument("--res", default="720p", choices=list(RESOLUTIONS))
+    parser.add_argument("--level", type=int, default=4)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--slow", type=int, default=10, help="how many of the clients are slow")
+    parser.add_argument("--slow-delay", type=float, default=0.5)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--max-width", type=int)
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.fixture)
+    camera_frames = fixture_frames(fixture, RESOLUTIONS[args.res])
+    frames = [apply_filters(frame.copy(), results_at(fixture, i), args.level)
+              for i, frame in enumerate(camera_frames)]
+
+    broadcaster = FrameBroadcaster(max_width=args.max_width)
+    server = StreamServer(broadcaster, "127.0.0.1", 0)
+    server.start()
+    address = server.server_address[:2]
+
+    broadcaster.submit(frames[0])  # so clients get a first frame on connect
+    clients = [MjpegClient(address, args.slow_delay if i < args.slow else 0.0)
+               for i in range(args.clients)]
+    for client in clients:
+        client.start()
+    time.sleep(0.5)  # let everyone connect
+
+    encoded_before = broadcaster.encoded
+    latencies = produce(broadcaster, frames, args.fps, args.seconds)
+    encoded = broadcaster.encoded - encoded_before
+    stats = broadcaster.stats()
+    for client in clients:
+        client.stop()
+    server.stop()
+
+    slow, fast = clients[:args.slow], clients[args.slow:]
+    budget = 1000.0 / args.fps
+    print(f"{len(clients)} clients ({len(slow)} slow), {args.res} level {args.level}, "
+          f"{args.fps:g} fps for {args.seconds:g} s")
+    print(f"encoded {encoded} frames ({encoded / args.seconds:.1f} fps), "
+          f"{stats['encode_ms_mean']:.2f} ms/frame, encoder drops {stats['encoder_drops']}")
+    print(f"submit() ms: p50 {np.percentile(latencies, 50):.3f}  p99 {np.percentile(latencies, 99):.3f}"
+          f"  max {latencies.max():.3f}  (budget {budget:.1f})")
+    for name, group in (("fast", fast), ("slow", slow)):
+        if not group:
+            continue
+        received = np.array([c.frames for c in group]) / args.seconds
+        print(f"{name:>4} clients fps: min {received.min():.1f}  mean {received.mean():.1f}"
+              f"  max {received.max():.1f}")
+    errors = [c.error for c in clients if c.error is not None]
+    if errors:
+        print(f"{len(errors)} client errors, e.g. {errors[0]}")
+
+    failed = latencies.max() > budget * STALL_FRACTION
+    if fast and encoded:
+        failed |= min(c.frames for c in fast) < MIN_FAST_SHARE * encoded
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Filter micro-benchmark suite.
+
+Runs every registered filter and every pig level (through apply_filters)
+over landmark fixtures at 480p, 720p and 1080p, and reports per-call
+median / p95 time and peak allocation (tracemalloc, measured in a separate
+pass so it does not skew the timings). The temporal LAYER_CACHE is cleared
+and turned off for every case, so each call pays for its warps (the cache's
+own gains are measured by benchmarks.bench_layer_cache).
+
+Results are written as JSON; pass a previous run as --baseline to compare
+against it. The exit status is 1 when any case regressed by more than
+--threshold, so the suite can gate a change.
+
+Run from the repo root:
+    python -m benchmarks.suite --out bench.json
+    python -m benchmarks.suite --baseline bench.json --out new.json
+    python -m benchmarks.suite --fixture benchmarks/data/recorded.npz --only level/
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+
+from benchmarks.fixtures import fixture_frames, load_fixture, results_at
+from src.filters.layer_cache import LAYER_CACHE
+from src.filters.manager import LEVEL_PLANS, apply_filters
+from src.filters.registry import FILTERS, as_image_filter
+
+RESOLUTIONS = {"480p": (480, 640), "720p": (720, 1280), "1080p": (1080, 1920)}
+
+# Per-call differences below these are treated as noise when comparing runs
+MIN_DELTA_MS = 0.05
+MIN_DELTA_KIB = 64
+
+
+def benchmark_cases():
+    """{case name: fn(image, results) -> image} for every filter and level."""
+    cases = {}
+    for name in sorted(FILTERS):
+        cases["filter/" + name] = as_image_filter(name)
+    for level in sorted(LEVEL_PLANS):
+        cases[f"level/{level}"] = lambda image, results, level=level: apply_filters(image, results, level)
+    return cases
+
+
+def run_case(fn, frames, results, rounds):
+    """
+    Time fn over every (frame, landmarks) pair, `rounds` times, with
+    LAYER_CACHE cleared and off (repeated rounds over the same landmarks
+    would otherwise time cache hits).
+
+    Returns:
+        dict: calls, median_ms, p95_ms, alloc_kib (median per-call peak).
+    """
+    enabled = LAYER_CACHE.enabled
+    LAYER_CACHE.clear()
+    LAYER_CACHE.enabled = False
+    try:
+        return _time_case(fn, frames, results, rounds)
+    finally:
+        LAYER_CACHE.enabled = enabled
+
+
+def _time_case(fn, frames, results, rounds):
+    pairs = [(frames[i % len(frames)], r) for i, r in enumerate(results)]
+    work = [frame.copy() for frame, _ in pairs]
+
+    # Warm-up: lazy caches (LUTs, meshes, lru_caches) are not part of the steady state
+    for (frame, r), img in zip(pairs, work):
+        fn(img, r)
+
+    samples = []
+    for _ in range(rounds):
+        for (frame, r), img in zip(pairs, work):
+            np.copyto(img, frame)  # filters draw in place
+            t0 = time.perf_counter()
+            fn(img, r)
+            samples.append(time.perf_counter() - t0)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for (frame, r), img in zip(pairs, work):
+            np.copyto(img, frame)
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(img, r)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+
+    samples = np.array(samples) * 1000
+    return {
+        "calls": len(samples),
+        "median_ms": float(np.median(samples)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "alloc_kib": float(np.median(peaks)) / 1024,
+    }
+
+
+def run_suite(fixture, resolutions, rounds=3, only=None, n_frames=4):
+    """Run the matching cases at each resolution. Returns {"case@res": stats}."""
+    n = len(next(iter(v for k, v in fixture.items() if k != "frames")))
+    results = [results_at(fixture, i) for i in range(n)]
+    cases = {k: fn for k, fn in benchmark_cases().items() if not only or only in k}
+
+    report = {}
+    for res in resolutions:
+        frames = fixture_frames(fixture, RESOLUTIONS[res], n_frames)
+        for name, fn in cases.items():
+            stats = run_case(fn, frames, results, rounds)
+            report[f"{name}@{res}"] = stats
+            print(f"{name + '@' + res:<28} {stats['median_ms']:>9.3f} {stats['p95_ms']:>9.3f} "
+                  f"{stats['alloc_kib']:>10.1f}")
+    return report
+
+
+def compare(results, baseline, threshold):
+    """
+    Cases whose median time or allocation grew by more than `threshold`
+    (a fraction) over the baseline, ignoring sub-noise differences.
+
+    Returns:
+        list[str]: One line per regression.
+    """
+    regressions = []
+    for key, new in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        checks = (("median_ms", MIN_DELTA_MS, "ms"), ("alloc_kib", MIN_DELTA_KIB, "KiB"))
+        for metric, floor, unit in checks:
+            delta = new[metric] - old[metric]
+            if delta > floor and new[metric] > old[metric] * (1 + threshold):
+                regressions.append(f"{key} {metric}: {old[metric]:.3f} -> {new[metric]:.3f} {unit} "
+                                   f"(+{delta / max(old[metric], 1e-9):.0%})")
+    return regressions
+
+
+def environment():
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "threads": cv2.getNumThreads(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark filters and pig levels")
+    parser.add_argument("--fixture", help="landmark fixture .npz (default: synthetic)")
+    parser.add_argument("--res", nargs="+", default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the fixture per case")
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed slowdown / allocation growth (fraction)")
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.fixture)
+    print(f"{'case':<28} {'median ms':>9} {'p95 ms':>9} {'alloc KiB':>10}")
+    results = run_suite(fixture, args.res, args.rounds, args.only)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"env": environment(), "fixture": args.fixture or "synthetic",
+                       "results": results}, f, indent=2)
+        print(f"Wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
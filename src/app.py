@@ -1,27 +1,60 @@
 # run from "curse-of-oink": python -m src.main
 
+import src.startup  # first: marks the process start for the startup timings
+
+import os
 import sys
 from PyQt5.QtWidgets import QApplication
 from src.gui.main_window import MainWindow
-from src.camera.webcam import WebcamWorker
 from src.state.pig_state import PigLevelState
+from src.startup import staged_start
 
 def main():
     app = QApplication(sys.argv)
     state = PigLevelState()
     win = MainWindow(state)
+    win.show()
 
-    webcam = WebcamWorker(0, state)
-    win.set_webcam(webcam)  # give reference to MainWindow
-
-    def on_frame(frame):
-        win.set_frame(frame) # For now, just show raw frame
-
-    webcam.frame_ready.connect(on_frame)
+    def make_worker(planner):
+        # Imported here: pulls in mediapipe, which the warm-up thread has already loaded
+        from src.camera.webcam import WebcamWorker
+        # OINK_TARGET_FPS=<fps> lets the quality governor trade quality for frame rate
+        target_fps = float(os.environ.get("OINK_TARGET_FPS", 0)) or None
+        # OINK_SERVE_PORT=<port> also streams the feed as MJPEG to the LAN (see src.serve)
+        stream = None
+        port = int(os.environ.get("OINK_SERVE_PORT", 0))
+        if port:
+            from src.serve.stream import FrameBroadcaster, StreamServer
+            stream = FrameBroadcaster()
+            StreamServer(stream, port=port).start()
+            print(f"Streaming on port {port}")
+        # OINK_CLIP_SECONDS=<s> keeps an instant replay of the last s seconds (off by default),
+        # saved on GAME OVER / F5 to OINK_CLIP_DIR (default <repo>/clips)
+        clips = None
+        clip_seconds = float(os.environ.get("OINK_CLIP_SECONDS", 0))
+        if clip_seconds > 0:
+            from src.recording.clip_buffer import ClipBuffer
+            clips = ClipBuffer(clip_seconds)
+        # OINK_CAMERA=<index or video file>, OINK_CAMERA_SIZE=1280x720, OINK_CAMERA_FPS=30,
+        # OINK_CAMERA_FOURCC=MJPG|YUYV pick the capture source and format (see camera.capture)
+        from src.camera.capture import DEFAULT_FOURCC, parse_size
+        width, height = parse_size(os.environ.get("OINK_CAMERA_SIZE"))
+        camera_format = {"width": width, "height": height,
+                         "fps": float(os.environ.get("OINK_CAMERA_FPS", 0)) or None,
+                         "fourcc": os.environ.get("OINK_CAMERA_FOURCC", DEFAULT_FOURCC)}
+        return WebcamWorker(os.environ.get("OINK_CAMERA", 0), state, planner=planner,
+                            target_fps=target_fps, stream=stream, clips=clips,
+                            max_people=max_people, camera_format=camera_format)
 
-    win.show()
-    webcam.start()
+    # OINK_INFER_PROCESS=1 runs the models in a child process (frames over shared memory)
+    infer_process = os.environ.get("OINK_INFER_PROCESS", "") not in ("", "0")
+    # OINK_MAX_PEOPLE=<n> pigifies up to n people (multi-face / multi-pose models); pose stays
+    # single-person unless the PoseLandmarker .task model is installed (see vision.people)
+    max_people = int(os.environ.get("OINK_MAX_PEOPLE", 1))
+    # Heavy imports and the model load in the background; the window is already up
+    warmup, timer = staged_start(win, state, make_worker, infer_process, {"max_people": max_people})
     app.exec_()  # when window closes, closeEvent stops webcam
+    warmup.wait()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
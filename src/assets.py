@@ -0,0 +1,144 @@
+"""
+Asset registry: every sticker and mask is loaded once, on first use.
+
+Paths are resolved against the repo root, not the working directory.
+Preprocessed forms (premultiplied BGRA stickers, built mask meshes) are
+cached on disk as .npy files keyed by a hash of their source files, and
+memory-mapped on later startups, which skips PNG decoding, premultiplying
+and triangulation entirely. Editing a source file changes its hash, so a
+stale entry is never used.
+
+The cache lives in .cache/assets under the repo root; set OINK_ASSET_CACHE
+to move it, or to an empty string to disable it.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STICKER_DIR = os.path.join("assets", "stickers")
+
+# Bump when a preprocessing step changes, to invalidate every cache entry
+PREPROCESS_VERSION = 1
+
+
+def asset_path(*parts):
+    """Absolute path of a file under the repo root, e.g. asset_path("assets", "config", "levels.json")."""
+    return os.path.join(ROOT, *parts)
+
+
+def cache_dir():
+    """Disk cache directory, or None when caching is disabled."""
+    path = os.environ.get("OINK_ASSET_CACHE", os.path.join(ROOT, ".cache", "assets"))
+    return path or None
+
+
+@lru_cache(maxsize=None)
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def cached_arrays(kind, sources, build):
+    """
+    Arrays built from source files, through the disk cache.
+
+    Args:
+        kind (str): Name of the preprocessing (part of the cache key).
+        sources (list[str]): Files the arrays are derived from.
+        build (callable): build() -> {name: np.ndarray}, run on a cache miss.
+
+    Returns:
+        dict: {name: array}; read-only memory maps when served from the cache.
+    """
+    root = cache_dir()
+    if root is None:
+        return build()
+
+    key = hashlib.sha1(f"{kind}:{PREPROCESS_VERSION}".encode())
+    for path in sources:
+        key.update(file_hash(path).encode())
+    entry = os.path.join(root, f"{kind}-{key.hexdigest()[:16]}")
+
+    if not os.path.isdir(entry):
+        arrays = build()
+        os.makedirs(root, exist_ok=True)
+        # Write next to the final location and rename, so a crash never leaves half an entry
+        tmp = tempfile.mkdtemp(dir=root)
+        try:
+            for name, arr in arrays.items():
+                np.save(os.path.join(tmp, name + ".npy"), np.ascontiguousarray(arr))
+            os.rename(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(entry):
+                return arrays  # read-only checkout etc.: run uncached
+
+    return {name[:-4]: np.load(os.path.join(entry, name), mmap_mode="r")
+            for name in os.listdir(entry) if name.endswith(".npy")}
+
+
+@lru_cache(maxsize=None)
+def sticker(filename):
+    """
+    A sticker from assets/stickers as premultiplied BGRA uint8 (read-only).
+
+    Args:
+        filename (str): e.g. "pig_nose.png".
+    """
+    from src.filters.compositing import premultiply
+
+    path = asset_path(STICKER_DIR, filename)
+
+    def build():
+        img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if img is None:
+            raise FileNotFoundError(f"Cannot read sticker: {path}")
+        return {"bgra": premultiply(img)}
+
+    return cached_arrays("sticker", [path], build)["bgra"]
+
+
+@lru_cache(maxsize=None)
+def sticker_mips(filename):
+    """
+    A sticker and its successive half-size reductions, largest first (see
+    compositing.mip_levels). Resizing from the nearest larger level keeps the
+    cost of a small sticker proportional to its size on screen.
+    """
+    from src.filters.compositing import mip_levels
+
+    return mip_levels(sticker(filename))
+
+
+@lru_cache(maxsize=None)
+def mask_mesh(mask_filename, points_filename):
+    """The MaskMesh for a mask PNG and its MakeSense points CSV in assets/stickers."""
+    from src.filters.mask_warp import MaskMesh, load_mask_points
+
+    mask_path = asset_path(STICKER_DIR, mask_filename)
+    csv_path = asset_path(STICKER_DIR, points_filename)
+
+    def build():
+        face_indices, mask_points = load_mask_points(csv_path)
+        return MaskMesh(sticker(mask_filename), face_indices, mask_points).to_arrays()
+
+    return MaskMesh.from_arrays(cached_arrays("mask_mesh", [mask_path, csv_path], build))
+
+
+def clear_cache():
+    """Delete the disk cache (the next startup rebuilds it)."""
+    root = cache_dir()
+    if root and os.path.isdir(root):
+        shutil.rmtree(root)
+    sticker.cache_clear()
+    sticker_mips.cache_clear()
+    mask_mesh.cache_clear()
+    # Layers warped from the old stickers
+    from src.filters.layer_cache import LAYER_CACHE
+    LAYER_CACHE.clear()
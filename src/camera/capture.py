@@ -0,0 +1,365 @@
+"""
+Frame sources and a grab thread that always holds the newest frame.
+
+    grabber = FrameGrabber(CameraSource(0, width=1280, height=720, fps=30))
+    grabber.start()
+    frame, t, _ = grabber.take()
+
+A source has open() -> bool, read(image=None) -> (ret, frame), release()
+and describe() -> dict, plus a `mirrored` flag (frames already flipped for
+the selfie view). CameraSource negotiates an explicit format with the
+driver, FileSource plays a video file at its own frame rate, and
+recording.session.ReplayCapture plays a recorded session; all three plug
+into FrameGrabber and WebcamWorker the same way.
+
+FrameGrabber reads its source as fast as it delivers, so frames never wait
+in the driver's queue: the consumer takes the newest one and older ones are
+dropped. Failed reads back off exponentially, and after REOPEN_AFTER
+failures in a row the source is released and reopened (camera unplugged,
+driver reset) until it comes back.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from src.perf.timing import PROFILER
+
+log = logging.getLogger(__name__)
+
+# Compressed frames reach 30 fps at 720p and up over USB 2, where YUYV cannot
+DEFAULT_FOURCC = "MJPG"
+DEFAULT_BUFFER_SIZE = 1  # frames the driver may queue; more only adds latency
+
+BACKOFF_MIN = 0.01  # seconds after the first failed read or open
+BACKOFF_MAX = 2.0
+REOPEN_AFTER = 5    # failed reads in a row (~0.15 s of backoff) before reopening
+RATE_WINDOW = 60    # frames in the measured fps / frame age windows
+
+
+def fourcc_code(name):
+    return cv2.VideoWriter_fourcc(*name)
+
+
+def fourcc_name(code):
+    code = int(code)
+    if code <= 0:
+        return ""
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def negotiate(cap, width=None, height=None, fps=None, fourcc=None, buffer_size=None):
+    """
+    Ask an open cv2.VideoCapture for a format and read back what the driver chose.
+
+    The pixel format goes first: drivers list the sizes and rates they support
+    per pixel format, and switching it can reset them. Settings left None are
+    not touched. A driver may silently pick something else, so the result is
+    what it reports afterwards.
+
+    Returns:
+        dict: Negotiated width, height, fps, fourcc and buffer_size, plus
+        "refused": {setting: requested value} for every request the driver
+        did not honour.
+    """
+    requested = {"width": width, "height": height, "fps": fps, "fourcc": fourcc,
+                 "buffer_size": buffer_size}
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, fourcc_code(fourcc))
+    if width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    if height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+    actual = {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "fourcc": fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+        "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+    actual["refused"] = {key: want for key, want in requested.items()
+                         if want and actual[key] and actual[key] != want}
+    return actual
+
+
+class CameraSource:
+    """
+    A camera opened with an explicit format.
+
+    Args:
+        index (int): cv2.VideoCapture index.
+        width, height (int or None): Requested frame size (None = driver default).
+        fps (float or None): Requested frame rate.
+        fourcc (str or None): Requested pixel format, e.g. "MJPG" or "YUYV".
+        buffer_size (int or None): Frames the driver may queue.
+        api (int): cv2 capture backend (cv2.CAP_ANY lets OpenCV choose).
+    """
+
+    mirrored = False
+
+    def __init__(self, index=0, width=None, height=None, fps=None, fourcc=DEFAULT_FOURCC,
+                 buffer_size=DEFAULT_BUFFER_SIZE, api=cv2.CAP_ANY):
+        self.index = index
+        self.request = {"width": width, "height": height, "fps": fps, "fourcc": fourcc,
+                        "buffer_size": buffer_size}
+        self.api = api
+        self.cap = None
+        self.format = {}
+
+    def open(self):
+        self.release()
+        cap = cv2.VideoCapture(self.index, self.api)
+        if not cap.isOpened():
+            cap.release()
+            return False
+        self.cap = cap
+        self.format = negotiate(cap, **self.request)
+        return True
+
+    def read(self, image=None):
+        if self.cap is None:
+            return False, None
+        return self.cap.read(image)
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def describe(self):
+        return {"source": f"camera {self.index}", **self.format}
+
+
+class FileSource:
+    """
+    A video file played like a camera.
+
+    Args:
+        path (str): Video file.
+        loop (bool): Start over at the end instead of reporting end of stream.
+        realtime (bool): Pace reads to the file's fps (False = as fast as decoding goes).
+    """
+
+    mirrored = False
+
+    def __init__(self, path, loop=True, realtime=True):
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.cap = None
+        self.fps = 30.0
+        self._next_time = None
+
+    def open(self):
+        self.release()
+        cap = cv2.VideoCapture(self.path)
+        if not cap.isOpened():
+            cap.release()
+            return False
+        self.cap = cap
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._next_time = None
+        return True
+
+    def read(self, image=None):
+        if self.cap is None:
+            return False, None
+        ret, frame = self.cap.read(image)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(image)
+        if ret and self.realtime:
+            now = time.perf_counter()
+            if self._next_time is not None and now < self._next_time:
+                time.sleep(self._next_time - now)
+            self._next_time = max(now, self._next_time or now) + 1.0 / self.fps
+        return ret, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def describe(self):
+        if self.cap is None:
+            return {"source": self.path}
+        return {
+            "source": self.path,
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.fps,
+        }
+
+
+def make_source(spec=0, **camera_format):
+    """
+    A frame source from a camera index or a video path.
+
+    Args:
+        spec (int or str): Camera index (an int or a string of digits) or video file path.
+        **camera_format: CameraSource format options (width, height, fps, fourcc, buffer_size).
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec), **camera_format)
+    if not os.path.exists(spec):
+        raise FileNotFoundError(f"No such camera or video: {spec}")
+    return FileSource(spec)
+
+
+def parse_size(text):
+    """"1280x720" -> (1280, 720); empty -> (None, None)."""
+    if not text:
+        return None, None
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h)
+
+
+class FrameGrabber(threading.Thread):
+    """
+    Reads a source on its own thread and keeps only the newest frame.
+
+    Frames are triple-buffered: one buffer is being read into, one holds the
+    newest frame and one is held by the consumer (valid until its next
+    take()), so no frame is copied and none is overwritten while in use.
+
+    Args:
+        source: CameraSource, FileSource, ReplayCapture or anything with the
+            same open / read / release / describe methods.
+        extra (callable or None): Called right after each successful read;
+            its result is handed out with the frame (e.g. a replay's landmarks).
+        name (str): Thread name.
+    """
+
+    def __init__(self, source, extra=None, name="grab"):
+        super().__init__(name=name, daemon=True)
+        self.source = source
+        self.extra = extra
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._buffers = [None, None, None]
+        self._items = [None, None, None]  # (capture time, extra) per buffer
+        self._latest = None  # buffer with the newest untaken frame
+        self._held = None    # buffer the consumer has
+        self._intervals = deque(maxlen=RATE_WINDOW)
+        self._ages = deque(maxlen=RATE_WINDOW)
+        self._last_time = None
+        self.state = "opening"
+        self.frames = 0
+        self.drops = 0       # frames replaced before anyone took them
+        self.failures = 0    # failed reads and opens
+        self.reconnects = 0
+
+    def _open(self):
+        backoff = BACKOFF_MIN
+        while not self._stop_event.is_set():
+            if self.source.open():
+                self.state = "running"
+                return True
+            self.failures += 1
+            self._stop_event.wait(backoff)
+            backoff = min(backoff * 2, BACKOFF_MAX)
+        return False
+
+    def run(self):
+        try:
+            if not self._open():
+                return
+            fails, backoff = 0, BACKOFF_MIN
+            while not self._stop_event.is_set():
+                with self._cond:
+                    i = next(k for k in range(3) if k != self._latest and k != self._held)
+                with PROFILER.section("capture"):
+                    ret, frame = self.source.read(self._buffers[i])
+                if not ret:
+                    self.failures += 1
+                    fails += 1
+                    if fails >= REOPEN_AFTER:
+                        log.warning("Capture: %d failed reads, reopening %s",
+                                    fails, self.source.describe().get("source"))
+                        self.state = "reconnecting"
+                        self.reconnects += 1
+                        self.source.release()
+                        if not self._open():
+                            return
+                        fails = 0
+                        backoff = BACKOFF_MIN
+                        continue
+                    self._stop_event.wait(backoff)
+                    backoff = min(backoff * 2, BACKOFF_MAX)
+                    continue
+                fails, backoff = 0, BACKOFF_MIN
+
+                t = time.perf_counter()
+                extra = self.extra() if self.extra is not None else None
+                with self._cond:
+                    # read() may return its own array (first frame, new size)
+                    self._buffers[i] = frame
+                    self._items[i] = (t, extra)
+                    if self._latest is not None:
+                        self.drops += 1
+                    self._latest = i
+                    if self._last_time is not None:
+                        self._intervals.append(t - self._last_time)
+                    self._last_time = t
+                    self.frames += 1
+                    self._cond.notify()
+                PROFILER.tick("capture")
+        finally:
+            self.state = "stopped"
+            self.source.release()
+            with self._cond:
+                self._cond.notify_all()
+
+    def take(self, timeout=None):
+        """
+        The newest frame nobody has taken yet, waiting up to `timeout` seconds.
+
+        Returns:
+            tuple or None: (frame, capture time, extra) with the perf_counter
+            time the read finished; None on timeout or once stopped. The frame
+            stays valid until the next take().
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._latest is not None or self._stop_event.is_set(),
+                                timeout)
+            if self._latest is None:
+                return None
+            self._held, self._latest = self._latest, None
+            t, extra = self._items[self._held]
+            frame = self._buffers[self._held]
+        age_ms = (time.perf_counter() - t) * 1000
+        self._ages.append(age_ms)
+        PROFILER.record("frame_age", age_ms)
+        return frame, t, extra
+
+    def fps(self):
+        """Measured frame rate over the last RATE_WINDOW frames."""
+        intervals = list(self._intervals)
+        return len(intervals) / sum(intervals) if intervals and sum(intervals) > 0 else 0.0
+
+    def stats(self):
+        ages = list(self._ages)
+        return {
+            "state": self.state,
+            "fps": self.fps(),
+            "frame_age_ms": float(np.median(ages)) if ages else None,
+            "frames": self.frames,
+            "drops": self.drops,
+            "failures": self.failures,
+            "reconnects": self.reconnects,
+            "format": self.source.describe(),
+        }
+
+    def stop(self):
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
@@ -0,0 +1,226 @@
+"""
+Building blocks for the capture -> inference -> render pipeline.
+
+Stages run on their own threads and hand work to each other through
+single-slot "latest wins" mailboxes: a producer never waits for a slow
+consumer, it just replaces the pending item (and counts a drop). So at
+most one frame is ever queued between two stages.
+"""
+import logging
+import threading
+
+import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class LatestSlot:
+    """Bounded single-slot mailbox; put() overwrites, get() takes the newest item."""
+
+    def __init__(self, name):
+        self.name = name
+        self._cond = threading.Condition()
+        self._item = None
+        self._full = False
+        self._closed = False
+        self.puts = 0
+        self.drops = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._full:
+                self.drops += 1  # consumer never saw the previous item
+            self._item = item
+            self._full = True
+            self.puts += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Wait for an item; returns None on timeout or once the slot is closed."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._full or self._closed, timeout)
+            if not self._full:
+                return None
+            item, self._item, self._full = self._item, None, False
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def depth(self):
+        return int(self._full)
+
+    def stats(self):
+        return {"depth": self.depth, "puts": self.puts, "drops": self.drops}
+
+
+class Stage(threading.Thread):
+    """
+    A pipeline stage thread.
+
+    Args:
+        name (str): Stage name (used in stats).
+        work (callable): work(item) -> output or None. Source stages (no inbox)
+            are called with None. Returning None produces nothing downstream.
+        inbox (LatestSlot or None): Where to take items from.
+        outbox (LatestSlot or None): Where to put outputs.
+        setup (callable or None): Run on the stage thread before the first item
+            (e.g. open the camera or build the model there).
+        teardown (callable or None): Run on the stage thread when stopping,
+            also after a failed setup (its own exceptions are only logged).
+
+    An exception from work() is logged and counted and the item dropped; one
+    from setup() ends the stage. Either way the last one is kept in `error`
+    (and stats()) for the owner to show.
+    """
+
+    POLL_INTERVAL = 0.1  # seconds; bounds how long stop() can take
+
+    def __init__(self, name, work, inbox=None, outbox=None, setup=None, teardown=None):
+        super().__init__(name=name, daemon=True)
+        self.work = work
+        self.inbox = inbox
+        self.outbox = outbox
+        self.setup = setup
+        self.teardown = teardown
+        self.processed = 0
+        self.failures = 0
+        self.error = None  # "Type: message" of the last exception, None while all is well
+        self._stop_event = threading.Event()
+
+    def _failed(self, what, e):
+        message = f"{type(e).__name__}: {e}"
+        if message != self.error:  # once per distinct error, not once per frame
+            log.exception("Stage %s: %s failed", self.name, what)
+        self.failures += 1
+        self.error = message
+
+    def run(self):
+        try:
+            if self.setup is not None:
+                try:
+                    self.setup()
+                except Exception as e:
+                    self._failed("setup", e)
+                    return
+            while not self._stop_event.is_set():
+                item = None
+                if self.inbox is not None:
+                    item = self.inbox.get(timeout=self.POLL_INTERVAL)
+                    if item is None:
+                        continue
+                try:
+                    out = self.work(item)
+                except Exception as e:
+                    self._failed("work", e)
+                    continue
+                if out is None:
+                    continue
+                self.processed += 1
+                if self.outbox is not None:
+                    self.outbox.put(out)
+        finally:
+            if self.teardown is not None:
+                try:
+                    self.teardown()
+                except Exception:
+                    # Often a consequence of the recorded error (e.g. closing what setup never opened)
+                    log.exception("Stage %s: teardown failed", self.name)
+
+    def stats(self):
+        return {"alive": self.is_alive(), "processed": self.processed,
+                "failures": self.failures, "error": self.error}
+
+    def stop(self):
+        self._stop_event.set()
+        if self.outbox is not None:
+            self.outbox.close()
+
+
+class DisplaySlot:
+    """
+    Latest-frame handoff from the render thread to the GUI, with recycled buffers.
+
+    The producer scales each frame to `target_size` into a buffer from the
+    pool and publishes it; the GUI takes the newest one when it repaints.
+    A frame published before the GUI took the previous one replaces it, so
+    nothing queues up. Buffers come back to the pool once the GUI has moved
+    on to a newer frame, so a buffer is never written while it is on screen.
+    """
+
+    POOL_SIZE = 2  # spare buffers kept per frame shape
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._free = {}
+        self._pending = None
+        self._showing = None
+        self.target_size = None  # (width, height) to scale to, set by the view
+        self.published = 0
+        self.drops = 0
+
+    def _recycle(self, buf):
+        pool = self._free.setdefault(buf.shape, [])
+        if len(pool) < self.POOL_SIZE:
+            pool.append(buf)
+
+    def acquire(self, shape):
+        """A writable uint8 buffer of `shape` that the GUI is not using."""
+        with self._lock:
+            pool = self._free.get(shape)
+            if pool:
+                return pool.pop()
+        return np.empty(shape, dtype=np.uint8)
+
+    def scaled(self, frame):
+        """
+        Scale a BGR frame into a pooled buffer, keeping its aspect ratio within
+        target_size. Always returns a pooled buffer: the caller's frame (a ring
+        buffer upstream will reuse) is copied when no scaling is needed.
+        """
+        h, w = frame.shape[:2]
+        target = self.target_size
+        size = (w, h)
+        if target is not None and target[0] >= 1 and target[1] >= 1:
+            scale = min(target[0] / w, target[1] / h)
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        buf = self.acquire((size[1], size[0], frame.shape[2]))
+        if size == (w, h):
+            np.copyto(buf, frame)
+            return buf
+        interp = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        return cv2.resize(frame, size, dst=buf, interpolation=interp)
+
+    def publish(self, frame):
+        """
+        Hand a frame to the GUI. Returns True when the GUI needs a repaint
+        request (no frame was already waiting for it).
+        """
+        with self._lock:
+            waiting = self._pending is not None
+            if waiting:
+                self.drops += 1
+                self._recycle(self._pending)
+            self._pending = frame
+            self.published += 1
+            return not waiting
+
+    def take(self):
+        """The newest frame (GUI thread); the previous one goes back to the pool."""
+        with self._lock:
+            if self._pending is not None:
+                if self._showing is not None:
+                    self._recycle(self._showing)
+                self._showing, self._pending = self._pending, None
+            return self._showing
+
+    def stats(self):
+        return {"published": self.published, "drops": self.drops}
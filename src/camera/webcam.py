@@ -1,45 +1,295 @@
+import time
+
 import cv2
-import mediapipe as mp
+import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal
+from src.camera.capture import FrameGrabber, make_source
+from src.camera.pipeline import DisplaySlot, LatestSlot, Stage
+from src.filters.layer_cache import LAYER_CACHE
 from src.filters.manager import apply_filters
+from src.perf.buffers import FrameRing, scratch
+from src.perf.governor import QualityGovernor, filter_overrides
+from src.perf.timing import PROFILER
+from src.recording.session import ReplayCapture, SessionWriter
+from src.vision.planner import InferencePlanner
+from src.vision.remote import RemoteInference
+from src.vision.results import EMPTY_RESULTS
+from src.vision.roi import RoiInference
+from src.vision.tracking import LandmarkTracker
 
 class WebcamWorker(QThread):
-    frame_ready = pyqtSignal(object)
+    """
+    Runs capture, inference and compositing as three overlapping stages:
+
+        grab thread --> capture thread --[captured]--> inference thread --[inferred]--> this QThread
+
+    Each arrow is a single-slot mailbox where the newest frame wins, so a slow
+    stage drops stale frames instead of queueing them. Rendered frames go to
+    the GUI the same way: they are scaled to the view size here and left in
+    `display` (a DisplaySlot), and `frame_available` asks the view to repaint.
+    The grab thread (a camera.capture.FrameGrabber) reads the camera as fast
+    as it delivers, so the capture stage always starts from the newest frame.
+
+    Args:
+        camera_index (int or str): Camera index, or a video file to play
+            like a camera (see camera.capture.make_source).
+        pig_state (PigLevelState): Shared pig level.
+        infer_every (int): Run the model every N frames and predict landmarks
+            in between (1 = run it on every frame).
+        motion_threshold (float or None): Frame-difference score that forces
+            an early model run when decimating (see LandmarkTracker).
+        infer_scale (float): Downscale factor for the model input.
+        infer_crop (bool): Run the model on a crop around the last known person.
+        planner (InferencePlanner, RemoteInference or None): Already built (and
+            warmed up) planner to use instead of building one when the inference
+            stage starts.
+        infer_process (bool): Build a RemoteInference (models in a child process,
+            frames over shared memory) instead of an in-process planner.
+        record (str or None): Record camera frames and landmarks to this session
+            directory (see recording.session).
+        replay (str or None): Play a recorded session instead of the camera; the
+            recorded landmarks replace inference.
+        target_fps (float or None): Run a QualityGovernor that steps through
+            quality tiers to hold this frame rate (None = fixed quality).
+        stream (FrameBroadcaster or None): Also hand every filtered frame to
+            this broadcaster (see serve.stream).
+        clips (ClipBuffer or None): Keep the last seconds of filtered frames for
+            instant replay (see recording.clip_buffer).
+        max_people (int): Track and pigify up to this many people (see
+            vision.people). The ROI / decimation wrappers follow one person,
+            so they are not used above 1.
+        camera_format (dict or None): CameraSource format options: width,
+            height, fps, fourcc, buffer_size.
+        source (frame source or None): Already built source (see camera.capture)
+            to use instead of camera_index.
+    """
+    frame_ready = pyqtSignal(object)  # full-size frame; only emitted when connected
+    frame_available = pyqtSignal()     # a new frame is waiting in self.display
+    stage_failed = pyqtSignal(str)     # a stage hit a new error (see Stage.error)
+
+    # Frames in flight after capture: captured slot, inference, inferred slot,
+    # compositing, display pending + on screen = 6, plus the one being written
+    FRAME_RING_SIZE = 8
 
-    def __init__(self, camera_index=0, pig_state=None):
+    def __init__(self, camera_index=0, pig_state=None, infer_every=1, motion_threshold=8.0,
+                 infer_scale=1.0, infer_crop=False, record=None, replay=None, planner=None,
+                 target_fps=None, infer_process=False, stream=None,
+                 clips=None, max_people=1, camera_format=None, source=None):
         super().__init__()
         self.camera_index = camera_index
+        self.camera_format = camera_format or {}
+        self.source = source
+        self.grabber = None
         self.running = True
         self.pig_state = pig_state
+        self.infer_every = infer_every
+        self.motion_threshold = motion_threshold
+        self.infer_scale = infer_scale
+        self.infer_crop = infer_crop
+        self.record = record
+        self.replay = replay
+        self.planner = planner
+        self.infer_process = infer_process or isinstance(planner, RemoteInference)
+        self.recorder = None
+        self.target_fps = target_fps
+        self.governor = None
+        self.stream = stream
+        self.clips = clips
+        self.max_people = max_people
+        self.model_options = {"max_people": max_people}
+        self.filter_overrides = None
+        self.roi = None
+        self.tracker = None
+
+        self.captured = LatestSlot("captured")
+        self.inferred = LatestSlot("inferred")
+        self.display = DisplaySlot()
+        self.frames = FrameRing(self.FRAME_RING_SIZE)  # capture stage output buffers
+        self.stages = []
+        self.stage_errors = {}  # stage name -> last error reported through stage_failed
+        self.rendered = 0
+        self.level = None  # pig level of the last rendered frame
+
+    # --- Stage work (each runs on its own thread)
+
+    def _open_camera(self):
+        if self.source is None:
+            self.source = make_source(self.camera_index, **self.camera_format)
+        self.grabber = FrameGrabber(self.source)
+        self.grabber.start()
+
+    def _open_replay(self):
+        if self.source is None:
+            self.source = ReplayCapture(self.replay, loop=True, realtime=True)
+        # Landmarks are read with their frame, on the grab thread
+        self.grabber = FrameGrabber(self.source, extra=self.source.landmarks)
+        self.grabber.start()
+
+    def _capture(self, _):
+        item = self.grabber.take(timeout=Stage.POLL_INTERVAL)
+        if item is None:
+            return None
+        frame, _, landmarks = item
+        # Into the next ring buffer: the grabber reuses its own
+        out = self.frames.get("frame", frame.shape)
+        with PROFILER.section("flip"):
+            if self.source.mirrored:
+                np.copyto(out, frame)
+            else:
+                cv2.flip(frame, 1, dst=out)  # selfie view
+        if self.replay:
+            # Recorded frames come with their landmarks
+            return out, landmarks
+        return out
+
+    def _close_camera(self):
+        self.grabber.stop()
+        self.grabber.join()  # releases the source
+
+    def _open_model(self):
+        # Runs only the MediaPipe models the current pig level's filters need
+        if self.planner is None:
+            make = RemoteInference if self.infer_process else InferencePlanner
+            self.planner = make(self.pig_state, model_options=self.model_options)
+        else:
+            self.planner.set_model_options(**self.model_options)
+        self.model = self.planner
+        if self.max_people > 1:
+            return
+        # The governor retunes scale / decimation live, so it always needs both wrappers
+        governed = self.governor is not None
+        if governed or self.infer_scale != 1.0 or self.infer_crop:
+            self.model = self.roi = RoiInference(self.model, self.infer_scale, self.infer_crop)
+        if governed or self.infer_every > 1:
+            self.model = self.tracker = LandmarkTracker(self.model, self.infer_every,
+                                                        self.motion_threshold)
+
+    def _apply_tier(self, tier):
+        """Put a governor quality tier into effect (also before the model exists)."""
+        self.infer_scale = tier["infer_scale"]
+        self.infer_every = tier["infer_every"]
+        self.model_options.update(model_complexity=tier["model_complexity"],
+                                  refine_face=tier["refine_face"])
+        self.filter_overrides = filter_overrides(tier)
+        if self.roi is not None:
+            self.roi.scale = self.infer_scale
+        if self.tracker is not None:
+            self.tracker.every_n = self.infer_every
+        if self.planner is not None:
+            self.planner.set_model_options(**self.model_options)
+
+    def _infer(self, frame):
+        if not self.planner.needs_frame():
+            self.planner.process(None)  # lets the planner warm the next level's model
+            return frame, EMPTY_RESULTS
+
+        t0 = time.perf_counter()
+        # Run Mediapipe
+        with PROFILER.section("convert"):
+            if self.infer_process and self.model is self.planner:
+                # Convert straight into the shared-memory slot the child will read
+                dst = self.planner.input_buffer(frame.shape)
+            else:
+                dst = scratch().get("rgb", frame.shape)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=dst)
+        with PROFILER.section("inference"):
+            results = self.model.process(rgb)
+        if self.governor is not None:
+            self.governor.observe("inference", (time.perf_counter() - t0) * 1000)
+        return frame, results
+
+    def _close_model(self):
+        self.planner.close()
+
+    # --- Compositing stage (this QThread)
 
     def run(self):
-        cap = cv2.VideoCapture(self.camera_index)
-        holistic = mp.solutions.holistic.Holistic(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-
-        while self.running and cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
+        if self.replay:
+            # No camera and no model: the replay stage feeds compositing directly
+            self.stages = [
+                Stage("replay", self._capture, outbox=self.inferred,
+                      setup=self._open_replay, teardown=self._close_camera),
+            ]
+        else:
+            self.stages = [
+                Stage("capture", self._capture, outbox=self.captured,
+                      setup=self._open_camera, teardown=self._close_camera),
+                Stage("inference", self._infer, inbox=self.captured, outbox=self.inferred,
+                      setup=self._open_model, teardown=self._close_model),
+            ]
+        if self.record:
+            self.recorder = SessionWriter(self.record)
+        if self.target_fps:
+            self.governor = QualityGovernor(self.target_fps, self._apply_tier)
+        for stage in self.stages:
+            stage.start()
+
+        while self.running:
+            self._report_failures()
+            item = self.inferred.get(timeout=Stage.POLL_INTERVAL)
+            if item is None:
                 continue
+            frame, results = item
+            if self.recorder is not None:
+                # Before filtering: the filters draw on the frame in place
+                self.recorder.write(frame, results)
 
-            # Flip for selfie-view
-            frame = cv2.flip(frame, 1)
+            t0 = time.perf_counter()
+            level = self.pig_state.level
+            if level != self.level:
+                # The new level's layers differ; free the old ones
+                LAYER_CACHE.clear()
+                self.level = level
+            # Apply filters depending on pig level
+            with PROFILER.section("filters"):
+                filtered = apply_filters(frame, results, level, self.filter_overrides)
+            self.rendered += 1
 
-            # Run Mediapipe
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = holistic.process(rgb)
+            with PROFILER.section("scale"):
+                scaled = self.display.scaled(filtered)
+            if self.governor is not None:
+                self.governor.observe("render", (time.perf_counter() - t0) * 1000)
+                self.governor.update()
+            if self.display.publish(scaled):
+                self.frame_available.emit()
+            if self.stream is not None:
+                with PROFILER.section("stream"):
+                    self.stream.submit(filtered)  # copies; drops the frame if encoders are busy
+            if self.clips is not None:
+                with PROFILER.section("clips"):
+                    self.clips.submit(filtered)
+            if self.receivers(self.frame_ready) > 0:
+                # Receivers may hold on to it; the ring buffer will be reused
+                self.frame_ready.emit(filtered.copy())
 
-            # Apply filters depending on pig level
-            filtered = apply_filters(frame, results, self.pig_state.level)
+        for stage in self.stages:
+            stage.stop()
+        for stage in self.stages:
+            stage.join()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
-            self.frame_ready.emit(filtered)
+    def _report_failures(self):
+        for stage in self.stages:
+            if stage.error is not None and stage.error != self.stage_errors.get(stage.name):
+                self.stage_errors[stage.name] = stage.error
+                self.stage_failed.emit(f"{stage.name.capitalize()} failed: {stage.error}")
 
-        cap.release()
-        holistic.close()
+    def stats(self):
+        """Per-stage mailbox depth, drop counts, processed frames and errors."""
+        return {
+            "capture": self.grabber.stats() if self.grabber is not None else None,
+            "slots": {slot.name: slot.stats() for slot in (self.captured, self.inferred)},
+            "display": self.display.stats(),
+            "processed": {stage.name: stage.processed for stage in self.stages},
+            "stages": {stage.name: stage.stats() for stage in self.stages},
+            "rendered": self.rendered,
+            "governor": self.governor.stats() if self.governor is not None else None,
+            "clips": self.clips.stats() if self.clips is not None else None,
+            "layer_cache": LAYER_CACHE.stats(),
+        }
 
     def stop(self):
         self.running = False
         self.wait()
-        self.cap.release()
\ No newline at end of file
@@ -1,10 +1,13 @@
-import cv2
 import numpy as np
 
-# Load images PNG (RGBA)
-bacon_head_img = cv2.imread("assets/stickers/bacon_head.png", cv2.IMREAD_UNCHANGED)
-chop_left_img = cv2.imread("assets/stickers/pork_chop_left.png", cv2.IMREAD_UNCHANGED)
-chop_right_img = cv2.imread("assets/stickers/pork_chop_right.png", cv2.IMREAD_UNCHANGED)
+from src.assets import sticker_mips
+from src.filters.compositing import resize_centered
+from src.filters.registry import register_filter, as_image_filter
+
+# Sticker PNGs (premultiplied BGRA, loaded on first use by src.assets)
+bacon_head_png = "bacon_head.png"
+chop_left_png = "pork_chop_left.png"
+chop_right_png = "pork_chop_right.png"
 
 # idx pose_landmarks
 head_landmarks = [8, 7]
@@ -12,111 +15,65 @@ left_hand_landmarks = [20, 18]
 right_hand_landmarks = [19, 17]
 
 
-def bacon_head_filter(image, results):
-    if not results.pose_landmarks:
-        return image
+@register_filter("bacon_head", needs=("pose",))
+def bacon_head_layers(people, image_shape):
+    bacon_head_mips = sticker_mips(bacon_head_png)
+    bacon_head_img = bacon_head_mips[0]
 
-    h, w, _ = image.shape
-    lm_list = results.pose_landmarks.landmark
+    layers = []
+    for i, ((x1, y1), (x2, y2)) in enumerate(people.gather("pose", head_landmarks).astype(int)):
+        # Compute head center in pixels
+        cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
 
-    # Compute head center in pixels
-    x1, y1 = int(lm_list[head_landmarks[0]].x * w), int(lm_list[head_landmarks[0]].y * h)
-    x2, y2 = int(lm_list[head_landmarks[1]].x * w), int(lm_list[head_landmarks[1]].y * h)
-    cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+        # Scale bacon width to head width
+        head_dist = max(1, int(np.hypot(x2 - x1, y2 - y1)))  # avoid divide by zero
+        scale = head_dist / bacon_head_img.shape[1] * 2 # width scaling
 
-    # Scale bacon width to head width
-    head_dist = max(1, int(np.hypot(x2 - x1, y2 - y1)))  # avoid divide by zero
-    scale = head_dist / bacon_head_img.shape[1] * 2 # width scaling
+        tail_h = int(bacon_head_img.shape[0] * scale)
+        tail_w = int(bacon_head_img.shape[1] * scale)
 
-    tail_h = int(bacon_head_img.shape[0] * scale)
-    tail_w = int(bacon_head_img.shape[1] * scale)
-    bacon_resized = cv2.resize(bacon_head_img, (tail_w, tail_h), interpolation=cv2.INTER_AREA)
+        # Centered on face
+        layer = resize_centered(bacon_head_mips, cx, cy, tail_w, tail_h, f"layer/bacon_head/{i}")
+        if layer is not None:
+            layers.append(layer)
+    return layers
 
-    # Compute top-left corner to center on face
-    x_offset = cx - tail_w // 2
-    y_offset = cy - tail_h // 2
+@register_filter("pork_chop_hand", needs=("pose",))
+def pork_chop_hand_layers(people, image_shape, side='left'):
+    if side == 'left':
+        pork_chop_mips = sticker_mips(chop_left_png)
+        hand_landmarks = left_hand_landmarks
+    else: 
+        pork_chop_mips = sticker_mips(chop_right_png)
+        hand_landmarks = right_hand_landmarks
 
-    # Overlay PNG with alpha
-    for c in range(3):  # RGB channels
-        alpha = bacon_resized[:, :, 3] / 255.0
-        y1_clip = max(0, y_offset)
-        y2_clip = min(h, y_offset + tail_h)
-        x1_clip = max(0, x_offset)
-        x2_clip = min(w, x_offset + tail_w)
+    pork_chop_img = pork_chop_mips[0]
 
-        # Check if there is anything to overlay
-        if y2_clip <= y1_clip or x2_clip <= x1_clip:
-            return image  # nothing to draw
+    vis_threshold = 0.3
+    hands = people.gather("pose", hand_landmarks).astype(int)
 
-        bacon_crop = bacon_resized[
-            y1_clip - y_offset : y2_clip - y_offset,
-            x1_clip - x_offset : x2_clip - x_offset
-        ]
+    layers = []
+    for i, (person, ((x1, y1), (x2, y2))) in enumerate(zip(people.with_set("pose"), hands)):
+        if (person.visibility["pose"][hand_landmarks] < vis_threshold).any():
+            continue
 
-        alpha_crop = bacon_crop[:, :, 3] / 255.0
-        image[y1_clip:y2_clip, x1_clip:x2_clip, c] = (
-            (1 - alpha_crop) * image[y1_clip:y2_clip, x1_clip:x2_clip, c] +
-            alpha_crop * bacon_crop[:, :, c]
-        )
+        # Compute center in pixels
+        cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
 
-    return image
+        # Scale width
+        hand_dist = max(1, int(np.hypot(x2 - x1, y2 - y1)))  # avoid divide by zero
+        scale = hand_dist / pork_chop_img.shape[1] * 6 # width scaling
 
-def pork_chop_hand_filter(image, results, side='left'):
-    if not results.pose_landmarks:
-        return image
+        tail_h = int(pork_chop_img.shape[0] * scale)
+        tail_w = int(pork_chop_img.shape[1] * scale)
 
-    h, w, _ = image.shape
-    lm_list = results.pose_landmarks.landmark
+        # Centered on hand
+        layer = resize_centered(pork_chop_mips, cx, cy, tail_w, tail_h,
+                                f"layer/pork_chop_{side}/{i}")
+        if layer is not None:
+            layers.append(layer)
+    return layers
 
-    if side == 'left':
-        pork_chop_img = chop_left_img
-        hand_landmarks = left_hand_landmarks
-    else: 
-        pork_chop_img = chop_right_img
-        hand_landmarks = right_hand_landmarks
 
-    vis_threshold = 0.3
-    if any(lm_list[idx].visibility < vis_threshold for idx in hand_landmarks):
-        return image
-
-    # Compute center in pixels
-    x1, y1 = int(lm_list[hand_landmarks[0]].x * w), int(lm_list[hand_landmarks[0]].y * h)
-    x2, y2 = int(lm_list[hand_landmarks[1]].x * w), int(lm_list[hand_landmarks[1]].y * h)
-    cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-
-    # Scale width
-    hand_dist = max(1, int(np.hypot(x2 - x1, y2 - y1)))  # avoid divide by zero
-    scale = hand_dist / pork_chop_img.shape[1] * 6 # width scaling
-
-    tail_h = int(pork_chop_img.shape[0] * scale)
-    tail_w = int(pork_chop_img.shape[1] * scale)
-    pork_chop_resized = cv2.resize(pork_chop_img, (tail_w, tail_h), interpolation=cv2.INTER_AREA)
-
-    # Compute top-left corner to center on face
-    x_offset = cx - tail_w // 2
-    y_offset = cy - tail_h // 2
-
-    # Overlay PNG with alpha
-    for c in range(3):  # RGB channels
-        alpha = pork_chop_resized[:, :, 3] / 255.0
-        y1_clip = max(0, y_offset)
-        y2_clip = min(h, y_offset + tail_h)
-        x1_clip = max(0, x_offset)
-        x2_clip = min(w, x_offset + tail_w)
-
-        # Check if there is anything to overlay
-        if y2_clip <= y1_clip or x2_clip <= x1_clip:
-            return image  # nothing to draw
-
-        pork_chop_crop = pork_chop_resized[
-            y1_clip - y_offset : y2_clip - y_offset,
-            x1_clip - x_offset : x2_clip - x_offset
-        ]
-
-        alpha_crop = pork_chop_crop[:, :, 3] / 255.0
-        image[y1_clip:y2_clip, x1_clip:x2_clip, c] = (
-            (1 - alpha_crop) * image[y1_clip:y2_clip, x1_clip:x2_clip, c] +
-            alpha_crop * pork_chop_crop[:, :, c]
-        )
-
-    return image
+bacon_head_filter = as_image_filter("bacon_head")
+pork_chop_hand_filter = as_image_filter("pork_chop_hand")
@@ -1,100 +1,160 @@
 import cv2
 import numpy as np
 
+from src.filters.compositing import affine_corners, composite, warp_affine_roi
+from src.filters.layer_cache import LAYER_CACHE
+from src.vision.landmarks import LandmarkBatch
+from src.vision.results import LANDMARK_SETS
+
+def sticker_transforms(
+    image_shape, src_pts, landmark_indices, results,
+    landmark_type="face", tip_offset=None
+):
+    """
+    Affine transforms placing a sticker on its anchor landmarks, for every
+    person with the landmark set at once.
+
+    Args:
+        image_shape (tuple): Shape of the frame.
+        src_pts (np.ndarray): 3x2 points on the sticker (base-left, base-right, tip).
+        landmark_indices (list[int]): Landmark indices for the sticker anchors (2 or 3 points).
+        results: LandmarkBatch, LandmarkFrame (or MediaPipe results object).
+        landmark_type (str): "face", "left_hand", "right_hand", "pose".
+        tip_offset (tuple or None): (dx, dy) offset in pixels or normalized coordinates to compute tip outside head.
+
+    Returns:
+        tuple: (M, dst_pts) with M (people, 2, 3) and dst_pts (people, 3, 2);
+        zero people when nobody has the landmark set.
+    """
+    # 1. Select landmarks
+    if landmark_type not in LANDMARK_SETS:
+        raise ValueError("Invalid landmark_type")
+    batch = LandmarkBatch.ensure(results, image_shape)
+
+    # 2. Compute destination points, (people, 2 or 3, 2)
+    dst_pts = batch.gather(landmark_type, landmark_indices).astype(np.float64)
+
+    # 3. If 2 landmarks are provided, compute tip dynamically
+    if dst_pts.shape[1] == 2:
+        p1, p2 = dst_pts[:, 0], dst_pts[:, 1]
+        midpoint = (p1 + p2) / 2
+        distance = np.linalg.norm(p2 - p1, axis=1)[:, None]
+        if tip_offset is not None:
+            # Move tip relative to the distance between the points
+            tip = midpoint + np.array(tip_offset, dtype=np.float64) * distance
+        else:
+            # Default: point outward along y-axis by 1.5x distance
+            tip = midpoint + np.array([0, -1.5]) * distance
+        # Rounded to float32 like the landmarks themselves
+        dst_pts = np.concatenate([dst_pts, tip[:, None]], axis=1).astype(np.float32)
+
+    # 4. Affine transforms: M @ [src; 1] = dst, one shared inverse for all people
+    src_h = np.vstack([np.asarray(src_pts, dtype=np.float64).T, np.ones(3)])
+    dst_pts = dst_pts.astype(np.float32)
+    M = dst_pts.transpose(0, 2, 1).astype(np.float64) @ np.linalg.inv(src_h)
+    return M, dst_pts
+
+
+def sticker_transform(
+    image_shape, src_pts, landmark_indices, results,
+    landmark_type="face", tip_offset=None
+):
+    """
+    Affine transform placing a sticker on one person's anchor landmarks.
+
+    Args: as sticker_transforms.
+
+    Returns:
+        tuple or None: (M, dst_pts) for the first person, or None when the landmarks are missing.
+    """
+    M, dst_pts = sticker_transforms(image_shape, src_pts, landmark_indices, results,
+                                    landmark_type, tip_offset)
+    if not len(M):
+        return None
+    return M[0], dst_pts[0]
+
+
+def warped_sticker(sticker_img, M, image_shape, cache_name=None, slot=0):
+    """
+    warp_affine_roi through LAYER_CACHE: with a cache_name, the last warp for
+    (cache_name, slot) is reused while the sticker's corners stay within the
+    cache tolerance.
+    """
+    if cache_name is None:
+        return warp_affine_roi(sticker_img, M, image_shape)
+    # Affine: no pixel moves further than the corners do
+    return LAYER_CACHE.layer((cache_name, slot, image_shape[:2]), affine_corners(sticker_img.shape, M),
+                             lambda: warp_affine_roi(sticker_img, M, image_shape))
+
+
+def sticker_layers(
+    image_shape, sticker_img,
+    src_pts, landmark_indices,
+    results,
+    landmark_type="face",
+    tip_offset=None,
+    cache_name=None
+):
+    """
+    Warp a sticker onto everyone's landmarks, each into its destination bounding box only.
+
+    Args: as sticker_transforms, plus
+        sticker_img (np.ndarray): Premultiplied BGRA sticker (see compositing.premultiply).
+        cache_name (str or None): Reuse warped layers across frames under this
+            name while the landmarks hold still (see layer_cache).
+
+    Returns:
+        list: One (patch, x, y) layer per person on screen, for compositing.
+    """
+    M, _ = sticker_transforms(image_shape, src_pts, landmark_indices, results,
+                              landmark_type, tip_offset)
+    layers = []
+    for i, m in enumerate(M):
+        layer = warped_sticker(sticker_img, m, image_shape, cache_name, i)
+        if layer is not None:
+            layers.append(layer)
+    return layers
+
+
 def overlay_sticker_from_landmarks(
     image, sticker_img,
     src_pts, landmark_indices,
     results,
     landmark_type="face",
     show_landmarks=False, landmarks_color=(0,255,0),
-    tip_offset=None
+    tip_offset=None,
+    cache_name=None
 ):
     """
-    Overlay a sticker onto the image using landmark indices.
+    Overlay a sticker onto the image using landmark indices, for every person.
 
     Args:
         image (np.ndarray): BGR frame.
-        sticker_img (np.ndarray): Sticker image (RGBA or BGR).
+        sticker_img (np.ndarray): Premultiplied BGRA sticker (see compositing.premultiply).
         src_pts (np.ndarray): 3x2 points on the sticker (base-left, base-right, tip).
         landmark_indices (list[int]): Landmark indices for the sticker anchors (2 or 3 points).
-        results: MediaPipe results object.
+        results: LandmarkBatch, LandmarkFrame (or MediaPipe results object).
         landmark_type (str): "face", "left_hand", "right_hand", "pose".
         show_landmarks (bool): Draw the destination points for debugging.
         landmarks_color (tuple): Color of landmark markers.
         tip_offset (tuple or None): (dx, dy) offset in pixels or normalized coordinates to compute tip outside head.
+        cache_name (str or None): Reuse the warped sticker across frames under
+            this name while the landmarks hold still (see layer_cache).
 
     Returns:
         np.ndarray: Image with sticker overlaid.
     """
-    # 1. Select landmarks
-    if landmark_type == "face":
-        if not results.face_landmarks:
-            return image
-        lm_list = results.face_landmarks.landmark
-    elif landmark_type == "left_hand":
-        if not results.left_hand_landmarks:
-            return image
-        lm_list = results.left_hand_landmarks.landmark
-    elif landmark_type == "right_hand":
-        if not results.right_hand_landmarks:
-            return image
-        lm_list = results.right_hand_landmarks.landmark
-    elif landmark_type == "pose":
-        if not results.pose_landmarks:
-            return image
-        lm_list = results.pose_landmarks.landmark
-    else:
-        raise ValueError("Invalid landmark_type")
+    transforms, all_dst_pts = sticker_transforms(image.shape, src_pts, landmark_indices, results,
+                                                 landmark_type, tip_offset)
+    for i, (M, dst_pts) in enumerate(zip(transforms, all_dst_pts)):
+        layer = warped_sticker(sticker_img, M, image.shape, cache_name, i)
+        if layer is not None:
+            composite(image, *layer)
 
-    h, w, _ = image.shape
-
-    # 2. Compute destination points
-    dst_pts = np.array([[lm_list[idx].x * w, lm_list[idx].y * h] for idx in landmark_indices], dtype=np.float32)
-
-    # 3. If 2 landmarks are provided, compute tip dynamically
-    if len(dst_pts) == 2:
-        p1, p2 = dst_pts
-        midpoint = (p1 + p2) / 2
-        if tip_offset is not None:
-            dx_factor, dy_factor = tip_offset
-            # Compute vector between points
-            vec = p2 - p1
-            distance = np.linalg.norm(vec)
-            # Move tip relative to distance
-            tip = midpoint + np.array([dx_factor * distance, dy_factor * distance])
-        else:
-            # Default: point outward along y-axis by 1.5x distance
-            scale = np.linalg.norm(p2 - p1) * 1.5
-            tip = midpoint + np.array([0, -scale])
-
-        dst_pts = np.vstack([dst_pts, tip])
-        dst_pts = np.array(dst_pts, dtype=np.float32).reshape(3, 2)
-
-    # 5. Sticker to BGRA
-    if sticker_img.shape[2] == 4:
-        sticker_bgra = sticker_img
-    else:
-        sticker_bgra = cv2.cvtColor(sticker_img, cv2.COLOR_BGR2BGRA)
-
-    # 6. Affine transform & warp
-    try:
-        M = cv2.getAffineTransform(np.float32(src_pts), dst_pts)
-        sticker_warped = cv2.warpAffine(sticker_bgra, M, (w, h),
-                                        flags=cv2.INTER_LINEAR,
-                                        borderMode=cv2.BORDER_CONSTANT,
-                                        borderValue=[0,0,0])
-    except cv2.error:
-        return image # when missing coords because no face
-
-    # 7. Overlay using alpha
-    alpha_mask = sticker_warped[:, :, 3] / 255.0
-    for c in range(3):
-        image[:, :, c] = (1 - alpha_mask) * image[:, :, c] + alpha_mask * sticker_warped[:, :, c]
-
-    # 4. Optional: draw landmarks
-    if show_landmarks:
-        for (x, y) in dst_pts.astype(int):
-            cv2.circle(image, (x, y), 3, landmarks_color, -1)
+        # Optional: draw landmarks
+        if show_landmarks:
+            for (x, y) in dst_pts.astype(int):
+                cv2.circle(image, (x, y), 3, landmarks_color, -1)
 
     return image
 
@@ -0,0 +1,203 @@
+"""
+Shared alpha compositing for every sticker overlay.
+
+Stickers are stored once as premultiplied BGRA uint8 (see `premultiply`), so
+warping interpolates colour and alpha together and blending reduces to
+
+    dst = src_rgb + dst * (255 - alpha) / 255
+
+evaluated on uint8 data with rounding, never in float. All work is restricted to the sticker's
+destination bounding box and written straight into the frame.
+"""
+import cv2
+import numpy as np
+
+from src.perf.buffers import scratch
+
+
+def to_bgra(img):
+    """Return img as BGRA uint8 (adds an opaque alpha channel to BGR input)."""
+    if img.shape[2] == 4:
+        return img
+    return cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
+
+
+def premultiply(img):
+    """
+    Convert a sticker (BGR or BGRA) to premultiplied BGRA uint8.
+
+    Args:
+        img (np.ndarray): Sticker image as loaded by cv2.imread(..., IMREAD_UNCHANGED).
+
+    Returns:
+        np.ndarray: New contiguous (h, w, 4) array with colour scaled by alpha.
+    """
+    bgra = to_bgra(img)
+    out = np.empty_like(bgra)
+    alpha = bgra[:, :, 3:4].astype(np.uint16)
+    t = bgra[:, :, :3] * alpha + 128
+    out[:, :, :3] = (t + (t >> 8)) >> 8
+    out[:, :, 3] = bgra[:, :, 3]
+    return out
+
+
+def blend_premultiplied(dst, src):
+    """
+    Blend a premultiplied BGRA patch into a BGR region, in place.
+
+    Args:
+        dst (np.ndarray): (h, w, 3) uint8 view into the frame.
+        src (np.ndarray): (h, w, 4) premultiplied BGRA uint8, same h, w.
+    """
+    # Temporaries live in this thread's workspace: no per-blend allocations
+    ws = scratch()
+    h, w = dst.shape[:2]
+    inv_alpha = cv2.bitwise_not(src[:, :, 3], dst=ws.get("blend_alpha", (h, w)))
+    inv_alpha3 = cv2.merge((inv_alpha, inv_alpha, inv_alpha), dst=ws.get("blend_alpha3", (h, w, 3)))
+    # dst * (255 - a) / 255, rounded, stays uint8 end to end
+    faded = cv2.multiply(dst, inv_alpha3, dst=ws.get("blend_faded", (h, w, 3)), scale=1 / 255)
+    # saturating add guards against interpolation pushing colour above alpha
+    src_bgr = cv2.cvtColor(src, cv2.COLOR_BGRA2BGR, dst=ws.get("blend_src", (h, w, 3)))
+    cv2.add(src_bgr, faded, dst=dst)
+
+
+def composite(image, patch, x, y):
+    """
+    Blend a premultiplied BGRA patch onto image with its top-left at (x, y).
+    The patch is clipped to the frame; nothing happens if it falls outside.
+
+    Returns:
+        np.ndarray: image (modified in place).
+    """
+    h, w = image.shape[:2]
+    ph, pw = patch.shape[:2]
+    x1, y1 = max(0, x), max(0, y)
+    x2, y2 = min(w, x + pw), min(h, y + ph)
+    if x2 <= x1 or y2 <= y1:
+        return image
+
+    blend_premultiplied(
+        image[y1:y2, x1:x2],
+        patch[y1 - y:y2 - y, x1 - x:x2 - x]
+    )
+    return image
+
+
+def affine_corners(sticker_shape, M):
+    """(4, 2) frame coords of a sticker's corners under the affine M."""
+    sh, sw = sticker_shape[:2]
+    corners = np.array([[0, 0], [sw, 0], [0, sh], [sw, sh]], dtype=np.float64)
+    return corners @ M[:, :2].T + M[:, 2]
+
+
+def warp_affine_roi(sticker, M, frame_shape, workspace=None, name=None):
+    """
+    Warp a premultiplied sticker into its destination bounding box only.
+
+    Args:
+        sticker (np.ndarray): Premultiplied BGRA sticker.
+        M (np.ndarray): 2x3 affine transform from sticker to frame coords.
+        frame_shape (tuple): Shape of the destination frame.
+        workspace (Workspace or None): Warp into workspace.get(name, ...)
+            instead of a new array.
+
+    Returns:
+        tuple or None: (patch, x, y) with the frame offset of the patch,
+        or None when the sticker lands outside the frame.
+    """
+    if not np.all(np.isfinite(M)):
+        return None
+
+    h, w = frame_shape[:2]
+    dst = affine_corners(sticker.shape, M)
+
+    x1 = max(0, int(np.floor(dst[:, 0].min())))
+    y1 = max(0, int(np.floor(dst[:, 1].min())))
+    x2 = min(w, int(np.ceil(dst[:, 0].max())) + 1)
+    y2 = min(h, int(np.ceil(dst[:, 1].max())) + 1)
+    if x2 <= x1 or y2 <= y1:
+        return None
+
+    # Shift the transform so the patch origin is the bbox corner
+    M_roi = np.array(M, dtype=np.float64)
+    M_roi[0, 2] -= x1
+    M_roi[1, 2] -= y1
+
+    out = None
+    if workspace is not None:
+        out = workspace.get(name, (y2 - y1, x2 - x1) + sticker.shape[2:], sticker.dtype)
+    patch = cv2.warpAffine(sticker, M_roi, (x2 - x1, y2 - y1), dst=out,
+                           flags=cv2.INTER_LINEAR,
+                           borderMode=cv2.BORDER_CONSTANT,
+                           borderValue=(0, 0, 0, 0))
+    return patch, x1, y1
+
+
+def overlay_affine(image, sticker, M):
+    """Warp a premultiplied sticker with M and blend it onto image in place."""
+    warped = warp_affine_roi(sticker, M, image.shape)
+    if warped is None:
+        return image
+    patch, x, y = warped
+    return composite(image, patch, x, y)
+
+
+MIP_MIN_SIZE = 16  # smallest side of the last mip level
+
+
+def mip_levels(sticker, min_size=MIP_MIN_SIZE):
+    """
+    A premultiplied sticker and its successive 2x INTER_AREA reductions,
+    largest first, down to `min_size` pixels on the shorter side.
+    """
+    levels = [sticker]
+    while min(levels[-1].shape[:2]) >= 2 * min_size:
+        h, w = levels[-1].shape[:2]
+        levels.append(cv2.resize(levels[-1], (w // 2, h // 2), interpolation=cv2.INTER_AREA))
+    return levels
+
+
+def resize_centered(sticker, cx, cy, width, height, scratch_name=None):
+    """
+    Resize a premultiplied sticker to (width, height), centred on (cx, cy).
+
+    Args:
+        sticker (np.ndarray or list): The sticker, or its mip_levels; then the
+            smallest level still at least (width, height) is resized, so the
+            cost follows the output size rather than the source size.
+        scratch_name (str or None): Resize into this thread's workspace buffer
+            of that name instead of a new array. The layer is then valid until
+            the next use of the name, so each layer of a pass needs its own.
+
+    Returns:
+        tuple or None: (patch, x, y) layer, or None for an empty size.
+    """
+    if width <= 0 or height <= 0:
+        return None
+    if isinstance(sticker, list):
+        levels = sticker
+        sticker = levels[0]
+        for level in levels[1:]:
+            if level.shape[1] < width or level.shape[0] < height:
+                break
+            sticker = level
+    dst = scratch().get(scratch_name, (height, width, 4)) if scratch_name else None
+    resized = cv2.resize(sticker, (width, height), dst=dst, interpolation=cv2.INTER_AREA)
+    return resized, cx - width // 2, cy - height // 2
+
+
+def overlay_centered(image, sticker, cx, cy, width, height):
+    """
+    Resize a premultiplied sticker to (width, height) and blend it centred on (cx, cy).
+    """
+    layer = resize_centered(sticker, cx, cy, width, height)
+    if layer is None:
+        return image
+    return composite(image, *layer)
+
+
+def composite_layers(image, layers):
+    """Blend a sequence of (patch, x, y) layers onto image in order, in place."""
+    for patch, x, y in layers:
+        composite(image, patch, x, y)
+    return image
@@ -0,0 +1,129 @@
+"""
+Temporal cache of warped sticker / mask layers.
+
+When someone holds still, their stickers land on the same pixels frame
+after frame. Each cached layer remembers the destination points it was
+warped for (sticker corners, mask mesh vertices) and its warped BGRA patch;
+while every point stays within `tolerance` pixels of those, the cached
+patch is blended again and the warp is skipped. The reference points are
+only updated on a re-warp, so slow drift still triggers one once it adds
+up to the tolerance.
+
+LAYER_CACHE is used from the compositing thread, which clears it when the
+pig level changes (src.assets.clear_cache clears it too). OINK_LAYER_TOLERANCE sets
+the tolerance in pixels; OINK_LAYER_CACHE=0 turns the cache off.
+"""
+import os
+
+import numpy as np
+
+from src.perf.buffers import Workspace
+
+DEFAULT_TOLERANCE = 0.5  # pixels
+
+
+class LayerCache:
+    """
+    Args:
+        tolerance (float): Largest point movement, in pixels, that reuses a layer.
+        enabled (bool): False always rebuilds (and counts nothing).
+    """
+
+    def __init__(self, tolerance=DEFAULT_TOLERANCE, enabled=True):
+        self.tolerance = tolerance
+        self.enabled = enabled
+        self._points = {}         # key -> destination points of the cached warp
+        self._layers = {}         # key -> [(patch, x, y), ...] ([] = warped off-frame)
+        self._patches = Workspace()  # cache-owned patch memory, one buffer per layer
+        self.hits = 0
+        self.misses = 0
+        self.by_name = {}         # key[0] -> [hits, misses]
+
+    def layer(self, key, points, build):
+        """
+        The layer for `key`, rebuilt only when `points` moved beyond the tolerance.
+
+        Args:
+            key (tuple): Identifies the layer; key[0] is the name used in
+                per-name counters, the rest tells layers apart (person slot,
+                frame shape, warp params).
+            points (np.ndarray): (N, 2) destination pixel points that
+                determine the warp.
+            build (callable): build() -> (patch, x, y) or None.
+
+        Returns:
+            tuple or None: (patch, x, y); a cached patch stays valid until the
+            key is rebuilt.
+        """
+        if not self.enabled:
+            return build()
+        layers = self.layers(key, points, lambda: [layer for layer in [build()] if layer is not None])
+        return layers[0] if layers else None
+
+    def layers(self, key, points, build):
+        """
+        Like layer(), for a builder that returns a list of layers to composite
+        in order (e.g. a mask warped in several depth layers).
+
+        Args:
+            build (callable): build() -> list of (patch, x, y).
+
+        Returns:
+            list: (patch, x, y) layers; cached patches stay valid until the
+            key is rebuilt.
+        """
+        if not self.enabled:
+            return build()
+        counts = self.by_name.get(key[0])
+        if counts is None:
+            counts = self.by_name[key[0]] = [0, 0]
+        points = np.asarray(points, dtype=np.float64)
+        ref = self._points.get(key)
+        if (ref is not None and ref.shape == points.shape
+                and np.abs(ref - points).max() <= self.tolerance):
+            self.hits += 1
+            counts[0] += 1
+            return self._layers[key]
+
+        self.misses += 1
+        counts[1] += 1
+        layers = []
+        for i, (patch, x, y) in enumerate(build()):
+            # The builder's patch may live in a scratch buffer: keep our own copy
+            own = self._patches.get((key, i), patch.shape, patch.dtype)
+            np.copyto(own, patch)
+            layers.append((own, x, y))
+        self._points[key] = points.copy()
+        self._layers[key] = layers
+        return layers
+
+    def clear(self):
+        """Drop every cached layer and free their patch memory."""
+        self._points.clear()
+        self._layers.clear()
+        self._patches = Workspace()
+
+    def reset_stats(self):
+        self.hits = self.misses = 0
+        self.by_name.clear()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "tolerance": self.tolerance,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+            "by_name": {name: {"hits": h, "misses": m} for name, (h, m) in self.by_name.items()},
+            "memory_bytes": self._patches.nbytes(),
+        }
+
+
+LAYER_CACHE = LayerCache(
+    tolerance=float(os.environ.get("OINK_LAYER_TOLERANCE", DEFAULT_TOLERANCE)),
+    enabled=os.environ.get("OINK_LAYER_CACHE", "1") not in ("", "0"),
+)
@@ -1,7 +1,28 @@
 import cv2
 import numpy as np
 import csv
-from scipy.spatial import Delaunay
+from functools import lru_cache
+
+from src.filters.compositing import premultiply, warp_affine_roi, composite_layers
+from src.filters.layer_cache import LAYER_CACHE
+from src.perf.buffers import scratch
+from src.vision.landmarks import LandmarkFrame
+
+# "triangles": one warpAffine + blend per triangle
+# "remap": one dense piecewise-affine remap + blend per overlap_depths layer
+MASK_WARP_BACKENDS = ("triangles", "remap")
+
+OVERLAP_EPS = 0.5  # pixels; destination triangles overlapping less than this only touch
+
+# Mask-space anchors for the extrapolated ears/neck (see compute_extra_landmarks)
+EXTRA_KEYS = ["ear_left", "ear_right", "neck_left", "neck_center", "neck_right"]
+EXTRA_PIG_POINTS = {
+    "ear_left":   (10, 0),
+    "ear_right":  (520, 40),
+    "neck_left":  (50, 600),
+    "neck_center": (250, 710),
+    "neck_right": (500, 600),
+}
 
 
 def load_mask_points(csv_path):
@@ -29,18 +50,14 @@ def compute_extra_landmarks(results, image_shape):
     Compute synthetic points (ears, neck) since FaceMesh has none.
     Returns dict of (x,y) in image coordinates.
     """
-    if not results.face_landmarks:
+    lf = LandmarkFrame.ensure(results, image_shape)
+    if not lf.has("face"):
         return {}
 
-    h, w, _ = image_shape
-    lm = results.face_landmarks.landmark
-
     # Jawline & temples for extrapolation
-    jaw_left  = np.array([lm[234].x * w, lm[234].y * h])
-    jaw_right = np.array([lm[454].x * w, lm[454].y * h])
-    chin      = np.array([lm[152].x * w, lm[152].y * h])
-    temple_left  = np.array([lm[127].x * w, lm[127].y * h])
-    temple_right = np.array([lm[356].x * w, lm[356].y * h])
+    jaw_left, jaw_right, chin, temple_left, temple_right = (
+        lf.gather("face", [234, 454, 152, 127, 356]).astype(np.float64)
+    )
 
     # Extrapolate ears outward
     ear_left  = temple_left  + 1.2 * (temple_left  - jaw_left)
@@ -60,90 +77,325 @@ def compute_extra_landmarks(results, image_shape):
     }
 
 
-def warp_mask_onto_face(frame_bgr, results, pig_mask_rgba, face_indices, mask_points):
+class MaskMesh:
     """
-    Warp pig mask (RGBA) onto face using triangulated landmarks.
+    Triangulated pig mask, built once per (mask, points CSV).
+
+    Holds everything that only depends on the mask: the Delaunay simplices,
+    each triangle's source bounding rect, the cropped premultiplied patch
+    with everything outside the triangle made transparent, and the inverse
+    source-triangle matrices. Per frame only the destination affine
+    transforms and the blends remain.
     """
-    if not results.face_landmarks:
-        return frame_bgr
 
-    h, w, _ = frame_bgr.shape
-    lm = results.face_landmarks.landmark
-
-    # Base points (from mediapipe indices)
-    dst_points = []
-    for idx in face_indices:
-        dst_points.append((lm[idx].x * w, lm[idx].y * h))
-    dst_points = list(dst_points)
-    mask_points = list(mask_points)
-
-    # Add extrapolated ears/neck
-    extras = compute_extra_landmarks(results, frame_bgr.shape)
-    if extras:
-        extra_pig_points = {
-            "ear_left":   (10, 0),
-            "ear_right":  (520, 40),
-            "neck_left":  (50, 600),
-            "neck_center": (250, 710),
-            "neck_right": (500, 600),
+    # Triangles are rasterized slightly larger so neighbours overlap instead of leaving seams
+    EDGE_PAD = 2
+
+    def __init__(self, mask_bgra, face_indices, mask_points):
+        """
+        Args:
+            mask_bgra (np.ndarray): Premultiplied BGRA pig mask.
+            face_indices (list[int]): FaceMesh landmark index per mask point.
+            mask_points (np.ndarray): (N, 2) annotated points in mask coords.
+        """
+        # scipy is only needed to build a mesh, not to load one from the asset cache
+        from scipy.spatial import Delaunay
+
+        self.mask = mask_bgra
+        self.face_indices = np.asarray(face_indices, dtype=np.intp)
+        extra = np.array([EXTRA_PIG_POINTS[k] for k in EXTRA_KEYS], dtype=np.float32)
+        self.mask_points = np.vstack([np.asarray(mask_points, dtype=np.float32), extra])
+        self.simplices = Delaunay(self.mask_points).simplices
+
+        mh, mw = mask_bgra.shape[:2]
+        self.src_rects = []
+        self.patches = []
+        src_h = np.ones((len(self.simplices), 3, 3), dtype=np.float64)
+
+        for i, simplex in enumerate(self.simplices):
+            tri = self.mask_points[simplex]
+            x, y, w, h = cv2.boundingRect(np.float32([tri]))
+            x1, y1 = max(0, x - self.EDGE_PAD), max(0, y - self.EDGE_PAD)
+            x2, y2 = min(mw, x + w + self.EDGE_PAD), min(mh, y + h + self.EDGE_PAD)
+            tri_rect = tri - np.array([x1, y1], dtype=np.float32)
+
+            # Rasterize the (slightly dilated) triangle once and cut it out of the mask
+            tri_mask = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+            pts = np.int32(np.round(tri_rect))
+            cv2.fillConvexPoly(tri_mask, pts, 255)
+            cv2.polylines(tri_mask, [pts], True, 255, thickness=self.EDGE_PAD)
+            patch = cv2.bitwise_and(mask_bgra[y1:y2, x1:x2], mask_bgra[y1:y2, x1:x2], mask=tri_mask)
+
+            self.src_rects.append((x1, y1, x2 - x1, y2 - y1))
+            self.patches.append(patch)
+            src_h[i, :2, :] = tri_rect.T
+
+        # M = dst_tri @ inv([src_tri; 1]) maps patch coords to frame coords
+        self.src_inv = np.linalg.inv(src_h)
+        # Source triangles in whole-mask coords, (T, 2, 3), for the remap backend
+        self.src_tris = self.mask_points[self.simplices].transpose(0, 2, 1).astype(np.float64)
+
+    def to_arrays(self):
+        """Everything the mesh precomputes, as a flat {name: array} dict (see from_arrays)."""
+        return {
+            "mask": self.mask,
+            "face_indices": self.face_indices,
+            "mask_points": self.mask_points,
+            "simplices": self.simplices,
+            "src_rects": np.array(self.src_rects, dtype=np.int32).reshape(-1, 4),
+            "patch_data": np.concatenate([p.ravel() for p in self.patches]),
+            "src_inv": self.src_inv,
+            "src_tris": self.src_tris,
         }
 
-        for key in ["ear_left", "ear_right", "neck_left", "neck_center", "neck_right"]:
-            dst_points.append(extras[key])
-            mask_points.append(extra_pig_points[key])
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild a mesh from to_arrays() output without triangulating or cutting patches again."""
+        mesh = cls.__new__(cls)
+        mesh.mask = arrays["mask"]
+        mesh.face_indices = np.asarray(arrays["face_indices"], dtype=np.intp)
+        mesh.mask_points = np.asarray(arrays["mask_points"])
+        mesh.simplices = np.asarray(arrays["simplices"])
+        mesh.src_rects = [tuple(int(v) for v in rect) for rect in arrays["src_rects"]]
+        mesh.patches = []
+        offset = 0
+        for _, _, w, h in mesh.src_rects:
+            size = h * w * 4
+            mesh.patches.append(arrays["patch_data"][offset:offset + size].reshape(h, w, 4))
+            offset += size
+        mesh.src_inv = np.asarray(arrays["src_inv"])
+        mesh.src_tris = np.asarray(arrays["src_tris"])
+        return mesh
 
-    dst_points = np.array(dst_points, dtype=np.float32)
-    mask_points = np.array(mask_points, dtype=np.float32)
+    def dst_points(self, results, image_shape):
+        """Destination pixel coords for every mesh vertex (face landmarks + extras)."""
+        lf = LandmarkFrame.ensure(results, image_shape)
+        base = lf.gather("face", self.face_indices).astype(np.float64)
+        extras = compute_extra_landmarks(lf, image_shape)
+        extra = np.array([extras[k] for k in EXTRA_KEYS], dtype=np.float64)
+        return np.vstack([base, extra])
 
-    # Triangulate on mask coordinates
-    tri = Delaunay(mask_points)
-    frame_out = frame_bgr.copy()
+    def affine_transforms(self, dst_points):
+        """All per-triangle 2x3 patch-to-frame transforms in one batched product."""
+        dst_tris = dst_points[self.simplices].transpose(0, 2, 1)  # (T, 2, 3)
+        return dst_tris @ self.src_inv
 
-    for simplex in tri.simplices:
-        src_tri = mask_points[simplex]
-        dst_tri = dst_points[simplex]
-        frame_out = warp_triangle(pig_mask_rgba, frame_out, src_tri, dst_tri)
+    def triangle_layers(self, dst_points, image_shape, slot=0):
+        """
+        One warped (patch, x, y) layer per triangle, each within its own bbox.
+        Like remap_layers, the patches live in this thread's workspace.
+        """
+        layers = []
+        ws = scratch()
+        for i, (patch, M) in enumerate(zip(self.patches, self.affine_transforms(dst_points))):
+            layer = warp_affine_roi(patch, M, image_shape, ws, f"mesh_tri/{slot}/{i}")
+            if layer is not None:
+                layers.append(layer)
+        return layers
 
-    return frame_out
+    def overlap_depths(self, dst_points):
+        """
+        Depth layer per triangle, so that no two triangles of one layer overlap.
 
+        Extrapolated ear / neck vertices fold parts of the mesh over itself.
+        The triangles backend draws overlapping triangles one over the other;
+        a remap can only sample one triangle per pixel, so each triangle goes
+        one layer above every earlier triangle it overlaps and the layers are
+        composited in order. Per pixel that keeps the triangle order.
 
-def warp_triangle(src_rgba, dst_bgr, src_tri, dst_tri):
-    """
-    Warp triangular region of RGBA image onto BGR frame.
-    """
-    r1 = cv2.boundingRect(np.float32([src_tri]))
-    r2 = cv2.boundingRect(np.float32([dst_tri]))
+        Returns:
+            np.ndarray: (T,) int depth, 0 for the base layer.
+        """
+        # Separating axis test for every pair, on the edge normals of both triangles
+        tris = dst_points[self.simplices]                    # (T, 3, 2)
+        edges = np.roll(tris, -1, axis=1) - tris
+        normals = np.stack([-edges[..., 1], edges[..., 0]], axis=-1)
+        length = np.linalg.norm(normals, axis=-1, keepdims=True)
+        normals = normals / np.where(length > 0, length, 1)
+        n = len(tris)
+        # proj[a, k, b, v]: vertex v of triangle b on edge normal k of triangle a
+        proj = (normals.reshape(-1, 2) @ tris.reshape(-1, 2).T).reshape(n, 3, n, 3)
+        lo, hi = proj.min(axis=3), proj.max(axis=3)
+        idx = np.arange(n)
+        own_lo, own_hi = lo[idx, :, idx][:, :, None], hi[idx, :, idx][:, :, None]
+        eps = OVERLAP_EPS
+        apart = ((own_hi <= lo + eps) | (hi <= own_lo + eps)).any(axis=1)
+        overlap = ~(apart | apart.T)
+        overlap[idx, idx] = False
+
+        depth = np.zeros(n, dtype=np.intp)
+        for i in np.flatnonzero(overlap.any(axis=1)):
+            earlier = overlap[i, :i]
+            if earlier.any():
+                depth[i] = depth[:i][earlier].max() + 1
+        return depth
+
+    def remap_maps(self, dst_points, image_shape, tris=None):
+        """
+        Rasterize the destination mesh into cv2.remap maps over the face bbox.
 
-    src_rect = src_rgba[r1[1]:r1[1]+r1[3], r1[0]:r1[0]+r1[2]]
-    src_tri_rect = src_tri - np.array([r1[0], r1[1]])
-    dst_tri_rect = dst_tri - np.array([r2[0], r2[1]])
+        Every bbox pixel gets the label of the triangle covering it, and that
+        triangle's inverse affine (frame -> mask, i.e. barycentric
+        interpolation of the source vertices) gives its sample position.
+        Uncovered pixels map outside the mask and come out transparent.
 
-    M = cv2.getAffineTransform(np.float32(src_tri_rect), np.float32(dst_tri_rect))
-    warped = cv2.warpAffine(src_rect, M, (r2[2], r2[3]),
-                            flags=cv2.INTER_LINEAR,
-                            borderMode=cv2.BORDER_REFLECT_101)
+        Args:
+            tris (np.ndarray or None): Indices of the triangles to rasterize
+                (one overlap_depths layer); None = all of them.
 
-    # mask for blending
-    mask = np.zeros((r2[3], r2[2], 4), dtype=np.uint8)
-    cv2.fillConvexPoly(mask, np.int32(dst_tri_rect), (255, 255, 255, 255))
+        Returns:
+            tuple or None: (map_x, map_y, x, y) with the bbox offset,
+            or None when the face is entirely off-frame. The maps live in this
+            thread's workspace (valid until the next call on the thread).
+        """
+        h, w = image_shape[:2]
+        if tris is None:
+            tris = np.arange(len(self.simplices))
+        used = dst_points[self.simplices[tris]].reshape(-1, 2)
+        x1 = max(0, int(np.floor(used[:, 0].min())))
+        y1 = max(0, int(np.floor(used[:, 1].min())))
+        x2 = min(w, int(np.ceil(used[:, 0].max())) + 1)
+        y2 = min(h, int(np.ceil(used[:, 1].max())) + 1)
+        if x2 <= x1 or y2 <= y1:
+            return None
 
-    warped_masked = cv2.bitwise_and(warped, mask)
+        # Triangle label per pixel (0 = outside the mesh), sub-pixel vertex precision
+        ws = scratch()
+        bh, bw = y2 - y1, x2 - x1
+        local = dst_points - (x1, y1)
+        label_type = np.uint8 if len(self.simplices) < 255 else np.uint16
+        labels = ws.get("mesh_labels", (bh, bw), label_type)
+        labels.fill(0)
+        fixed = np.int32(np.round(local * 16))
+        for i in tris:
+            cv2.fillConvexPoly(labels, fixed[self.simplices[i]], int(i) + 1,
+                               lineType=cv2.LINE_8, shift=4)
 
-    # extract ROI from destination
-    roi = dst_bgr[r2[1]:r2[1]+r2[3], r2[0]:r2[0]+r2[2]]
+        # Per-triangle inverse affine, bbox coords -> mask coords; row 0 sends pixels off-mask
+        dst_h = np.ones((len(self.simplices), 3, 3), dtype=np.float64)
+        dst_h[:, :2, :] = local[self.simplices].transpose(0, 2, 1)
+        try:
+            inv = self.src_tris @ np.linalg.inv(dst_h)
+        except np.linalg.LinAlgError:
+            return None  # degenerate (collapsed) destination triangle
+        coeffs = np.zeros((6, len(self.simplices) + 1), dtype=np.float32)
+        coeffs[2, 0] = coeffs[5, 0] = -1
+        coeffs[:, 1:] = inv.reshape(-1, 6).T
 
-    # alpha blend
-    alpha = warped_masked[..., 3:] / 255.0
+        # map = a * x + b * y + c with (a, b, c) looked up per pixel, in workspace buffers.
+        # uint8 labels go through cv2.LUT (np.take would allocate intp indices per pixel).
+        xs = np.arange(bw, dtype=np.float32)[None, :]
+        ys = np.arange(bh, dtype=np.float32)[:, None]
+        tmp = ws.get("mesh_tmp", (bh, bw), np.float32)
+        if label_type == np.uint8:
+            tables = np.zeros((6, 1, 256), dtype=np.float32)
+            tables[:, 0, :coeffs.shape[1]] = coeffs
+            lookup = lambda row, out: cv2.LUT(labels, tables[row], dst=out)
+        else:
+            lookup = lambda row, out: np.take(coeffs[row], labels, out=out)
+        maps = []
+        for row, name in ((0, "mesh_map_x"), (3, "mesh_map_y")):
+            out = lookup(row, ws.get(name, (bh, bw), np.float32))
+            out *= xs
+            tmp = lookup(row + 1, tmp)
+            tmp *= ys
+            out += tmp
+            out += lookup(row + 2, tmp)
+            maps.append(out)
+        map_x, map_y = maps
+        return map_x, map_y, x1, y1
 
-    # ensure same size
-    h = min(roi.shape[0], warped_masked.shape[0])
-    w = min(roi.shape[1], warped_masked.shape[1])
+    def remap_layers(self, dst_points, image_shape, scale=1.0, slot=0):
+        """
+        The mask sampled through one remap per overlap_depths layer: a list
+        of (patch, x, y) layers to composite in order.
+        The patches live in this thread's workspace and are valid until the
+        next remap_layers call with the same `slot` on the thread (composite
+        them before warping again).
 
-    roi_c = roi[:h, :w]
-    warped_rgb_c = warped_masked[:h, :w, :3]
-    alpha_c = alpha[:h, :w]
+        Args:
+            scale (float): Build the maps and warp at this fraction of the
+                frame resolution, then upscale the patch (cheaper, softer).
+            slot (int): Patch buffers to use; give each face of one pass its own.
+        """
+        h, w = image_shape[:2]
+        if scale != 1.0:
+            small = (max(1, round(h * scale)), max(1, round(w * scale)))
+            points, shape = dst_points * scale, small
+        else:
+            points, shape = dst_points, image_shape
+        depths = self.overlap_depths(dst_points)
+        layers = []
+        for depth in range(depths.max() + 1):
+            maps = self.remap_maps(points, shape, np.flatnonzero(depths == depth))
+            if maps is None:
+                continue
+            map_x, map_y, x, y = maps
+            patch = cv2.remap(self.mask, map_x, map_y,
+                              dst=scratch().get(f"mesh_patch/{slot}/{depth}", map_x.shape + (4,)),
+                              interpolation=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_CONSTANT,
+                              borderValue=(0, 0, 0, 0))
+            if scale != 1.0:
+                # Back to frame pixels; premultiplied, so resizing keeps edges clean
+                ph, pw = patch.shape[:2]
+                x, y = int(round(x / scale)), int(round(y / scale))
+                size = (min(w - x, max(1, round(pw / scale))), min(h - y, max(1, round(ph / scale))))
+                if size[0] < 1 or size[1] < 1:
+                    continue
+                patch = cv2.resize(patch, size, interpolation=cv2.INTER_LINEAR,
+                                   dst=scratch().get(f"mesh_patch_full/{slot}/{depth}",
+                                                     (size[1], size[0], 4)))
+            layers.append((patch, x, y))
+        return layers
 
-    roi[:h, :w] = (roi_c * (1 - alpha_c) + warped_rgb_c * alpha_c).astype(np.uint8)
+    def layers(self, dst_points, image_shape, backend="triangles", scale=1.0, slot=0,
+               cache_name=None):
+        """
+        Warped mask layers for one of MASK_WARP_BACKENDS (`scale` applies to "remap").
+
+        Args:
+            cache_name (str or None): Reuse the last warp of (cache_name, slot)
+                while every mesh vertex stays within the LAYER_CACHE tolerance.
+        """
+        if backend == "remap":
+            build = lambda: self.remap_layers(dst_points, image_shape, scale, slot)
+        elif backend == "triangles":
+            build = lambda: self.triangle_layers(dst_points, image_shape, slot)
+        else:
+            raise ValueError(f"Invalid mask warp backend: {backend}")
+        if cache_name is None:
+            return build()
+        return LAYER_CACHE.layers((cache_name, slot, image_shape[:2], backend, scale), dst_points,
+                                  build)
+
+
+@lru_cache(maxsize=None)
+def load_mask_mesh(mask_path, csv_path):
+    """
+    Build (once) the MaskMesh for a mask PNG and its MakeSense points CSV at
+    arbitrary paths. Assets shipped in assets/stickers should go through
+    src.assets.mask_mesh, which also caches the built mesh on disk.
+    """
+    mask = premultiply(cv2.imread(mask_path, cv2.IMREAD_UNCHANGED))
+    face_indices, mask_points = load_mask_points(csv_path)
+    return MaskMesh(mask, face_indices, mask_points)
+
+
+def warp_mask_onto_face(frame_bgr, results, mesh, backend="triangles", cache_name=None):
+    """
+    Warp the pig mask onto the face using a prebuilt MaskMesh.
+    Draws in place on frame_bgr.
+
+    Args:
+        backend (str): One of MASK_WARP_BACKENDS.
+        cache_name (str or None): Reuse the warped mask across frames under
+            this name while the face holds still (see layer_cache).
+    """
+    lf = LandmarkFrame.ensure(results, frame_bgr.shape)
+    if not lf.has("face"):
+        return frame_bgr
 
-    dst_bgr[r2[1]:r2[1]+r2[3], r2[0]:r2[0]+r2[2]] = roi
-    return dst_bgr
+    dst_points = mesh.dst_points(lf, frame_bgr.shape)
+    return composite_layers(frame_bgr, mesh.layers(dst_points, frame_bgr.shape, backend,
+                                                   cache_name=cache_name))
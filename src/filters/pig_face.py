@@ -1,11 +1,12 @@
-import cv2
 import numpy as np
-from src.filters.base import overlay_sticker_from_landmarks
+from src.assets import sticker
+from src.filters.base import sticker_layers
+from src.filters.registry import register_filter, as_image_filter
 
-# Load stickers
-pig_nose_img = cv2.imread("assets/stickers/pig_nose.png", cv2.IMREAD_UNCHANGED)
-pig_ear_left_img = cv2.imread("assets/stickers/pig_ear_left.png", cv2.IMREAD_UNCHANGED)
-pig_ear_right_img = cv2.imread("assets/stickers/pig_ear_right.png", cv2.IMREAD_UNCHANGED)
+# Stickers (premultiplied BGRA, loaded on first use by src.assets)
+pig_nose_png = "pig_nose.png"
+pig_ear_left_png = "pig_ear_left.png"
+pig_ear_right_png = "pig_ear_right.png"
 
 # Sticker configs
 pig_nose_src_pts = np.array([[70,0],[0, 60],[140,60]])  
@@ -17,25 +18,27 @@ pig_ear_left_landmarks = [127, 54]
 pig_ear_right_src_pts = np.array([[0,90],[80,165],[190,20]])
 pig_ear_right_landmarks = [284, 356]
 
-def pig_nose_filter(image, results):
-    if not results.face_landmarks:
-        return image
-    return overlay_sticker_from_landmarks(
-        image, pig_nose_img, pig_nose_src_pts, pig_nose_landmarks, results, "face"
+@register_filter("pig_nose", needs=("face",))
+def pig_nose_layers(people, image_shape):
+    return sticker_layers(
+        image_shape, sticker(pig_nose_png), pig_nose_src_pts, pig_nose_landmarks, people, "face",
+        cache_name="pig_nose"
     )
 
-def pig_ear_left_filter(image, results):
-    if not results.face_landmarks:
-        return image
-    return overlay_sticker_from_landmarks(
-        image, pig_ear_left_img, pig_ear_left_src_pts, pig_ear_left_landmarks,
-        results, "face", tip_offset=(-1.5, -0.5)
+@register_filter("pig_ear_left", needs=("face",))
+def pig_ear_left_layers(people, image_shape):
+    return sticker_layers(
+        image_shape, sticker(pig_ear_left_png), pig_ear_left_src_pts, pig_ear_left_landmarks,
+        people, "face", tip_offset=(-1.5, -0.5), cache_name="pig_ear_left"
     )
 
-def pig_ear_right_filter(image, results):
-    if not results.face_landmarks:
-        return image
-    return overlay_sticker_from_landmarks(
-        image, pig_ear_right_img, pig_ear_right_src_pts, pig_ear_right_landmarks,
-        results, "face", tip_offset=(1.5, -0.5)
+@register_filter("pig_ear_right", needs=("face",))
+def pig_ear_right_layers(people, image_shape):
+    return sticker_layers(
+        image_shape, sticker(pig_ear_right_png), pig_ear_right_src_pts, pig_ear_right_landmarks,
+        people, "face", tip_offset=(1.5, -0.5), cache_name="pig_ear_right"
     )
+
+pig_nose_filter = as_image_filter("pig_nose")
+pig_ear_left_filter = as_image_filter("pig_ear_left")
+pig_ear_right_filter = as_image_filter("pig_ear_right")
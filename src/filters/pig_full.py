@@ -1,10 +1,21 @@
-import cv2
-from src.filters.mask_warp import load_mask_points, warp_mask_onto_face
+from src.assets import mask_mesh
+from src.filters.registry import register_filter, as_image_filter
 
-PIG_MASK = cv2.imread("assets/stickers/pig_full.png", cv2.IMREAD_UNCHANGED)
-FACE_INDICES, MASK_POINTS = load_mask_points("assets/stickers/pig_full_points.csv")
 
-def pig_full_filter(image, results):
-    if not results.face_landmarks:
-        return image
-    return warp_mask_onto_face(image, results, PIG_MASK, FACE_INDICES, MASK_POINTS)
\ No newline at end of file
+def pig_mesh():
+    """The pig mask mesh (built, or loaded from the asset cache, on first use)."""
+    return mask_mesh("pig_full.png", "pig_full_points.csv")
+
+
+@register_filter("pig_full", needs=("face",))
+def pig_full_layers(people, image_shape, backend="triangles", warp_scale=1.0):
+    mesh = pig_mesh()
+    layers = []
+    # One warp per face, each bounded by that face's box, reused while the face holds still
+    for i, person in enumerate(people.with_set("face")):
+        dst_points = mesh.dst_points(person, image_shape)
+        layers.extend(mesh.layers(dst_points, image_shape, backend, warp_scale, slot=i,
+                                  cache_name="pig_full"))
+    return layers
+
+pig_full_filter = as_image_filter("pig_full")
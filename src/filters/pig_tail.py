@@ -1,43 +1,48 @@
-import cv2
 import numpy as np
 
-# Load pig tail PNG (RGBA)
-pig_tail_img = cv2.imread("assets/stickers/pig_tail.png", cv2.IMREAD_UNCHANGED)
+from src.assets import sticker_mips
+from src.filters.compositing import resize_centered
+from src.filters.registry import register_filter, as_image_filter
+
+# Pig tail sticker (premultiplied BGRA, loaded on first use by src.assets)
+pig_tail_png = "pig_tail.png"
 
 # Use left & right hip landmarks
 hip_landmarks = [23, 24]
 
 
-def is_back_view(lm_list):
+def is_back_view(lf):
 
     backview = False # so front view
 
-    left_shoulder = lm_list[11]  # x,y normalized
-    right_shoulder = lm_list[12]
-    left_hip = lm_list[23]
-    right_hip = lm_list[24]
+    xs = lf.xyz["pose"][:, 0]  # x normalized
+    vis = lf.visibility["pose"]
+    left_shoulder, right_shoulder = 11, 12
+    left_hip, right_hip = 23, 24
 
-    if left_shoulder.visibility > 0.5 and right_shoulder.visibility > 0.5:
-        if left_shoulder.x < right_shoulder.x:
+    if vis[left_shoulder] > 0.5 and vis[right_shoulder] > 0.5:
+        if xs[left_shoulder] < xs[right_shoulder]:
             backview = True
-    elif left_hip.visibility > 0.5 and right_hip.visibility > 0.5:
-        if left_hip.x < right_hip.x:
+    elif vis[left_hip] > 0.5 and vis[right_hip] > 0.5:
+        if xs[left_hip] < xs[right_hip]:
             backview = True
     return backview
 
 
-def pig_tail_filter(image, results):
-    if not results.pose_landmarks:
-        return image
+@register_filter("pig_tail", needs=("pose",))
+def pig_tail_layers(people, image_shape):
+    pig_tail_mips = sticker_mips(pig_tail_png)
+    pig_tail_img = pig_tail_mips[0]
 
-    h, w, _ = image.shape
-    lm_list = results.pose_landmarks.landmark
+    # Hip landmarks in pixels for everyone at once, (people, 2, 2)
+    hips = people.gather("pose", hip_landmarks).astype(int)
 
-    if is_back_view(lm_list):
+    layers = []
+    for i, (person, ((x1, y1), (x2, y2))) in enumerate(zip(people.with_set("pose"), hips)):
+        if not is_back_view(person):
+            continue
 
         # Compute hip center in pixels
-        x1, y1 = int(lm_list[hip_landmarks[0]].x * w), int(lm_list[hip_landmarks[0]].y * h)
-        x2, y2 = int(lm_list[hip_landmarks[1]].x * w), int(lm_list[hip_landmarks[1]].y * h)
         cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
 
         # Scale tail width to hip distance
@@ -46,33 +51,12 @@ def pig_tail_filter(image, results):
 
         tail_h = int(pig_tail_img.shape[0] * scale)
         tail_w = int(pig_tail_img.shape[1] * scale)
-        tail_resized = cv2.resize(pig_tail_img, (tail_w, tail_h), interpolation=cv2.INTER_AREA)
-
-        # Compute top-left corner to center on hip
-        x_offset = cx - tail_w // 2
-        y_offset = cy - tail_h // 2
-
-        # Overlay PNG with alpha
-        for c in range(3):  # RGB channels
-            alpha = tail_resized[:, :, 3] / 255.0
-            y1_clip = max(0, y_offset)
-            y2_clip = min(h, y_offset + tail_h)
-            x1_clip = max(0, x_offset)
-            x2_clip = min(w, x_offset + tail_w)
-
-            # Check if there is anything to overlay
-            if y2_clip <= y1_clip or x2_clip <= x1_clip:
-                return image  # nothing to draw
-
-            tail_crop = tail_resized[
-                y1_clip - y_offset : y2_clip - y_offset,
-                x1_clip - x_offset : x2_clip - x_offset
-            ]
-
-            alpha_crop = tail_crop[:, :, 3] / 255.0
-            image[y1_clip:y2_clip, x1_clip:x2_clip, c] = (
-                (1 - alpha_crop) * image[y1_clip:y2_clip, x1_clip:x2_clip, c] +
-                alpha_crop * tail_crop[:, :, c]
-            )
-
-    return image
+
+        # Centered on hip; each person's layer needs its own scratch buffer
+        layer = resize_centered(pig_tail_mips, cx, cy, tail_w, tail_h, f"layer/pig_tail/{i}")
+        if layer is not None:
+            layers.append(layer)
+    return layers
+
+
+pig_tail_filter = as_image_filter("pig_tail")
@@ -1,11 +1,51 @@
+from functools import lru_cache
+
 import cv2
 import numpy as np
 
-def pig_vision_filter(image, intensity=0.2, blur_ksize=3):
+from src.filters.registry import register_filter
+
+# Max abs difference (grey levels) between the uint8 fast path and the float path
+FAST_PATH_TOLERANCE = 2
+
+
+@lru_cache(maxsize=32)
+def _red_lut(intensity):
+    """(1, 256, 3) LUT: B and G unchanged, R scaled by intensity and clipped."""
+    lut = np.empty((1, 256, 3), dtype=np.uint8)
+    ramp = np.arange(256, dtype=np.float32)
+    lut[0, :, 0] = ramp
+    lut[0, :, 1] = ramp
+    lut[0, :, 2] = np.clip(np.rint(ramp * intensity), 0, 255)
+    return lut
+
+
+def pig_vision_filter(image, intensity=0.2, blur_ksize=3, dst=None, precise=False):
     """
     Mimic pig vision: enhance red/pink hues, reduce other colors.
     intensity: 0..1, how strong the effect is
+    dst: optional uint8 output buffer (may be `image` itself to work in place)
+    precise: use the original float32 path instead of the uint8 LUT path
+
+    The uint8 path matches the float path to within FAST_PATH_TOLERANCE.
     """
+    if precise:
+        pig_img = _pig_vision_float(image, intensity, blur_ksize)
+        if dst is None:
+            return pig_img
+        dst[...] = pig_img
+        return dst
+
+    # Reduce red perception through a 256-entry LUT, straight on uint8 data
+    out = cv2.LUT(image, _red_lut(float(intensity)), dst=dst)
+
+    # Slight blur to simulate near-sightedness, in the same buffer
+    if blur_ksize > 1:
+        cv2.GaussianBlur(out, (blur_ksize, blur_ksize), 0, dst=out)
+    return out
+
+
+def _pig_vision_float(image, intensity=0.2, blur_ksize=3):
     img = image.astype(np.float32) / 255.0
 
     # Split channels
@@ -29,3 +69,8 @@ def pig_vision_filter(image, intensity=0.2, blur_ksize=3):
 
     pig_img = np.clip(pig_img * 255, 0, 255).astype(np.uint8)
     return pig_img
+
+
+@register_filter("pig_vision", output="frame")
+def pig_vision_step(image, people, intensity=0.2, blur_ksize=3):
+    return pig_vision_filter(image, intensity, blur_ksize, dst=image)
@@ -0,0 +1,150 @@
+"""
+Declarative filter registry and compiled per-level pipelines.
+
+Filters register a name, the landmark sets they need and their output kind:
+
+    "roi"   fn(people, image_shape, **params) -> list of (patch, x, y) layers
+            (premultiplied BGRA patches, see compositing)
+    "frame" fn(image, people, **params) -> image (whole-frame effects)
+
+`people` is a LandmarkBatch (one LandmarkFrame per person; a single person
+in the default mode). ROI filters return the layers of everyone at once,
+so each ROI group is one composite pass however many people are in frame.
+
+A level config (assets/config/levels.json) maps each pig level to a list of
+filter names, or {"filter": name, **params} entries. Each level is compiled
+once into a LevelPlan: adjacent ROI filters are merged into one composite
+pass, and steps whose landmarks are missing are skipped before any work.
+"""
+import json
+
+from src.filters.compositing import composite_layers
+from src.perf.timing import PROFILER
+from src.vision.landmarks import LandmarkBatch
+
+FILTER_OUTPUTS = ("roi", "frame")
+FILTERS = {}
+
+
+class FilterSpec:
+    __slots__ = ("name", "fn", "needs", "output")
+
+    def __init__(self, name, fn, needs, output):
+        self.name = name
+        self.fn = fn
+        self.needs = needs
+        self.output = output
+
+
+def register_filter(name, needs=(), output="roi"):
+    """
+    Register a filter under `name`.
+
+    Args:
+        needs (tuple[str]): Landmark sets read: "pose", "face", "left_hand", "right_hand".
+        output (str): "roi" (returns layers) or "frame" (returns the image).
+    """
+    if output not in FILTER_OUTPUTS:
+        raise ValueError(f"Invalid filter output: {output}")
+
+    def decorate(fn):
+        if name in FILTERS:
+            raise ValueError(f"Filter already registered: {name}")
+        FILTERS[name] = FilterSpec(name, fn, frozenset(needs), output)
+        return fn
+    return decorate
+
+
+def as_image_filter(name):
+    """A plain filter(image, results, **params) -> image for a registered filter."""
+    # Compiled once; per-call params go in as overrides of the (empty) step params
+    plan = LevelPlan([Step(FILTERS[name], {})])
+
+    def image_filter(image, results, **params):
+        return plan.run(image, results, {name: params} if params else None)
+
+    image_filter.__name__ = name + "_filter"
+    return image_filter
+
+
+class Step:
+    __slots__ = ("spec", "params", "label")
+
+    def __init__(self, spec, params):
+        self.spec = spec
+        self.params = params
+        self.label = "filter/" + spec.name  # profiler section name
+
+    def ready(self, people):
+        return all(people.has(name) for name in self.spec.needs)
+
+    def params_with(self, overrides):
+        if not overrides or self.spec.name not in overrides:
+            return self.params
+        return {**self.params, **overrides[self.spec.name]}
+
+
+class LevelPlan:
+    """A compiled, branch-free sequence of filter steps for one pig level."""
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.needs = frozenset().union(*(step.spec.needs for step in steps))
+
+        # Merge runs of adjacent ROI steps into a single composite pass
+        self.groups = []
+        for step in steps:
+            if self.groups and step.spec.output == "roi" and self.groups[-1][0] == "roi":
+                self.groups[-1][1].append(step)
+            else:
+                self.groups.append((step.spec.output, [step]))
+
+    def run(self, image, results, overrides=None):
+        """
+        Args:
+            overrides (dict or None): {filter name: {param: value}} applied on
+                top of the configured params (e.g. by the quality governor).
+        """
+        if not self.steps:
+            return image
+        people = LandmarkBatch.ensure(results, image.shape)
+
+        for output, steps in self.groups:
+            ready = [step for step in steps if step.ready(people)]
+            if output == "roi":
+                layers = []
+                for step in ready:
+                    with PROFILER.section(step.label):
+                        layers.extend(step.spec.fn(people, image.shape, **step.params_with(overrides)))
+                with PROFILER.section("composite"):
+                    composite_layers(image, layers)
+            else:
+                for step in ready:
+                    with PROFILER.section(step.label):
+                        image = step.spec.fn(image, people, **step.params_with(overrides))
+        return image
+
+
+def compile_plan(entries):
+    """Compile a list of filter names / {"filter": name, **params} into a LevelPlan."""
+    steps = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"filter": entry}
+        params = dict(entry)
+        name = params.pop("filter")
+        if name not in FILTERS:
+            raise ValueError(f"Unknown filter in level config: {name}")
+        steps.append(Step(FILTERS[name], params))
+    return LevelPlan(steps)
+
+
+def load_level_config(path):
+    """Read a level config: {"<level>": [filter entries]} -> {level: entries}."""
+    with open(path) as f:
+        config = json.load(f)
+    return {int(level): entries for level, entries in config.items()}
+
+
+def compile_levels(config):
+    return {level: compile_plan(entries) for level, entries in config.items()}
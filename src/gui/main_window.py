@@ -1,4 +1,5 @@
 import os
+import time
 
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QSizePolicy
@@ -6,14 +7,27 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QPixmap, QImage
 
+from src.assets import asset_path
 from src.state.pig_state import PigLevelState
-from src.gui.widgets import MeterWidget
+from src.camera.pipeline import DisplaySlot
+from src.filters.layer_cache import LAYER_CACHE
+from src.gui.widgets import MeterWidget, VideoView
+from src.perf.timing import PROFILER
+
+# Sections shown on the performance HUD, in pipeline order
+HUD_SECTIONS = ["capture", "frame_age", "flip", "convert", "inference", "filters", "scale", "paint"]
+
+# Instant replay: keep recording this long after GAME OVER before saving the clip
+CLIP_POST_ROLL_MS = 2000
+CLIP_DIR = os.environ.get("OINK_CLIP_DIR") or asset_path("clips")
+# Saved clips kept in CLIP_DIR (None = clip_buffer.CLIP_KEEP); the oldest are deleted
+CLIP_KEEP = int(os.environ.get("OINK_CLIP_KEEP", 0)) or None
 
 class MainWindow(QMainWindow):
     def __init__(self, state):
         super().__init__()
 
-        with open("assets/styles/main.qss", "r") as f:
+        with open(asset_path("assets", "styles", "main.qss"), "r") as f:
             self.setStyleSheet(f.read())
 
         self.setWindowTitle("Curse of Oink 🐷")
@@ -34,7 +48,7 @@ class MainWindow(QMainWindow):
         # --- Left pig level barometer
         meter_imgs = []
         for i in range(6):  # levels 0..5
-            path = os.path.join("assets", "barometer", f"level_{i}.png")
+            path = asset_path("assets", "barometer", f"level_{i}.png")
             meter_imgs.append(QPixmap(path))
         self.meter_widget = MeterWidget(meter_imgs)
         self.meter_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -43,10 +57,10 @@ class MainWindow(QMainWindow):
         # --- Right side (video + button)
         right_panel = QVBoxLayout()
 
-        self.video_label = QLabel("Webcam will appear here")
-        self.video_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.video_label.setAlignment(Qt.AlignCenter)
-        right_panel.addWidget(self.video_label)
+        self.video_view = VideoView("Loading…")
+        self.video_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.video_view.set_slot(DisplaySlot())  # replaced by the webcam's in set_webcam
+        right_panel.addWidget(self.video_view)
 
         self.pigify_button = QPushButton("Pigify more!")
         self.pigify_button.setObjectName("pigifyButton")
@@ -69,6 +83,21 @@ class MainWindow(QMainWindow):
         self.banner_timer.setInterval(500)  # in ms
         self.banner_timer.timeout.connect(self.toggle_banner)
 
+        # --- Performance HUD (F3 toggles; OINK_HUD=1 shows it at startup)
+        self.hud_label = QLabel(self.video_view)
+        self.hud_label.setObjectName("perfHud")
+        self.hud_label.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 160); color: #7CFC00;"
+            "font-family: monospace; font-size: 11px; padding: 4px;"
+        )
+        self.hud_label.move(8, 8)
+        self.hud_label.hide()
+        self.hud_timer = QTimer()
+        self.hud_timer.setInterval(500)  # in ms
+        self.hud_timer.timeout.connect(self.update_hud)
+        if os.environ.get("OINK_HUD", "") not in ("", "0"):
+            self.toggle_hud()
+
     def on_pigify_clicked(self):
         self.state.increase()
         self.meter_widget.set_level(self.state.level)
@@ -78,24 +107,71 @@ class MainWindow(QMainWindow):
         if self.state.level >= 5:
             self.pigify_button.setDisabled(True)  # disable button
             self.banner_timer.start()
+            QTimer.singleShot(CLIP_POST_ROLL_MS, self.save_clip)
+
+    def save_clip(self):
+        """
+        Save the instant-replay buffer as an MP4 in CLIP_DIR (encoded in the
+        background), keeping at most CLIP_KEEP of them there.
+        """
+        clips = getattr(getattr(self, "webcam_worker", None), "clips", None)
+        if clips is None:
+            return
+        from src.recording import clip_buffer
+        # Room for the one being saved
+        clip_buffer.prune_clips(CLIP_DIR, (CLIP_KEEP or clip_buffer.CLIP_KEEP) - 1)
+        path = os.path.join(CLIP_DIR, time.strftime(clip_buffer.CLIP_PREFIX + "%Y%m%d_%H%M%S.mp4"))
+        if clips.save(path) is not None:
+            print(f"Saving clip: {path}")
 
     def set_frame(self, frame):
-        h, w, ch = frame.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_BGR888)
-        pixmap = QPixmap.fromImage(qt_image)
-
-        # Scale pixmap to label while keeping aspect ratio
-        pixmap = pixmap.scaled(
-            self.video_label.width(),
-            self.video_label.height(),
-            Qt.KeepAspectRatio
-        )
-        self.video_label.setPixmap(pixmap)
+        """Show a frame pushed from outside the webcam worker (scaled on this thread)."""
+        slot = self.video_view.slot
+        slot.publish(slot.scaled(frame))
+        self.video_view.update()
+
+    def toggle_hud(self):
+        """Show/hide the performance HUD (turns the profiler on the first time)."""
+        if self.hud_label.isVisible():
+            self.hud_label.hide()
+            self.hud_timer.stop()
+            return
+        PROFILER.enabled = True
+        self.update_hud()
+        self.hud_label.show()
+        self.hud_timer.start()
+
+    def update_hud(self):
+        sections = HUD_SECTIONS + sorted(n for n in PROFILER.stages if n.startswith("filter/"))
+        lines = PROFILER.hud_lines(sections)
+        if LAYER_CACHE.enabled:
+            lines.append(f"{'layer cache':<20} {LAYER_CACHE.hit_rate():6.0%} hits")
+        worker = getattr(self, "webcam_worker", None)
+        for name, error in (worker.stage_errors.items() if worker is not None else ()):
+            lines.append(f"{name + ' error':<20} {error}")
+        self.hud_label.setText("\n".join(lines))
+        self.hud_label.adjustSize()
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_F3:
+            self.toggle_hud()
+        elif event.key() == Qt.Key_F5:
+            self.save_clip()
+        else:
+            super().keyPressEvent(event)
+
+    def set_status(self, text):
+        """Text shown in the video area until the first frame arrives."""
+        self.video_view.placeholder = text
+        self.video_view.update()
 
     def set_webcam(self, webcam_worker):
-        """Register webcam worker so we can stop it when closing."""
+        """Register webcam worker so we can stop it when closing, and show its frames."""
         self.webcam_worker = webcam_worker
+        self.video_view.set_slot(webcam_worker.display)
+        # Carries no frame: repaint requests coalesce, the view pulls the newest frame
+        webcam_worker.frame_available.connect(self.video_view.update)
+        webcam_worker.stage_failed.connect(self.set_status)
 
     def toggle_banner(self):
         if self.game_over_banner.isVisible():
@@ -116,4 +192,10 @@ class MainWindow(QMainWindow):
         """Handle window close event."""
         if hasattr(self, "webcam_worker") and self.webcam_worker is not None:
             self.webcam_worker.stop()
+            if self.webcam_worker.clips is not None:
+                self.webcam_worker.clips.close()  # finishes clips still being written
+        export_path = os.environ.get("OINK_PROFILE_OUT")
+        if export_path and PROFILER.enabled:
+            PROFILER.export(export_path)
+            print(f"Profile written to {export_path}")
         event.accept()
@@ -1,8 +1,10 @@
 import cv2
-from PyQt5.QtWidgets import QLabel
-from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QLabel, QWidget
+from PyQt5.QtGui import QImage, QPixmap, QPainter
 from PyQt5.QtCore import Qt
 
+from src.perf.timing import PROFILER
+
 class VideoLabel(QLabel):
     def __init__(self):
         pass
@@ -53,4 +55,45 @@ class MeterWidget(QLabel):
             Qt.KeepAspectRatio,
             Qt.SmoothTransformation
         )
-        self.setPixmap(scaled_pixmap)
\ No newline at end of file
+        self.setPixmap(scaled_pixmap)
+
+
+class VideoView(QWidget):
+    """
+    Paints the newest frame from a DisplaySlot.
+
+    Frames arrive already scaled to this widget's size (the view tells the
+    slot its size on resize), so painting is a single blit of a QImage that
+    wraps the frame buffer without copying it.
+    """
+
+    def __init__(self, placeholder="", parent=None):
+        super().__init__(parent)
+        self.placeholder = placeholder
+        self.slot = None
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def set_slot(self, slot):
+        self.slot = slot
+        slot.target_size = (self.width(), self.height())
+        self.update()
+
+    def resizeEvent(self, event):
+        if self.slot is not None:
+            self.slot.target_size = (self.width(), self.height())
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        with PROFILER.section("paint"):
+            painter = QPainter(self)
+            painter.fillRect(self.rect(), Qt.white)
+            frame = self.slot.take() if self.slot is not None else None
+            if frame is None:
+                painter.drawText(self.rect(), Qt.AlignCenter, self.placeholder)
+            else:
+                h, w, ch = frame.shape
+                image = QImage(frame.data, w, h, ch * w, QImage.Format_BGR888)
+                painter.drawImage((self.width() - w) // 2, (self.height() - h) // 2, image)
+            painter.end()
+        if frame is not None:
+            PROFILER.tick("frame")
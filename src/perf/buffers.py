@@ -0,0 +1,77 @@
+"""
+Reusable buffers so steady-state frame processing does no large allocations.
+
+FrameRing   a fixed ring of same-shaped frame buffers for a pipeline stage's
+            output. A buffer is reused only after `count` newer frames have
+            been produced, so the ring must be deeper than the number of
+            frames that can be in flight downstream of the stage.
+
+Workspace   grow-only scratch memory for intermediates that die within one
+            call (blend temporaries, remap maps). `scratch()` returns the
+            calling thread's workspace, so concurrent pipelines never share one.
+"""
+import threading
+
+import numpy as np
+
+
+class FrameRing:
+    """
+    Args:
+        count (int): Buffers in the ring (> frames in flight downstream).
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self._buffers = {}  # (name, shape, dtype) -> list of arrays
+        self._next = {}
+        self.allocated = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        """The next buffer of the `name` ring; (re)allocated only when the shape changes."""
+        key = (name, tuple(shape), np.dtype(dtype))
+        ring = self._buffers.get(key)
+        if ring is None:
+            # A new shape (e.g. camera resolution change): drop the old rings for this name
+            for old in [k for k in self._buffers if k[0] == name]:
+                del self._buffers[old]
+            ring = self._buffers[key] = [np.empty(shape, dtype) for _ in range(self.count)]
+            self._next[key] = 0
+            self.allocated += self.count
+        i = self._next[key]
+        self._next[key] = (i + 1) % self.count
+        return ring[i]
+
+
+class Workspace:
+    """Named scratch buffers; each get() returns a contiguous view of grow-only memory."""
+
+    def __init__(self):
+        self._flat = {}
+
+    def get(self, name, shape, dtype=np.uint8):
+        """
+        A contiguous array of `shape`, valid until the next get() of the same
+        name on this workspace. Contents are undefined.
+        """
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape)) * dtype.itemsize
+        flat = self._flat.get(name)
+        if flat is None or flat.nbytes < size:
+            # Grow with headroom so a slowly growing face box does not reallocate every frame
+            flat = self._flat[name] = np.empty(int(size * 1.25) + 64, dtype=np.uint8)
+        return flat[:size].view(dtype).reshape(shape)
+
+    def nbytes(self):
+        return sum(flat.nbytes for flat in self._flat.values())
+
+
+_local = threading.local()
+
+
+def scratch():
+    """This thread's Workspace."""
+    ws = getattr(_local, "workspace", None)
+    if ws is None:
+        ws = _local.workspace = Workspace()
+    return ws
@@ -0,0 +1,141 @@
+"""
+Adaptive quality governor: trade quality for frame rate on slow hardware.
+
+The governor is fed per-frame work times of the pipeline stages. Stages
+overlap, so throughput is bounded by the slowest one; the governor compares
+that stage's rolling mean against the frame budget (1 / target fps) and
+steps through QUALITY_TIERS, best first.
+
+Hysteresis keeps it from oscillating:
+  - degrade when the bottleneck exceeds the budget by `degrade_margin`,
+  - improve only after `improve_after` frames well under budget
+    (by `improve_margin`), so the better tier should still fit,
+  - after any change, hold the new tier for `cooldown` frames,
+  - a tier that had to be left for being too slow needs twice as long
+    before it is tried again (reset once it holds).
+"""
+import time
+from collections import deque
+
+# Quality tiers, best first. Keys:
+#   infer_scale       model input resolution factor (RoiInference)
+#   model_complexity  MediaPipe model complexity (0 = lite)
+#   refine_face       FaceMesh iris/lip landmark refinement
+#   infer_every       run the model every N frames, predict in between (LandmarkTracker)
+#   vision_blur       pig_vision_filter blur kernel (0 = off)
+#   warp_scale        pig mask remap resolution factor
+# The best tier is the baseline model setup (planner.DEFAULT_MODEL_OPTIONS),
+# so stepping back up never costs more than running without a governor.
+QUALITY_TIERS = [
+    {"infer_scale": 1.0, "model_complexity": 1, "refine_face": False,
+     "infer_every": 1, "vision_blur": 3, "warp_scale": 1.0},
+    {"infer_scale": 0.75, "model_complexity": 1, "refine_face": False,
+     "infer_every": 1, "vision_blur": 0, "warp_scale": 1.0},
+    {"infer_scale": 0.75, "model_complexity": 0, "refine_face": False,
+     "infer_every": 1, "vision_blur": 0, "warp_scale": 0.5},
+    {"infer_scale": 0.5, "model_complexity": 0, "refine_face": False,
+     "infer_every": 2, "vision_blur": 0, "warp_scale": 0.5},
+    {"infer_scale": 0.5, "model_complexity": 0, "refine_face": False,
+     "infer_every": 3, "vision_blur": 0, "warp_scale": 0.5},
+]
+
+# Opt-in: face refinement above the baseline, for hardware with headroom
+# (QualityGovernor(..., tiers=REFINED_TIERS)).
+REFINED_TIERS = [{**QUALITY_TIERS[0], "refine_face": True}] + QUALITY_TIERS
+
+
+def filter_overrides(tier):
+    """Per-filter param overrides for apply_filters for a tier."""
+    return {
+        "pig_vision": {"blur_ksize": tier["vision_blur"]},
+        "pig_full": {"warp_scale": tier["warp_scale"]},
+    }
+
+
+class QualityGovernor:
+    """
+    Args:
+        target_fps (float): Frame rate to hold.
+        apply (callable): apply(tier_dict) puts a tier into effect; called
+            once at start and on every change.
+        tiers (list[dict]): Quality tiers, best first.
+        start_tier (int): Initial tier index.
+        window (int): Frames in each stage's rolling mean.
+        degrade_margin (float): Degrade when bottleneck > budget * (1 + margin).
+        improve_margin (float): Improve when bottleneck < budget * (1 - margin)...
+        improve_after (int): ...for this many consecutive frames.
+        cooldown (int): Frames to hold a tier after a change.
+    """
+
+    def __init__(self, target_fps, apply, tiers=QUALITY_TIERS, start_tier=0, window=30,
+                 degrade_margin=0.1, improve_margin=0.3, improve_after=90, cooldown=60):
+        self.budget_ms = 1000.0 / target_fps
+        self.apply = apply
+        self.tiers = tiers
+        self.tier = start_tier
+        self.window = window
+        self.degrade_margin = degrade_margin
+        self.improve_margin = improve_margin
+        self.improve_after = improve_after
+        self.cooldown = cooldown
+
+        self.samples = {}       # stage -> deque of recent ms
+        self.hold = cooldown    # frames left before any change is allowed
+        self.good_frames = 0
+        self.penalty = {}       # tier -> extra improve frames after it proved too slow
+        self.changes = []       # (time, from, to, reason)
+        self.apply(self.tiers[self.tier])
+
+    def observe(self, stage, ms):
+        """Record one frame's work time for a stage (thread-safe enough: deque append)."""
+        samples = self.samples.get(stage)
+        if samples is None:
+            samples = self.samples.setdefault(stage, deque(maxlen=self.window))
+        samples.append(ms)
+
+    def bottleneck(self):
+        """(stage, rolling mean ms) of the slowest stage, or (None, 0.0)."""
+        worst, worst_ms = None, 0.0
+        for stage, samples in list(self.samples.items()):
+            if len(samples) < self.window // 2:
+                continue
+            mean = sum(samples) / len(samples)
+            if mean > worst_ms:
+                worst, worst_ms = stage, mean
+        return worst, worst_ms
+
+    def update(self):
+        """Call once per rendered frame. Returns the current tier index."""
+        if self.hold > 0:
+            self.hold -= 1
+            return self.tier
+        stage, ms = self.bottleneck()
+        if stage is None:
+            return self.tier
+
+        if ms > self.budget_ms * (1 + self.degrade_margin) and self.tier < len(self.tiers) - 1:
+            self.penalty[self.tier] = self.penalty.get(self.tier, 0) * 2 or self.improve_after
+            self._change(self.tier + 1, f"{stage} {ms:.1f} ms > budget {self.budget_ms:.1f} ms")
+        elif ms < self.budget_ms * (1 - self.improve_margin) and self.tier > 0:
+            self.good_frames += 1
+            if self.good_frames >= self.improve_after + self.penalty.get(self.tier - 1, 0):
+                self._change(self.tier - 1, f"{stage} {ms:.1f} ms, headroom under {self.budget_ms:.1f} ms")
+        else:
+            self.good_frames = 0
+            self.penalty.pop(self.tier, None)  # holding this tier: forgive it
+        return self.tier
+
+    def _change(self, tier, reason):
+        print(f"Quality governor: tier {self.tier} -> {tier} ({reason})")
+        self.changes.append((time.time(), self.tier, tier, reason))
+        self.tier = tier
+        self.hold = self.cooldown
+        self.good_frames = 0
+        for samples in self.samples.values():
+            samples.clear()  # measurements from the old tier no longer apply
+        self.apply(self.tiers[tier])
+
+    def stats(self):
+        stage, ms = self.bottleneck()
+        return {"tier": self.tier, "bottleneck": stage, "bottleneck_ms": ms,
+                "budget_ms": self.budget_ms, "changes": len(self.changes)}
@@ -0,0 +1,192 @@
+"""
+Hot-path latency instrumentation.
+
+    with PROFILER.section("inference"):
+        results = model.process(rgb)
+
+When the profiler is disabled, section() returns a shared no-op context
+manager, so an instrumented call costs one attribute check. When enabled,
+each section keeps a rolling window of recent samples (for percentiles)
+and a cumulative log-spaced histogram (for the whole run).
+
+Enable with OINK_PROFILE=1. OINK_PROFILE_OUT=<path.json|path.csv> exports a
+summary when the app closes.
+"""
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Histogram bucket upper edges in ms, log-spaced 0.01 ms .. 10 s (+ overflow)
+BUCKET_EDGES_MS = np.logspace(-2, 4, 31)
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    __slots__ = ("stats", "t0")
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add((time.perf_counter() - self.t0) * 1000)
+        return False
+
+
+class StageStats:
+    """Rolling samples and a cumulative histogram for one named section."""
+
+    def __init__(self, name, window):
+        self.name = name
+        self.samples = deque(maxlen=window)
+        self.counts = np.zeros(len(BUCKET_EDGES_MS) + 1, dtype=np.int64)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, ms):
+        with self._lock:
+            self.samples.append(ms)
+            self.counts[np.searchsorted(BUCKET_EDGES_MS, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def summary(self):
+        with self._lock:
+            recent = np.array(self.samples)
+            count, total, peak = self.count, self.total_ms, self.max_ms
+        if not len(recent):
+            return {"count": count}
+        p50, p95, p99 = np.percentile(recent, (50, 95, 99))
+        return {
+            "count": count,
+            "mean_ms": total / count,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": peak,
+        }
+
+
+class Profiler:
+    """
+    Named latency sections and frame-rate counters, safe to use from any thread.
+
+    Args:
+        enabled (bool): Record anything at all.
+        window (int): Samples kept per section for the rolling percentiles.
+    """
+
+    def __init__(self, enabled=False, window=600):
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}
+        self.ticks = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.stages.setdefault(name, StageStats(name, self.window))
+        return stats
+
+    def section(self, name):
+        """Context manager timing the enclosed block under `name`."""
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self._stats(name))
+
+    def record(self, name, ms):
+        """Add an externally measured duration."""
+        if self.enabled:
+            self._stats(name).add(ms)
+
+    def tick(self, name="frame"):
+        """Mark one event (e.g. a displayed frame) for the rate counters."""
+        if not self.enabled:
+            return
+        times = self.ticks.get(name)
+        if times is None:
+            with self._lock:
+                times = self.ticks.setdefault(name, deque(maxlen=self.window))
+        times.append(time.perf_counter())
+
+    def rate(self, name="frame", span=1.0):
+        """Events per second over the last `span` seconds."""
+        times = self.ticks.get(name)
+        if not times:
+            return 0.0
+        now = time.perf_counter()
+        recent = [t for t in list(times) if now - t <= span]
+        return len(recent) / span
+
+    def summary(self):
+        """{section name: count / mean / p50 / p95 / p99 / max in ms}, plus rates."""
+        report = {name: stats.summary() for name, stats in list(self.stages.items())}
+        rates = {name: self.rate(name) for name in list(self.ticks)}
+        return {"stages": report, "rates": rates}
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.ticks.clear()
+
+    def export(self, path):
+        """Write the summary (and histograms) as JSON, or one row per section as CSV."""
+        summary = self.summary()
+        if path.endswith(".csv"):
+            fields = ["stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                for name, row in summary["stages"].items():
+                    writer.writerow({"stage": name, **row})
+            return
+        summary["histogram_edges_ms"] = BUCKET_EDGES_MS.tolist()
+        for name, stats in list(self.stages.items()):
+            summary["stages"][name]["histogram"] = stats.counts.tolist()
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    def hud_lines(self, names=None):
+        """Short text lines for an on-screen overlay: fps, then p50/p95 per section."""
+        lines = [f"{self.rate('frame'):.1f} fps"]
+        for name in names or list(self.stages):
+            stats = self.stages.get(name)
+            if stats is None:
+                continue
+            s = stats.summary()
+            if "p50_ms" in s:
+                lines.append(f"{name:<20} {s['p50_ms']:6.2f} / {s['p95_ms']:6.2f} ms")
+        return lines
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() not in ("", "0", "false", "no")
+
+
+PROFILER = Profiler(enabled=_env_flag("OINK_PROFILE"))
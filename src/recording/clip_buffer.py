@@ -0,0 +1,190 @@
+"""
+Instant replay: the last few seconds of filtered frames, ready to save as a clip.
+
+Frames are JPEG-encoded off the render thread (a FrameBroadcaster with no
+viewers, only a listener) and kept as compressed bytes in a ring bounded by
+both duration and total bytes, so memory stays fixed however long the app
+runs. save() snapshots the ring and hands the bytes to a background encoder
+process that decodes them and writes an MP4 (or GIF), so neither the render
+thread nor the GUI waits for video encoding.
+"""
+import multiprocessing as mp
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from src.serve.stream import FrameBroadcaster
+
+CLIP_SECONDS = 10.0
+CLIP_MAX_BYTES = 32 * 1024 * 1024
+CLIP_MAX_WIDTH = 640
+CLIP_QUALITY = 75
+CLIP_KEEP = 20  # saved clips kept in a clip directory; older ones are deleted
+CLIP_PREFIX = "oink_"
+
+
+def prune_clips(directory, keep=CLIP_KEEP):
+    """
+    Delete the oldest saved clips in `directory` so at most `keep` remain.
+    Only files named like saved clips (CLIP_PREFIX*.mp4 / .gif) are touched.
+
+    Returns:
+        list[str]: Deleted paths.
+    """
+    if not os.path.isdir(directory):
+        return []
+    clips = [os.path.join(directory, name) for name in os.listdir(directory)
+             if name.startswith(CLIP_PREFIX) and name.lower().endswith((".mp4", ".gif"))]
+    clips.sort(key=os.path.getmtime)
+    removed = clips[:max(0, len(clips) - keep)]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def encode_clip(jpegs, times, path):
+    """
+    Decode JPEG frames and write them to `path` (.mp4 or .gif). Runs in the
+    encoder process.
+
+    Args:
+        jpegs (list[bytes]): Frames, oldest first.
+        times (list[float]): Capture time of each frame in seconds.
+        path (str): Output file; the extension picks the format.
+
+    Returns:
+        dict: path, frames, seconds of footage, encode_s, encode_fps.
+    """
+    t0 = time.perf_counter()
+    frames = [cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR) for jpeg in jpegs]
+    span = times[-1] - times[0] if len(times) > 1 else 0.0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    if path.lower().endswith(".gif"):
+        if not hasattr(cv2, "imwriteanimation"):
+            raise RuntimeError("GIF clips need OpenCV >= 4.11 (cv2.imwriteanimation)")
+        animation = cv2.Animation()
+        animation.frames = frames
+        # Keep the real timing, including frames dropped under load
+        gaps = np.diff(times, append=times[-1] + (span / max(len(times) - 1, 1)))
+        animation.durations = [max(int(round(g * 1000)), 20) for g in gaps]
+        ok = cv2.imwriteanimation(path, animation)
+    else:
+        fps = (len(frames) - 1) / span if span > 0 else 30.0
+        h, w = frames[0].shape[:2]
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+        ok = writer.isOpened()
+        for frame in frames:
+            writer.write(frame)
+        writer.release()
+    if not ok:
+        raise RuntimeError(f"Could not write clip: {path}")
+
+    encode_s = time.perf_counter() - t0
+    return {"path": path, "frames": len(frames), "seconds": span,
+            "encode_s": encode_s, "encode_fps": len(frames) / encode_s if encode_s else 0.0}
+
+
+class ClipBuffer:
+    """
+    Args:
+        seconds (float): Footage kept.
+        max_bytes (int): Cap on the JPEG bytes kept (the oldest frames go first).
+        max_width (int): Frames are downscaled to this width before encoding.
+        quality (int): JPEG quality.
+    """
+
+    def __init__(self, seconds=CLIP_SECONDS, max_bytes=CLIP_MAX_BYTES, max_width=CLIP_MAX_WIDTH,
+                 quality=CLIP_QUALITY):
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.encoder = FrameBroadcaster(quality, workers=1, max_width=max_width)
+        self.encoder.add_listener(self._add)
+        self._lock = threading.Lock()
+        self._frames = deque()  # (time, jpeg bytes), oldest first
+        self.nbytes = 0
+        self._executor = None
+        self.saving = 0
+        self.saved = []  # result dicts of finished clips
+        self.failed = 0
+
+    def submit(self, frame):
+        """Add a BGR frame (render thread; copies it, never waits for the encoder)."""
+        self.encoder.submit(frame)
+
+    def _add(self, jpeg, t):
+        with self._lock:
+            self._frames.append((t, jpeg))
+            self.nbytes += len(jpeg)
+            while self._frames and (t - self._frames[0][0] > self.seconds
+                                    or self.nbytes > self.max_bytes):
+                self.nbytes -= len(self._frames.popleft()[1])
+
+    def snapshot(self):
+        """(jpegs, times) currently buffered, oldest first."""
+        with self._lock:
+            frames = list(self._frames)
+        return [jpeg for _, jpeg in frames], [t for t, _ in frames]
+
+    def save(self, path):
+        """
+        Write the buffered footage to `path` (.mp4 or .gif) in the background.
+
+        Returns:
+            concurrent.futures.Future or None: Resolves to encode_clip's result;
+                None when the buffer is empty.
+        """
+        jpegs, times = self.snapshot()
+        if not jpegs:
+            return None
+        if self._executor is None:
+            # spawn: the parent runs Qt and camera threads
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn"))
+        self.saving += 1
+        future = self._executor.submit(encode_clip, jpegs, times, path)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self.saving -= 1
+        try:
+            result = future.result()
+        except Exception as e:
+            self.failed += 1
+            print(f"Clip failed: {e}")
+            return
+        self.saved.append(result)
+        print(f"Clip saved: {result['path']} ({result['frames']} frames, {result['seconds']:.1f} s, "
+              f"encoded at {result['encode_fps']:.0f} fps)")
+
+    def stats(self):
+        with self._lock:
+            n = len(self._frames)
+            span = self._frames[-1][0] - self._frames[0][0] if n > 1 else 0.0
+            nbytes = self.nbytes
+        enc = self.encoder.stats()
+        last = self.saved[-1] if self.saved else None
+        return {
+            "frames": n,
+            "seconds": span,
+            "memory_bytes": nbytes,
+            "jpeg_kib_mean": nbytes / n / 1024 if n else 0.0,
+            "jpeg_ms_mean": enc["encode_ms_mean"],
+            "jpeg_drops": enc["encoder_drops"],
+            "clips_saved": len(self.saved),
+            "clips_pending": self.saving,
+            "clips_failed": self.failed,
+            "clip_encode_fps": last["encode_fps"] if last else None,
+        }
+
+    def close(self):
+        """Stop encoding frames; waits for clips still being written."""
+        self.encoder.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
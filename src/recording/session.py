@@ -0,0 +1,337 @@
+"""
+Recorded sessions: camera frames plus per-frame landmarks on disk.
+
+Layout of a session directory:
+
+    meta.json                 fps, frame shape, chunk lengths, landmark counts
+    chunk_00000/
+        frames.npy            (n, H, W, 3) uint8 BGR, as the model saw them (mirrored)
+        present.npy           (n, 4) bool, one flag per LANDMARK_SETS entry
+        pose.npy              (n, 33, 4) float32 x, y, z, visibility
+        face.npy              (n, 468, 4)
+        left_hand.npy         (n, 21, 4)
+        right_hand.npy        (n, 21, 4)
+    chunk_00001/ ...
+
+Every array is a plain .npy, so a Session memory-maps chunks instead of
+reading them. Rows of absent sets are zero; `present` says which are real.
+
+ReplayCapture and ReplayModel stand in for the camera (a camera.capture
+frame source) and the MediaPipe model so the render path runs with no
+camera and no inference.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from src.vision.landmarks import LandmarkFrame
+from src.vision.results import LANDMARK_SETS
+
+FORMAT_VERSION = 1
+
+# Landmark counts used for a set that never appears in a chunk
+DEFAULT_COUNTS = {"pose": 33, "face": 468, "left_hand": 21, "right_hand": 21}
+
+
+def _chunk_dir(path, index):
+    return os.path.join(path, f"chunk_{index:05d}")
+
+
+class SessionWriter:
+    """
+    Append (frame, results) pairs to a session directory.
+
+    write() only copies the frame into a chunk buffer from a pool of
+    WRITE_QUEUE + 1; full chunks are saved by a background thread, which
+    returns their buffers to the pool, so the caller (the render thread
+    while recording) neither allocates per chunk nor waits on the disk
+    unless the writer falls WRITE_QUEUE chunks behind.
+
+    Args:
+        path (str): Session directory (created; must not hold a session already).
+        fps (float): Nominal frame rate, used for real-time replay.
+        chunk_frames (int): Frames per chunk file.
+        frames (bool): Store camera frames; False records landmarks only.
+    """
+
+    WRITE_QUEUE = 2  # full chunks waiting for the writer thread
+
+    def __init__(self, path, fps=30.0, chunk_frames=30, frames=True):
+        if os.path.exists(os.path.join(path, "meta.json")):
+            raise FileExistsError(f"Session already exists: {path}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.fps = fps
+        self.chunk_frames = chunk_frames
+        self.store_frames = frames
+        self.frame_shape = None
+        self.counts = {}
+        self.chunks = []
+        self._frames = None  # (chunk_frames, H, W, 3) buffer being filled
+        self._pending = []   # landmark arrays of the frames in _frames
+        self._queue = queue.Queue(self.WRITE_QUEUE)
+        self._free = queue.Queue()  # chunk buffers the writer thread is done with
+        self._buffers = 0           # chunk buffers allocated, at most WRITE_QUEUE + 1
+        self._error = None
+        self._writer = threading.Thread(target=self._write_chunks, name="session-writer",
+                                        daemon=True)
+        self._writer.start()
+
+    def write(self, frame, results):
+        """Add one frame and its landmarks (MediaPipe results or a LandmarkFrame)."""
+        if self._error is not None:
+            raise self._error
+        if self.frame_shape is None:
+            self.frame_shape = frame.shape
+        elif frame.shape != self.frame_shape:
+            raise ValueError(f"Frame shape changed: {self.frame_shape} -> {frame.shape}")
+
+        arrays = LandmarkFrame.ensure(results, None).arrays()
+        for name, arr in arrays.items():
+            self.counts.setdefault(name, len(arr))
+        if self.store_frames:
+            if self._frames is None:
+                self._frames = self._take_buffer(frame)
+            np.copyto(self._frames[len(self._pending)], frame)
+        self._pending.append(arrays)
+        if len(self._pending) >= self.chunk_frames:
+            self._flush()
+
+    def _take_buffer(self, frame):
+        """A chunk buffer from the pool, allocated while fewer than WRITE_QUEUE + 1 exist."""
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+        if self._buffers <= self.WRITE_QUEUE:
+            self._buffers += 1
+            return np.empty((self.chunk_frames,) + frame.shape, dtype=frame.dtype)
+        return self._free.get()  # all in use: wait for the writer to finish one
+
+    def _flush(self):
+        """Hand the chunk being filled to the writer thread."""
+        if not self._pending:
+            return
+        self._queue.put((self._frames, self._pending, dict(self.counts)))
+        self._frames = None
+        self._pending = []
+
+    def _write_chunks(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            buffer, pending, counts = job
+            if self._error is None:
+                try:
+                    frames = buffer[:len(pending)] if buffer is not None else None
+                    self._save_chunk(frames, pending, counts)
+                except Exception as e:  # reported to the caller by write() / close()
+                    self._error = e
+            if buffer is not None:
+                self._free.put(buffer)
+
+    def _save_chunk(self, frames, pending, counts):
+        n = len(pending)
+        out = _chunk_dir(self.path, len(self.chunks))
+        os.makedirs(out, exist_ok=True)
+
+        if frames is not None:
+            np.save(os.path.join(out, "frames.npy"), frames)
+        present = np.zeros((n, len(LANDMARK_SETS)), dtype=bool)
+        for s, name in enumerate(LANDMARK_SETS):
+            count = counts.get(name, DEFAULT_COUNTS[name])
+            block = np.zeros((n, count, 4), dtype=np.float32)
+            for i, arrays in enumerate(pending):
+                arr = arrays.get(name)
+                if arr is not None and len(arr) == count:
+                    block[i] = arr
+                    present[i, s] = True
+            np.save(os.path.join(out, name + ".npy"), block)
+        np.save(os.path.join(out, "present.npy"), present)
+
+        self.chunks.append(n)
+        self._write_meta(counts)
+
+    def _write_meta(self, counts):
+        meta = {
+            "version": FORMAT_VERSION,
+            "fps": self.fps,
+            "frame_shape": list(self.frame_shape) if self.frame_shape else None,
+            "frames": self.store_frames,
+            "chunks": self.chunks,
+            "counts": {name: counts.get(name, DEFAULT_COUNTS[name]) for name in LANDMARK_SETS},
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def close(self):
+        """Save the last (partial) chunk and wait for the writer thread."""
+        if not self._writer.is_alive():
+            return
+        self._flush()
+        self._queue.put(None)
+        self._writer.join()
+        if self._error is not None:
+            raise self._error
+        if not self.chunks:
+            self._write_meta(self.counts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Session:
+    """
+    Read-only view of a recorded session; chunks are memory-mapped on first use.
+
+    Args:
+        path (str): Session directory written by SessionWriter.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported session format: {meta.get('version')}")
+        self.path = path
+        self.fps = meta["fps"]
+        self.frame_shape = tuple(meta["frame_shape"]) if meta["frame_shape"] else None
+        self.has_frames = meta["frames"]
+        self.counts = meta["counts"]
+        self.starts = np.concatenate([[0], np.cumsum(meta["chunks"])]).astype(int)
+        self._chunks = {}
+
+    def __len__(self):
+        return int(self.starts[-1])
+
+    def _chunk(self, index):
+        chunk = self._chunks.get(index)
+        if chunk is None:
+            d = _chunk_dir(self.path, index)
+            names = LANDMARK_SETS + ("present",) + (("frames",) if self.has_frames else ())
+            chunk = {name: np.load(os.path.join(d, name + ".npy"), mmap_mode="r") for name in names}
+            self._chunks[index] = chunk
+        return chunk
+
+    def _locate(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(f"Frame {i} out of range (session has {len(self)})")
+        c = int(np.searchsorted(self.starts, i, side="right")) - 1
+        return self._chunk(c), i - self.starts[c]
+
+    def frame(self, i):
+        """Frame i (read-only memory-mapped view)."""
+        if not self.has_frames:
+            raise ValueError(f"Session has no frames: {self.path}")
+        chunk, j = self._locate(i)
+        return chunk["frames"][j]
+
+    def landmarks(self, i, image_shape=None):
+        """Frame i's landmarks as a LandmarkFrame (absent sets left out)."""
+        chunk, j = self._locate(i)
+        present = chunk["present"][j]
+        return LandmarkFrame({name: chunk[name][j] for s, name in enumerate(LANDMARK_SETS)
+                              if present[s]}, image_shape)
+
+    def landmark_arrays(self, name):
+        """(T, N, 4) array of one set over the whole session, NaN where absent."""
+        s = LANDMARK_SETS.index(name)
+        blocks = []
+        for c in range(len(self.starts) - 1):
+            chunk = self._chunk(c)
+            block = np.array(chunk[name])
+            block[~chunk["present"][:, s]] = np.nan
+            blocks.append(block)
+        if not blocks:
+            return np.empty((0, self.counts[name], 4), dtype=np.float32)
+        return np.concatenate(blocks)
+
+    def __iter__(self):
+        """(frame or None, LandmarkFrame) for every recorded frame, in order."""
+        for i in range(len(self)):
+            yield (self.frame(i) if self.has_frames else None), self.landmarks(i, self.frame_shape)
+
+
+class ReplayCapture:
+    """
+    Frame source (see camera.capture) that plays a session's frames.
+
+    Args:
+        session (Session or str): Session or its directory.
+        loop (bool): Start over at the end instead of reporting end of stream.
+        realtime (bool): Pace reads to the recorded fps (False = as fast as possible).
+    """
+
+    mirrored = True  # frames were recorded as the model saw them
+
+    def __init__(self, session, loop=False, realtime=False):
+        self.session = session if isinstance(session, Session) else Session(session)
+        self.loop = loop
+        self.realtime = realtime
+        self.index = -1  # last frame returned
+        self._next_time = None
+
+    def isOpened(self):
+        return self.session.has_frames and len(self.session) > 0
+
+    def open(self):
+        self.index = -1
+        self._next_time = None
+        return self.isOpened()
+
+    def read(self, image=None):
+        """(ret, frame); like cv2.VideoCapture.read, fills `image` when given one of the right shape."""
+        i = self.index + 1
+        if i >= len(self.session):
+            if not self.loop or len(self.session) == 0:
+                return False, None
+            i = 0
+        if self.realtime:
+            now = time.perf_counter()
+            if self._next_time is not None and now < self._next_time:
+                time.sleep(self._next_time - now)
+            self._next_time = max(now, self._next_time or now) + 1.0 / self.session.fps
+        self.index = i
+        frame = self.session.frame(i)
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            return True, image
+        return True, np.array(frame)
+
+    def landmarks(self):
+        """Landmarks of the frame last returned by read()."""
+        return self.session.landmarks(self.index, self.session.frame_shape)
+
+    def release(self):
+        self.index = -1
+
+    def describe(self):
+        h, w = self.session.frame_shape[:2] if self.session.frame_shape else (0, 0)
+        return {"source": self.session.path, "width": w, "height": h, "fps": self.session.fps}
+
+
+class ReplayModel:
+    """
+    Model stand-in: process(rgb) returns the recorded landmarks of the frame
+    the paired capture returned last, without looking at the pixels.
+
+    Args:
+        capture (ReplayCapture): The capture whose frames are being processed.
+    """
+
+    def __init__(self, capture):
+        self.capture = capture
+
+    def process(self, rgb):
+        return self.capture.landmarks()
+
+    def close(self):
+        pass
@@ -0,0 +1,191 @@
+"""
+Headless offline rendering: pigify recorded footage in bulk.
+
+    python -m src.render in.mp4 out.mp4 --level 4 --workers 8
+
+The video is split into keyframe-aligned chunks (keyframes come from
+ffprobe when it is installed, otherwise chunks are evenly sized). Chunks
+are rendered in a process pool with one MediaPipe instance per worker and
+stitched back in order.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from multiprocessing import Pool
+from types import SimpleNamespace
+
+import cv2
+
+# Per-worker state, set up once by _init_worker
+_worker = {}
+
+
+def probe(path):
+    """(frame_count, fps, (width, height)) of a video."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {path}")
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    cap.release()
+    return count, fps, size
+
+
+def keyframe_indices(path, fps):
+    """Frame indices of the video's keyframes via ffprobe, or None if unavailable."""
+    if shutil.which("ffprobe") is None:
+        return None
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey",
+           "-show_entries", "frame=pts_time", "-of", "csv=p=0", path]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    times = [float(t) for t in out.split() if t.strip() not in ("", "N/A")]
+    return sorted({int(round(t * fps)) for t in times})
+
+
+def plan_chunks(frame_count, chunk_frames, keyframes=None):
+    """
+    Split [0, frame_count) into (start, end) ranges of about chunk_frames,
+    starting each chunk on a keyframe when keyframes are known.
+
+    Containers often report an approximate frame count (or none at all), so
+    the last chunk's end is None: it reads until the end of the file. With
+    no count, the whole video is that one open-ended chunk.
+    """
+    if frame_count <= 0:
+        return [(0, None)]
+    if keyframes:
+        bounds, last = [0], 0
+        for k in keyframes:
+            if k - last >= chunk_frames and k < frame_count:
+                bounds.append(k)
+                last = k
+    else:
+        bounds = list(range(0, frame_count, chunk_frames)) or [0]
+    bounds.append(frame_count)
+    chunks = [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+    chunks[-1] = (chunks[-1][0], None)
+    return chunks
+
+
+def _init_worker(level, mirror):
+    # Heavy imports and the model live in each worker process
+    from src.filters.manager import apply_filters
+    from src.vision.planner import InferencePlanner
+
+    _worker["apply_filters"] = apply_filters
+    _worker["model"] = InferencePlanner(SimpleNamespace(level=level), lookahead=0)
+    _worker["level"] = level
+    _worker["mirror"] = mirror
+
+
+def _render_chunk(job):
+    index, path, start, end, out_path, fps, size = job
+    apply_filters, model = _worker["apply_filters"], _worker["model"]
+
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+
+    t0 = time.perf_counter()
+    frames = 0
+    while end is None or frames < end - start:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if _worker["mirror"]:
+            frame = cv2.flip(frame, 1)
+        if model.needs_frame():
+            results = model.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        else:
+            results = model.process(None)
+        writer.write(apply_filters(frame, results, _worker["level"]))
+        frames += 1
+
+    cap.release()
+    writer.release()
+    return index, frames, time.perf_counter() - t0
+
+
+def stitch(chunk_paths, out_path, fps, size):
+    """Concatenate chunk files in order (stream copy with ffmpeg, else re-encode)."""
+    if not chunk_paths:
+        raise ValueError("No chunks to stitch")
+    if shutil.which("ffmpeg") is not None:
+        list_path = os.path.join(os.path.dirname(chunk_paths[0]), "chunks.txt")
+        with open(list_path, "w") as f:
+            f.writelines(f"file '{os.path.abspath(p)}'\n" for p in chunk_paths)
+        cmd = ["ffmpeg", "-v", "error", "-y", "-f", "concat", "-safe", "0",
+               "-i", list_path, "-c", "copy", out_path]
+        if subprocess.run(cmd).returncode == 0:
+            return
+
+    writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    for path in chunk_paths:
+        cap = cv2.VideoCapture(path)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            writer.write(frame)
+        cap.release()
+    writer.release()
+
+
+def render(in_path, out_path, level, workers=None, chunk_seconds=10.0, mirror=False):
+    """
+    Pigify a video file. Returns a stats dict (frames, seconds, fps, chunks).
+    """
+    workers = workers or os.cpu_count() or 1
+    frame_count, fps, size = probe(in_path)
+    chunk_frames = max(1, int(chunk_seconds * fps))
+    chunks = plan_chunks(frame_count, chunk_frames, keyframe_indices(in_path, fps))
+
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="oink_render_") as tmp:
+        jobs = [(i, in_path, start, end, os.path.join(tmp, f"chunk_{i:05d}.mp4"), fps, size)
+                for i, (start, end) in enumerate(chunks)]
+        with Pool(workers, initializer=_init_worker, initargs=(level, mirror)) as pool:
+            done = sorted(pool.imap_unordered(_render_chunk, jobs))
+        frames = sum(n for _, n, _ in done)
+        if not frames:
+            raise IOError(f"No frames could be read from {in_path}")
+        # An overestimated frame count leaves chunks past the end with nothing in them
+        stitch([jobs[i][4] for i, n, _ in done if n], out_path, fps, size)
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "frames": frames,
+        "chunks": len(chunks),
+        "workers": workers,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "worker_fps": frames / sum(t for _, _, t in done) if done else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pigify a recorded video without the GUI")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--level", type=int, default=4, help="pig level 0-5")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--chunk-seconds", type=float, default=10.0)
+    parser.add_argument("--mirror", action="store_true", help="flip frames like the webcam view")
+    args = parser.parse_args()
+
+    stats = render(args.input, args.output, args.level, args.workers,
+                   args.chunk_seconds, args.mirror)
+    print(f"Rendered {stats['frames']} frames in {stats['chunks']} chunks on "
+          f"{stats['workers']} workers: {stats['seconds']:.1f} s, {stats['fps']:.1f} fps "
+          f"({stats['worker_fps']:.1f} fps per worker)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Headless serving mode: run the pipeline without a window and stream it.
+
+    python -m src.serve [--port 8080] [--level 3] [--camera 0 | --replay <session>]
+                        [--size 1280x720] [--fps 30] [--fourcc MJPG]
+
+Open http://<host>:<port>/ on any screen on the LAN.
+"""
+import argparse
+import signal
+import sys
+
+from PyQt5.QtCore import QCoreApplication, QTimer
+
+from src.camera.capture import DEFAULT_FOURCC, parse_size
+from src.serve.stream import ENCODE_WORKERS, JPEG_QUALITY, FrameBroadcaster, StreamServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the pigified feed as MJPEG over HTTP")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--camera", default="0", help="camera index or a video file")
+    parser.add_argument("--size", help="camera frame size, e.g. 1280x720")
+    parser.add_argument("--fps", type=float, help="camera frame rate")
+    parser.add_argument("--fourcc", default=DEFAULT_FOURCC, help="camera pixel format (MJPG, YUYV)")
+    parser.add_argument("--replay", help="play a recorded session instead of the camera")
+    parser.add_argument("--level", type=int, default=0, help="pig level (0-5)")
+    parser.add_argument("--quality", type=int, default=JPEG_QUALITY, help="JPEG quality")
+    parser.add_argument("--max-width", type=int, help="downscale wider frames before encoding")
+    parser.add_argument("--workers", type=int, default=ENCODE_WORKERS, help="JPEG encoder threads")
+    parser.add_argument("--target-fps", type=float, help="run the quality governor")
+    parser.add_argument("--max-people", type=int, default=1, help="pigify up to this many people")
+    args = parser.parse_args()
+
+    # Signals between worker and state need an application object, not a window
+    app = QCoreApplication(sys.argv)
+    from src.camera.webcam import WebcamWorker
+    from src.state.pig_state import PigLevelState
+
+    state = PigLevelState()
+    state.level = args.level
+    broadcaster = FrameBroadcaster(args.quality, args.workers, args.max_width)
+    server = StreamServer(broadcaster, args.host, args.port)
+    width, height = parse_size(args.size)
+    camera_format = {"width": width, "height": height, "fps": args.fps, "fourcc": args.fourcc}
+    worker = WebcamWorker(args.camera, state, replay=args.replay, target_fps=args.target_fps,
+                          stream=broadcaster, max_people=args.max_people,
+                          camera_format=camera_format)
+
+    def shutdown(*_):
+        worker.stop()
+        server.stop()
+        app.quit()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    # Let the Python signal handlers run while Qt's event loop is in C++
+    tick = QTimer()
+    tick.timeout.connect(lambda: None)
+    tick.start(200)
+
+    worker.start()
+    server.start()
+    host, port = server.server_address[:2]
+    print(f"Streaming on http://{host}:{port}/ (Ctrl+C to stop)")
+    app.exec_()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+MJPEG streaming of the filtered feed to many viewers.
+
+    WebcamWorker --submit(frame)--> FrameBroadcaster --JPEG bytes--> one LatestSlot per client
+                                    (encode once, thread pool)        (newest frame wins)
+
+Each frame is JPEG-encoded once, on a small thread pool, and the same bytes
+object goes to every connected client. Every client has its own
+single-slot mailbox, so a slow viewer only drops frames for itself: it
+never blocks the render thread, the encoder or the other viewers. When all
+encoder threads are busy, submit() drops the frame instead of queueing it.
+With no viewers, a frame is still encoded every SNAPSHOT_INTERVAL seconds
+so /frame.jpg stays current for snapshot polling.
+
+StreamServer serves over HTTP:
+    /             a page showing the stream
+    /stream.mjpg  multipart/x-mixed-replace MJPEG stream
+    /frame.jpg    the latest frame
+    /stats        JSON counters
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+from src.camera.pipeline import LatestSlot
+from src.perf.buffers import FrameRing, scratch
+
+JPEG_QUALITY = 80
+ENCODE_WORKERS = 2
+SNAPSHOT_INTERVAL = 0.2  # seconds between encodes while nobody is streaming
+BOUNDARY = "oinkframe"
+
+PAGE = b"""<!doctype html>
+<html><head><title>Curse of Oink</title></head>
+<body style="margin:0;background:#000">
+<img src="/stream.mjpg" style="width:100vw;height:100vh;object-fit:contain">
+</body></html>
+"""
+
+
+class FrameBroadcaster:
+    """
+    Args:
+        quality (int): JPEG quality.
+        workers (int): Encoder threads (= frames that may be encoding at once).
+        max_width (int or None): Downscale wider frames (on the encoder thread) before encoding.
+    """
+
+    def __init__(self, quality=JPEG_QUALITY, workers=ENCODE_WORKERS, max_width=None):
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self.max_width = max_width
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jpeg")
+        # A frame stays in its buffer until encoded; at most `workers` are in flight
+        self.frames = FrameRing(workers + 1)
+        self._lock = threading.Lock()
+        self._clients = set()
+        self._listeners = []
+        self._in_flight = 0
+        self._seq = 0
+        self._published_seq = 0
+        self._snapshot_time = None  # submit time of the last idle snapshot
+        self.latest = None  # newest JPEG bytes
+        self.submitted = 0
+        self.encoded = 0
+        self.drops = 0
+        self.encode_ms = 0.0
+
+    # --- producer side (render thread)
+
+    def submit(self, frame):
+        """Queue a BGR frame for encoding; returns False when it was dropped (encoders busy)."""
+        t = time.monotonic()
+        if not self._clients and not self._listeners:
+            # Nobody streaming: only refresh the /frame.jpg snapshot now and then
+            if self._snapshot_time is not None and t - self._snapshot_time < SNAPSHOT_INTERVAL:
+                return False
+            self._snapshot_time = t
+        with self._lock:
+            if self._in_flight >= self.workers:
+                self.drops += 1
+                return False
+            self._in_flight += 1
+            self._seq += 1
+            seq = self._seq
+        self.submitted += 1
+        # The caller's buffer will be reused; encode from our own copy (scaled off this thread)
+        buf = self.frames.get("frame", frame.shape)
+        np.copyto(buf, frame)
+        self.pool.submit(self._encode, seq, t, buf)
+        return True
+
+    def _encode(self, seq, t, frame):
+        try:
+            t0 = time.perf_counter()
+            h, w = frame.shape[:2]
+            if self.max_width and w > self.max_width:
+                size = (self.max_width, round(h * self.max_width / w))
+                small = scratch().get("jpeg_input", (size[1], size[0], frame.shape[2]))
+                frame = cv2.resize(frame, size, dst=small, interpolation=cv2.INTER_AREA)
+            ok, jpeg = cv2.imencode(".jpg", frame, self.params)
+            ms = (time.perf_counter() - t0) * 1000
+            if not ok:
+                return
+            data = jpeg.tobytes()
+            with self._lock:
+                self.encoded += 1
+                self.encode_ms += ms
+                if seq < self._published_seq:
+                    return  # a newer frame finished first
+                self._published_seq = seq
+                self.latest = data
+                clients = list(self._clients)
+            for slot in clients:
+                slot.put(data)
+            for listener in self._listeners:
+                listener(data, t)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def add_listener(self, listener):
+        """Call listener(jpeg_bytes, submit_time) on the encoder thread for every published frame."""
+        self._listeners.append(listener)
+
+    # --- consumer side (one thread per client)
+
+    def subscribe(self, name="client"):
+        """A LatestSlot that receives every new JPEG (newest wins)."""
+        slot = LatestSlot(name)
+        with self._lock:
+            self._clients.add(slot)
+        return slot
+
+    def unsubscribe(self, slot):
+        with self._lock:
+            self._clients.discard(slot)
+        slot.close()
+
+    def stats(self):
+        with self._lock:
+            clients = [slot.stats() for slot in self._clients]
+        return {
+            "clients": len(clients),
+            "submitted": self.submitted,
+            "encoded": self.encoded,
+            "encoder_drops": self.drops,
+            "encode_ms_mean": self.encode_ms / self.encoded if self.encoded else 0.0,
+            "client_drops": sum(c["drops"] for c in clients),
+        }
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = list(self._clients), set()
+        for slot in clients:
+            slot.close()
+        self.pool.shutdown(wait=True)
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    server_version = "OinkStream/1"
+    broadcaster = None  # set per server class by StreamServer
+
+    def log_message(self, fmt, *args):
+        pass  # one line per request is too noisy with many viewers
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/":
+            self._send(200, "text/html", PAGE)
+        elif path == "/frame.jpg":
+            frame = self.broadcaster.latest
+            if frame is None:
+                self._send(503, "text/plain", b"no frame yet\n")
+            else:
+                self._send(200, "image/jpeg", frame)
+        elif path == "/stats":
+            self._send(200, "application/json", json.dumps(self.broadcaster.stats()).encode())
+        elif path == "/stream.mjpg":
+            self._stream()
+        else:
+            self._send(404, "text/plain", b"not found\n")
+
+    def _send(self, code, content_type, body):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        slot = self.broadcaster.subscribe(f"{self.client_address[0]}:{self.client_address[1]}")
+        try:
+            if self.broadcaster.latest is not None:
+                slot.put(self.broadcaster.latest)  # show something right away
+            while True:
+                frame = slot.get(timeout=1.0)
+                if frame is None:
+                    if slot.closed:
+                        break
+                    continue
+                self.wfile.write(
+                    f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(frame)}\r\n\r\n".encode()
+                )
+                self.wfile.write(frame)
+                self.wfile.write(b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # viewer went away
+        finally:
+            self.broadcaster.unsubscribe(slot)
+
+
+class StreamServer(ThreadingHTTPServer):
+    """
+    HTTP server for a FrameBroadcaster (one thread per connection).
+
+    Args:
+        broadcaster (FrameBroadcaster): Source of encoded frames.
+        host (str): Bind address ("0.0.0.0" for the LAN).
+        port (int): Port (0 = any free port, see server_address).
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, broadcaster, host="0.0.0.0", port=8080):
+        handler = type("StreamHandler", (_StreamHandler,), {"broadcaster": broadcaster})
+        super().__init__((host, port), handler)
+        self.broadcaster = broadcaster
+
+    def start(self):
+        """Serve on a background thread; returns the thread."""
+        thread = threading.Thread(target=self.serve_forever, name="stream-server", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.broadcaster.close()
@@ -0,0 +1,133 @@
+"""
+Staged startup: the window comes up first, everything heavy loads behind it.
+
+    stage 1 (main thread)   Qt, the main window and the barometer
+    stage 2 (Warmup thread) mediapipe / filter imports, sticker and mesh assets,
+                            model construction and one warm-up inference
+    stage 3 (main thread)   WebcamWorker is created with the warmed planner and started
+
+StartupTimer reports time to first window and to first filtered frame,
+measured from process start.
+"""
+import logging
+import time
+
+import numpy as np
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal
+
+# Taken as early as possible: src.app imports this module before anything heavy
+PROCESS_START = time.perf_counter()
+
+log = logging.getLogger(__name__)
+
+WARMUP_SHAPE = (480, 640, 3)
+
+
+class StartupTimer:
+    """Named startup milestones in seconds since process start."""
+
+    def __init__(self, start=PROCESS_START):
+        self.start = start
+        self.marks = {}
+
+    def mark(self, name):
+        if name in self.marks:
+            return
+        self.marks[name] = time.perf_counter() - self.start
+        print(f"Startup: {name} at {self.marks[name]:.2f} s")
+
+    def report(self):
+        return dict(self.marks)
+
+
+class Warmup(QThread):
+    """
+    Background stage 2. Emits `ready(planner)` with a warmed InferencePlanner
+    (a RemoteInference when `infer_process`) for `pig_state`, built with
+    `model_options`, or `failed(message)`.
+    """
+    ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(str)
+
+    def __init__(self, pig_state, timer=None, infer_process=False, model_options=None):
+        super().__init__()
+        self.pig_state = pig_state
+        self.infer_process = infer_process
+        self.model_options = model_options
+        self.timer = timer or StartupTimer()
+
+    def run(self):
+        try:
+            self.progress.emit("Loading filters…")
+            import src.camera.webcam  # noqa: F401  (mediapipe, cv2, every filter module)
+            from src.assets import mask_mesh, sticker, sticker_mips
+            from src.filters.manager import LEVEL_PLANS, apply_filters
+            from src.vision.landmarks import LandmarkFrame
+            from src.vision.planner import InferencePlanner
+            from src.vision.remote import RemoteInference
+            self.timer.mark("imports done")
+
+            # Decode / map every asset now rather than on the first frame that needs it
+            for png in ("pig_nose.png", "pig_ear_left.png", "pig_ear_right.png"):
+                sticker(png)
+            for png in ("pig_tail.png", "bacon_head.png", "pork_chop_left.png", "pork_chop_right.png"):
+                sticker_mips(png)
+            mask_mesh("pig_full.png", "pig_full_points.csv")
+            frame = np.zeros(WARMUP_SHAPE, dtype=np.uint8)
+            for level in LEVEL_PLANS:
+                apply_filters(frame, LandmarkFrame({}), level)
+            self.timer.mark("assets ready")
+
+            self.progress.emit("Waking up the pig detector…")
+            make = RemoteInference if self.infer_process else InferencePlanner
+            planner = make(self.pig_state, model_options=self.model_options)
+            planner.warm_up(frame)
+            self.timer.mark("model warm")
+            self.ready.emit(planner)
+        except Exception as e:
+            # Surfaced in the video area; re-raising out of QThread.run would abort the process
+            log.exception("Startup failed")
+            self.failed.emit(f"Startup failed: {e}")
+
+
+def staged_start(win, state, make_worker, infer_process=False, model_options=None):
+    """
+    Run stages 2 and 3 for a shown MainWindow.
+
+    Args:
+        win (MainWindow): Already shown.
+        state (PigLevelState): Shared pig level.
+        make_worker (callable): make_worker(planner) -> WebcamWorker (not started).
+        infer_process (bool): Warm up a RemoteInference instead of an InferencePlanner.
+        model_options (dict or None): Model options for the planner (see InferencePlanner).
+
+    Returns:
+        (Warmup, StartupTimer): Keep a reference to the thread until it finishes.
+    """
+    timer = StartupTimer()
+    # First event loop iteration after show(): the window is on screen
+    QTimer.singleShot(0, lambda: timer.mark("first window"))
+
+    warmup = Warmup(state, timer, infer_process, model_options)
+    warmup.progress.connect(win.set_status)
+    warmup.failed.connect(win.set_status)
+
+    def on_ready(planner):
+        if not win.isVisible():  # closed while warming up
+            planner.close()
+            return
+        worker = make_worker(planner)
+        win.set_status("Starting camera…")
+        win.set_webcam(worker)
+
+        def on_first_frame():
+            timer.mark("first filtered frame")
+            worker.frame_available.disconnect(on_first_frame)
+
+        worker.frame_available.connect(on_first_frame)
+        worker.start()
+
+    warmup.ready.connect(on_ready)
+    warmup.start()
+    return warmup, timer
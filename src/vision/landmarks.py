@@ -0,0 +1,160 @@
+"""
+Per-frame NumPy landmark snapshot shared by all filters.
+
+MediaPipe results are protobuf messages; reading `lm[idx].x` costs a Python
+attribute lookup per coordinate, and every filter used to repeat that walk.
+A LandmarkFrame converts each landmark set once per frame into a contiguous
+float32 array, and filters gather the points they need with one fancy-index.
+
+A LandmarkBatch holds one LandmarkFrame per person (multi-person mode);
+filters gather a landmark subset for every person at once.
+"""
+import numpy as np
+
+from src.vision.results import LANDMARK_SETS
+
+
+class LandmarkFrame:
+    """
+    Landmark arrays for one frame.
+
+    Args:
+        sets (dict): {set name: (N, 3 or 4) array of normalized x, y, z[, visibility]
+            or None}. Missing visibility defaults to 1.
+        image_shape (tuple or None): Frame shape; needed for pixel-space access.
+    """
+    __slots__ = ("xyz", "visibility", "image_shape", "_px")
+
+    def __init__(self, sets, image_shape=None):
+        self.xyz = {}
+        self.visibility = {}
+        for name in LANDMARK_SETS:
+            arr = sets.get(name)
+            if arr is None:
+                continue
+            arr = np.asarray(arr, dtype=np.float32)
+            self.xyz[name] = np.ascontiguousarray(arr[:, :3])
+            self.visibility[name] = (np.ascontiguousarray(arr[:, 3]) if arr.shape[1] > 3
+                                     else np.ones(len(arr), dtype=np.float32))
+        self.image_shape = image_shape
+        self._px = {}
+
+    @classmethod
+    def from_results(cls, results, image_shape=None):
+        """Snapshot a MediaPipe (or Holistic-shaped) results object."""
+        sets = {}
+        for name in LANDMARK_SETS:
+            landmark_list = getattr(results, name + "_landmarks", None)
+            if landmark_list is not None:
+                sets[name] = np.array(
+                    [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmark_list.landmark],
+                    dtype=np.float32
+                )
+        return cls(sets, image_shape)
+
+    @classmethod
+    def ensure(cls, results, image_shape):
+        """
+        Return results as a LandmarkFrame sized for image_shape (no copy when it
+        already is one). A LandmarkBatch gives its first person, so single-person
+        consumers (tracking, ROI crops, recording) keep working in multi-person mode.
+        """
+        if isinstance(results, cls):
+            return results.sized(image_shape)
+        if isinstance(results, LandmarkBatch):
+            return results.primary().sized(image_shape)
+        return cls.from_results(results, image_shape)
+
+    def sized(self, image_shape):
+        """This snapshot for a given frame shape (shares the landmark arrays)."""
+        if image_shape is None or (self.image_shape is not None
+                                   and self.image_shape[:2] == image_shape[:2]):
+            return self
+        frame = LandmarkFrame.__new__(LandmarkFrame)
+        frame.xyz = self.xyz
+        frame.visibility = self.visibility
+        frame.image_shape = image_shape
+        frame._px = {}
+        return frame
+
+    def has(self, name):
+        return name in self.xyz
+
+    def px(self, name):
+        """(N, 2) float32 pixel coordinates of a landmark set (computed once per frame)."""
+        px = self._px.get(name)
+        if px is None:
+            h, w = self.image_shape[:2]
+            px = self.xyz[name][:, :2] * np.array([w, h], dtype=np.float32)
+            self._px[name] = px
+        return px
+
+    def gather(self, name, indices):
+        """Pixel coordinates of selected landmarks, (len(indices), 2)."""
+        return self.px(name)[indices]
+
+    def arrays(self):
+        """{set name: (N, 4) x, y, z, visibility} for every present set."""
+        return {name: np.column_stack([self.xyz[name], self.visibility[name]])
+                for name in self.xyz}
+
+
+EMPTY_FRAME = LandmarkFrame({})
+
+
+class LandmarkBatch:
+    """
+    Landmarks of several people in one frame.
+
+    Args:
+        people (list[LandmarkFrame]): One snapshot per person, most prominent first.
+        image_shape (tuple or None): Frame shape; needed for pixel-space access.
+    """
+    __slots__ = ("people", "image_shape", "_px")
+
+    def __init__(self, people, image_shape=None):
+        self.people = [person.sized(image_shape) for person in people]
+        self.image_shape = image_shape
+        self._px = {}
+
+    @classmethod
+    def ensure(cls, results, image_shape):
+        """Return results (a batch, a LandmarkFrame or MediaPipe results) as a LandmarkBatch."""
+        if isinstance(results, cls):
+            return results.sized(image_shape)
+        return cls([LandmarkFrame.ensure(results, image_shape)], image_shape)
+
+    def sized(self, image_shape):
+        if image_shape is None or (self.image_shape is not None
+                                   and self.image_shape[:2] == image_shape[:2]):
+            return self
+        return LandmarkBatch(self.people, image_shape)
+
+    def primary(self):
+        return self.people[0] if self.people else EMPTY_FRAME
+
+    def has(self, name):
+        """True when anyone has the landmark set."""
+        return any(person.has(name) for person in self.people)
+
+    def with_set(self, name):
+        """The people that have a landmark set, in order."""
+        return [person for person in self.people if person.has(name)]
+
+    def gather(self, name, indices):
+        """
+        Pixel coordinates of selected landmarks for every person with the set,
+        (people, len(indices), 2), from one fancy-index over the stacked sets.
+        """
+        px = self._px.get(name)
+        if px is None:
+            people = self.with_set(name)
+            if not people:
+                return np.empty((0, len(indices), 2), dtype=np.float32)
+            h, w = self.image_shape[:2]
+            xy = np.stack([person.xyz[name][:, :2] for person in people])
+            px = self._px[name] = xy * np.array([w, h], dtype=np.float32)
+        return px[:, indices]
+
+    def __len__(self):
+        return len(self.people)
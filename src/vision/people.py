@@ -0,0 +1,157 @@
+"""
+Multi-person inference.
+
+Holistic and Pose track a single person. In multi-person mode the planner
+builds these models instead; each returns a LandmarkBatch:
+
+    MultiFaceModel    FaceMesh with max_num_faces
+    MultiPoseModel    the Tasks API PoseLandmarker with num_poses (needs the
+                      pose_landmarker .task model file, see POSE_TASK_PATH);
+                      without it, the single-person Pose model
+    PeopleModel       both, with each face attached to the pose whose nose is
+                      nearest, so one person carries both landmark sets
+
+The .task file is not shipped with the repo. Without it, pose stays
+single-person: faces (the face-sticker levels) are still tracked for
+everyone, but pose-based stickers follow one person only. A warning is
+logged when such a model is built.
+"""
+import logging
+import os
+import time
+
+import numpy as np
+
+from src.assets import asset_path
+from src.vision.landmarks import LandmarkBatch, LandmarkFrame
+
+# Tasks API pose model (not shipped; download pose_landmarker_lite/full.task here)
+POSE_TASK_PATH = os.environ.get("OINK_POSE_TASK", asset_path("assets", "models", "pose_landmarker.task"))
+
+log = logging.getLogger(__name__)
+
+POSE_NOSE, FACE_NOSE = 0, 1
+# A face belongs to a pose when its nose is within this fraction of the frame width
+MATCH_DISTANCE = 0.1
+
+
+def _landmark_array(landmarks):
+    return np.array([(lm.x, lm.y, lm.z, getattr(lm, "visibility", 1.0) or 0.0) for lm in landmarks],
+                    dtype=np.float32)
+
+
+class MultiFaceModel:
+    def __init__(self, max_people, refine_face=False):
+        import mediapipe as mp
+
+        self.model = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=max_people,
+            refine_landmarks=refine_face,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    def process(self, rgb):
+        faces = self.model.process(rgb).multi_face_landmarks or []
+        return LandmarkBatch([LandmarkFrame({"face": _landmark_array(face.landmark)}) for face in faces])
+
+    def close(self):
+        self.model.close()
+
+
+class MultiPoseModel:
+    """
+    Poses of up to max_people people; `multi` is False when the .task model
+    is missing and only one pose is tracked.
+    """
+
+    def __init__(self, max_people, model_complexity=1, task_path=POSE_TASK_PATH):
+        import mediapipe as mp
+
+        self.mp = mp
+        self.tasks = self.multi = os.path.exists(task_path)
+        if self.tasks:
+            vision = mp.tasks.vision
+            options = vision.PoseLandmarkerOptions(
+                base_options=mp.tasks.BaseOptions(model_asset_path=task_path),
+                running_mode=vision.RunningMode.VIDEO,
+                num_poses=max_people,
+                min_pose_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+            self.model = vision.PoseLandmarker.create_from_options(options)
+            self.t0 = time.monotonic()
+            self.last_ms = -1
+        else:
+            log.warning("Multi-person pose needs the PoseLandmarker model at %s "
+                        "(or OINK_POSE_TASK); pose-based stickers will follow one person",
+                        task_path)
+            self.model = mp.solutions.pose.Pose(
+                model_complexity=model_complexity,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+
+    def process(self, rgb):
+        if not self.tasks:
+            pose = self.model.process(rgb).pose_landmarks
+            return LandmarkBatch([LandmarkFrame({"pose": _landmark_array(pose.landmark)})] if pose else [])
+        # VIDEO mode wants strictly increasing timestamps
+        ms = max(int((time.monotonic() - self.t0) * 1000), self.last_ms + 1)
+        self.last_ms = ms
+        image = self.mp.Image(image_format=self.mp.ImageFormat.SRGB, data=rgb)
+        result = self.model.detect_for_video(image, ms)
+        return LandmarkBatch([LandmarkFrame({"pose": _landmark_array(pose)}) for pose in result.pose_landmarks])
+
+    def close(self):
+        self.model.close()
+
+
+def match_people(faces, poses, max_distance=MATCH_DISTANCE):
+    """
+    Merge face-only and pose-only snapshots into people: each face joins the
+    unclaimed pose with the nearest nose (greedy, closest pairs first).
+
+    Returns:
+        LandmarkBatch: Matched people first, then unmatched poses and faces.
+    """
+    face_list = faces.with_set("face")
+    pose_list = poses.with_set("pose")
+    pairs = []
+    if face_list and pose_list:
+        face_noses = np.array([f.xyz["face"][FACE_NOSE, :2] for f in face_list])
+        pose_noses = np.array([p.xyz["pose"][POSE_NOSE, :2] for p in pose_list])
+        dist = np.linalg.norm(face_noses[:, None] - pose_noses[None], axis=2)
+        for flat in np.argsort(dist, axis=None):
+            i, j = np.unravel_index(flat, dist.shape)
+            if dist[i, j] > max_distance:
+                break
+            if any(i == a or j == b for a, b in pairs):
+                continue
+            pairs.append((i, j))
+
+    people = [LandmarkFrame({"face": face_list[i].arrays()["face"], "pose": pose_list[j].arrays()["pose"]})
+              for i, j in pairs]
+    people += [p for j, p in enumerate(pose_list) if all(j != b for _, b in pairs)]
+    people += [f for i, f in enumerate(face_list) if all(i != a for a, _ in pairs)]
+    return LandmarkBatch(people)
+
+
+class PeopleModel:
+    """
+    Faces and poses of several people, merged per person (multi-person
+    stand-in for Holistic). Without the pose .task model only one person gets
+    a pose (see MultiPoseModel.multi); the faces are still everyone's.
+    """
+
+    def __init__(self, max_people, model_complexity=1, refine_face=False):
+        self.faces = MultiFaceModel(max_people, refine_face)
+        self.poses = MultiPoseModel(max_people, model_complexity)
+        self.multi = self.poses.multi
+
+    def process(self, rgb):
+        return match_people(self.faces.process(rgb), self.poses.process(rgb))
+
+    def close(self):
+        self.faces.close()
+        self.poses.close()
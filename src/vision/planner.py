@@ -0,0 +1,170 @@
+"""
+Level-aware inference planning.
+
+Filters declare the landmark sets they read (see filters.registry).
+For the current pig level the planner picks the cheapest MediaPipe model
+set that provides them, switches models when the level changes, and keeps
+the model for the upcoming level(s) built so switching does not stall.
+
+With model option max_people > 1 the models come from vision.people and
+results are LandmarkBatches with one entry per person.
+"""
+import mediapipe as mp
+
+from src.filters.manager import required_landmarks
+from src.vision.landmarks import LandmarkBatch
+from src.vision.people import MultiFaceModel, MultiPoseModel, PeopleModel
+from src.vision.results import Results, EMPTY_RESULTS
+
+HAND_SETS = frozenset({"left_hand", "right_hand"})
+
+# Model sets, cheapest first, with the landmark sets each one provides
+MODEL_SETS = [
+    ("none", frozenset()),
+    ("pose", frozenset({"pose"})),
+    ("face", frozenset({"face"})),
+    ("holistic", frozenset({"pose", "face"}) | HAND_SETS),
+]
+
+
+def choose_model(landmarks):
+    """Name of the cheapest model set that covers the required landmark sets."""
+    for name, provides in MODEL_SETS:
+        if landmarks <= provides:
+            return name
+    raise ValueError(f"No model provides landmark sets: {sorted(landmarks)}")
+
+
+# Model construction options (see InferencePlanner.set_model_options)
+DEFAULT_MODEL_OPTIONS = {"model_complexity": 1, "refine_face": False, "max_people": 1}
+
+
+def _pose_model(model_complexity=1, refine_face=False, max_people=1):
+    if max_people > 1:
+        return MultiPoseModel(max_people, model_complexity)
+    return mp.solutions.pose.Pose(
+        model_complexity=model_complexity,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+
+def _face_model(model_complexity=1, refine_face=False, max_people=1):
+    if max_people > 1:
+        return MultiFaceModel(max_people, refine_face)
+    return mp.solutions.face_mesh.FaceMesh(
+        max_num_faces=1,
+        refine_landmarks=refine_face,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+
+def _holistic_model(model_complexity=1, refine_face=False, max_people=1):
+    if max_people > 1:
+        return PeopleModel(max_people, model_complexity, refine_face)  # no hand landmarks
+    return mp.solutions.holistic.Holistic(
+        model_complexity=model_complexity,
+        refine_face_landmarks=refine_face,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+
+MODEL_FACTORIES = {
+    "pose": _pose_model,
+    "face": _face_model,
+    "holistic": _holistic_model,
+}
+
+
+def _adapt(name, raw):
+    """Put a single model's output in the Holistic shape the filters read."""
+    if name == "holistic" or isinstance(raw, LandmarkBatch):
+        return raw
+    if name == "pose":
+        return Results(pose_landmarks=raw.pose_landmarks)
+    if name == "face":
+        faces = raw.multi_face_landmarks
+        return Results(face_landmarks=faces[0] if faces else None)
+    return EMPTY_RESULTS
+
+
+class InferencePlanner:
+    """
+    Drop-in for a MediaPipe model: process(rgb) returns Holistic-shaped results,
+    running only what the current pig level needs.
+
+    Args:
+        pig_state: PigLevelState, read on every call.
+        lookahead (int): How many upcoming levels to keep warm.
+        max_level (int): Highest pig level.
+        model_options (dict or None): Overrides for DEFAULT_MODEL_OPTIONS.
+    """
+
+    def __init__(self, pig_state, lookahead=1, max_level=5, model_options=None):
+        self.pig_state = pig_state
+        self.lookahead = lookahead
+        self.max_level = max_level
+        self.model_options = {**DEFAULT_MODEL_OPTIONS, **(model_options or {})}
+        self._pending_options = None
+        self.models = {}
+        self.level = None
+        self.active = None
+
+    def set_model_options(self, **options):
+        """
+        Change model construction options (model_complexity, refine_face, max_people).
+        Safe to call from any thread: the models are rebuilt on the next process().
+        """
+        merged = {**self.model_options, **options}
+        if merged != self.model_options:
+            self._pending_options = merged
+
+    def model_for_level(self, level):
+        return choose_model(required_landmarks(level))
+
+    def needs_frame(self):
+        """False when the current level runs no model (callers can skip the RGB conversion)."""
+        return self.model_for_level(self.pig_state.level) != "none"
+
+    def process(self, rgb):
+        if self._pending_options is not None:
+            self.model_options, self._pending_options = self._pending_options, None
+            self.close()  # rebuilt below with the new options
+        level = self.pig_state.level
+        if level != self.level:
+            self._switch(level)
+        if self.active == "none":
+            return EMPTY_RESULTS
+        return _adapt(self.active, self.models[self.active].process(rgb))
+
+    def warm_up(self, rgb):
+        """
+        Build the models for the current level (and lookahead) and run each
+        once, so the first real frame does not pay for graph initialization.
+        """
+        self._switch(self.pig_state.level)
+        for model in self.models.values():
+            model.process(rgb)
+
+    def _switch(self, level):
+        name = self.model_for_level(level)
+        # Levels only go up, so warm the next `lookahead` levels and free the rest
+        upcoming = range(level, min(level + self.lookahead, self.max_level) + 1)
+        keep = {self.model_for_level(lvl) for lvl in upcoming} - {"none"}
+        for stale in set(self.models) - keep:
+            self.models.pop(stale).close()
+        for needed in keep - set(self.models):
+            self.models[needed] = MODEL_FACTORIES[needed](**self.model_options)
+        if name != self.active:
+            print(f"Inference model: {self.active} -> {name} (warm: {sorted(keep)})")
+        self.level = level
+        self.active = name
+
+    def close(self):
+        for model in self.models.values():
+            model.close()
+        self.models.clear()
+        self.level = None
+        self.active = None
@@ -0,0 +1,262 @@
+"""
+Inference in a separate process.
+
+MediaPipe's result marshalling and per-landmark Python work hold the GIL;
+running the models in a child process keeps them off the GUI's interpreter.
+Frames travel through a ring of slots in one multiprocessing.shared_memory
+block (only the slot index crosses the pipe), and landmarks come back as a
+packed float32 buffer, so neither frames nor results are pickled.
+
+RemoteInference is a drop-in for InferencePlanner. In WebcamWorker the
+inference stage thread waits on the child (without holding the GIL) while
+the compositing thread renders the previous frame, so inference of frame N
+overlaps compositing of frame N-1.
+"""
+import multiprocessing as mp
+import threading
+from collections import deque
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.vision.landmarks import LandmarkBatch, LandmarkFrame
+from src.vision.results import LANDMARK_SETS
+
+HEADER_INTS = 2 * len(LANDMARK_SETS)  # per person and set: present flag, landmark count
+
+
+def pack_landmarks(results):
+    """
+    LandmarkFrame or LandmarkBatch -> bytes: int32 (people, is_batch), an int32
+    header per person (present, count per set), then float32 (N, 4) rows.
+    """
+    batch = isinstance(results, LandmarkBatch)
+    people = results.people if batch else [results]
+    header = np.zeros(2 + HEADER_INTS * len(people), dtype=np.int32)
+    header[:2] = len(people), batch
+    rows = []
+    for p, person in enumerate(people):
+        arrays = person.arrays()
+        for i, name in enumerate(LANDMARK_SETS):
+            arr = arrays.get(name)
+            if arr is not None:
+                k = 2 + p * HEADER_INTS + 2 * i
+                header[k] = 1
+                header[k + 1] = len(arr)
+                rows.append(arr.astype(np.float32, copy=False))
+    body = np.concatenate(rows) if rows else np.empty((0, 4), dtype=np.float32)
+    return header.tobytes() + body.tobytes()
+
+
+def unpack_landmarks(data, image_shape=None):
+    """Inverse of pack_landmarks."""
+    n_people, batch = np.frombuffer(data, dtype=np.int32, count=2)
+    header = np.frombuffer(data, dtype=np.int32, count=2 + HEADER_INTS * n_people)[2:]
+    body = np.frombuffer(data, dtype=np.float32, offset=(2 + header.size) * 4).reshape(-1, 4)
+    people, offset = [], 0
+    for p in range(n_people):
+        sets = {}
+        for i, name in enumerate(LANDMARK_SETS):
+            k = p * HEADER_INTS + 2 * i
+            if header[k]:
+                count = int(header[k + 1])
+                sets[name] = body[offset:offset + count]
+                offset += count
+        people.append(LandmarkFrame(sets, image_shape))
+    if batch:
+        return LandmarkBatch(people, image_shape)
+    return people[0]
+
+
+def _serve(conn, lookahead, model_options):
+    """Child process: own an InferencePlanner and answer requests until told to stop."""
+    from src.vision.planner import InferencePlanner
+
+    state = SimpleNamespace(level=0)
+    planner = InferencePlanner(state, lookahead=lookahead, model_options=model_options)
+    shm, slot_bytes = None, 0
+    try:
+        while True:
+            msg = conn.recv()
+            cmd = msg[0]
+            if cmd == "stop":
+                break
+            if cmd == "attach":
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=msg[1])
+                slot_bytes = msg[2]
+                conn.send_bytes(b"")
+            elif cmd == "options":
+                planner.set_model_options(**msg[1])  # no reply: applies from the next frame on
+            elif cmd == "level":
+                state.level = msg[1]
+                planner.process(None)  # a level without a model: switch and warm the next one
+                conn.send_bytes(b"")
+            elif cmd in ("frame", "warm"):
+                _, slot, shape, level = msg
+                state.level = level
+                rgb = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+                if cmd == "warm":
+                    planner.warm_up(rgb)
+                    conn.send_bytes(b"")
+                else:
+                    results = planner.process(rgb)
+                    if not isinstance(results, LandmarkBatch):
+                        results = LandmarkFrame.ensure(results, None)
+                    conn.send_bytes(pack_landmarks(results))
+    finally:
+        planner.close()
+        if shm is not None:
+            shm.close()
+        conn.close()
+
+
+class RemoteInference:
+    """
+    Drop-in for InferencePlanner whose models run in a child process.
+
+    Args:
+        pig_state: PigLevelState, read on every call.
+        lookahead (int): Passed to the child's InferencePlanner.
+        model_options (dict or None): Passed to the child's InferencePlanner.
+        slots (int): Shared-memory frame slots (frames that may be in flight).
+    """
+
+    def __init__(self, pig_state, lookahead=1, model_options=None, slots=2):
+        from src.filters.manager import required_landmarks
+        from src.vision.planner import choose_model
+
+        self.pig_state = pig_state
+        self.slots = slots
+        self._model_for_level = lambda level: choose_model(required_landmarks(level))
+        ctx = mp.get_context("spawn")  # no fork: the parent runs Qt and camera threads
+        self.conn, child_conn = ctx.Pipe()
+        self.process_handle = ctx.Process(target=_serve, args=(child_conn, lookahead, model_options),
+                                          name="inference", daemon=True)
+        self.process_handle.start()
+        child_conn.close()
+
+        self.shm = None
+        self.slot_bytes = 0
+        self.next_slot = 0
+        self.pending = deque()  # image shapes of submitted frames, oldest first
+        self._staged = None
+        self._options = {}      # set_model_options() not yet sent to the child
+        self._level_sent = None  # pig level of the last message to the child
+        self._options_lock = threading.Lock()
+
+    # --- shared memory
+
+    def _ensure_capacity(self, nbytes):
+        if self.shm is not None and nbytes <= self.slot_bytes:
+            return
+        if self.pending:
+            raise RuntimeError("Cannot resize frame slots with frames in flight")
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+        self.slot_bytes = nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes * self.slots)
+        self._request(("attach", self.shm.name, nbytes))
+
+    def _slot_view(self, slot, shape):
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def input_buffer(self, shape):
+        """
+        The slot the next submit() will use, for writing the RGB frame straight
+        into shared memory (e.g. cvtColor(..., dst=input_buffer(shape))).
+        """
+        self._ensure_capacity(int(np.prod(shape)))
+        self._staged = self._slot_view(self.next_slot, shape)
+        return self._staged
+
+    # --- requests
+
+    def _request(self, msg):
+        self._send_options()
+        self.conn.send(msg)
+        return self._reply()
+
+    def _send_options(self):
+        # Only the inference thread talks on the pipe; options set from other
+        # threads ride along ahead of its next message
+        with self._options_lock:
+            options, self._options = self._options, {}
+        if options:
+            self.conn.send(("options", options))
+
+    def _reply(self):
+        try:
+            return self.conn.recv_bytes()
+        except EOFError:
+            code = self.process_handle.exitcode
+            raise RuntimeError(f"Inference process exited (code {code})") from None
+
+    def submit(self, rgb):
+        """Send a frame to the child without waiting for its landmarks (see collect)."""
+        if len(self.pending) >= self.slots:
+            raise RuntimeError("All frame slots are in flight; collect() first")
+        if rgb is not self._staged:
+            self._ensure_capacity(rgb.nbytes)
+            np.copyto(self._slot_view(self.next_slot, rgb.shape), rgb)
+        self._staged = None
+        self._send_options()
+        self._level_sent = self.pig_state.level
+        self.conn.send(("frame", self.next_slot, rgb.shape, self._level_sent))
+        self.pending.append(rgb.shape)
+        self.next_slot = (self.next_slot + 1) % self.slots
+
+    def collect(self):
+        """Landmarks (a LandmarkFrame) of the oldest submitted frame; blocks until ready."""
+        self.pending.popleft()
+        return unpack_landmarks(self._reply())
+
+    def process(self, rgb):
+        if rgb is None:
+            # Nothing to infer at this level; let the child switch / warm models
+            # (once per level change, not a round trip per frame)
+            level = self.pig_state.level
+            if level != self._level_sent:
+                self._request(("level", level))
+                self._level_sent = level
+            return LandmarkFrame({})
+        self.submit(rgb)
+        return self.collect()
+
+    def needs_frame(self):
+        return self._model_for_level(self.pig_state.level) != "none"
+
+    def warm_up(self, rgb):
+        self._ensure_capacity(rgb.nbytes)
+        np.copyto(self._slot_view(self.next_slot, rgb.shape), rgb)
+        self._level_sent = self.pig_state.level
+        self._request(("warm", self.next_slot, rgb.shape, self._level_sent))
+
+    def set_model_options(self, **options):
+        """
+        Change the child's model options. Safe to call from any thread: they
+        are sent ahead of the next frame, like InferencePlanner rebuilding
+        its models on the next process().
+        """
+        with self._options_lock:
+            self._options.update(options)
+
+    def close(self):
+        if self.process_handle.is_alive():
+            try:
+                while self.pending:
+                    self.collect()
+                self.conn.send(("stop",))
+            except (BrokenPipeError, RuntimeError, OSError):
+                pass
+            self.process_handle.join(timeout=5)
+            if self.process_handle.is_alive():
+                self.process_handle.terminate()
+        self.conn.close()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
@@ -0,0 +1,22 @@
+# Landmark sets a Holistic-shaped result can carry, and their attribute names
+LANDMARK_SETS = ("pose", "face", "left_hand", "right_hand")
+
+
+class Results:
+    """
+    Holistic-shaped landmark results.
+
+    Single-model outputs (Pose, FaceMesh) are handed to the filters in this
+    shape: `results.<set>_landmarks` is a MediaPipe landmark list or None.
+    """
+    __slots__ = ("pose_landmarks", "face_landmarks", "left_hand_landmarks", "right_hand_landmarks")
+
+    def __init__(self, pose_landmarks=None, face_landmarks=None,
+                 left_hand_landmarks=None, right_hand_landmarks=None):
+        self.pose_landmarks = pose_landmarks
+        self.face_landmarks = face_landmarks
+        self.left_hand_landmarks = left_hand_landmarks
+        self.right_hand_landmarks = right_hand_landmarks
+
+
+EMPTY_RESULTS = Results()
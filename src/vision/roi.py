@@ -0,0 +1,168 @@
+"""
+Reduced-resolution / ROI inference.
+
+The model sees a downscaled frame, or a crop around the last known person
+(union of all landmark sets) plus a margin, and the normalized landmarks
+are mapped back to full-frame coordinates. Compositing still happens on
+the full-resolution frame.
+
+Compare against the full-frame path on a recorded video:
+    python -m src.vision.roi clip.mp4 --scale 0.5 --crop
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from src.perf.buffers import scratch
+from src.vision.landmarks import LandmarkFrame
+
+
+class RoiInference:
+    """
+    Wraps a model (process(rgb) -> Holistic-shaped results or LandmarkFrame)
+    and returns a LandmarkFrame in full-frame coordinates.
+
+    Args:
+        model: The wrapped model.
+        scale (float): Resize factor applied to the (cropped) input before inference.
+        crop (bool): Crop around the last detected person instead of using the full frame.
+        margin (float): Crop margin, as a fraction of the person box size on each side.
+        min_size (float): Smallest crop, as a fraction of the frame's width/height.
+    """
+
+    def __init__(self, model, scale=1.0, crop=False, margin=0.25, min_size=0.3):
+        self.model = model
+        self.scale = scale
+        self.crop = crop
+        self.margin = margin
+        self.min_size = min_size
+        self.box = None  # (x0, y0, x1, y1) pixels of the next crop, None = full frame
+
+    def process(self, rgb):
+        H, W = rgb.shape[:2]
+        x0, y0, x1, y1 = self.box if (self.crop and self.box) else (0, 0, W, H)
+        view = rgb[y0:y1, x0:x1]
+        cw, ch = x1 - x0, y1 - y0
+
+        if self.scale != 1.0:
+            size = (max(1, round(cw * self.scale)), max(1, round(ch * self.scale)))
+            view = cv2.resize(view, size, dst=scratch().get("roi_input", (size[1], size[0], 3)),
+                              interpolation=cv2.INTER_AREA)
+        elif (cw, ch) != (W, H):
+            view = np.ascontiguousarray(view)
+
+        results = self.model.process(view)
+        if (cw, ch) == (W, H) and not self.crop:
+            return results  # normalized coords are already full-frame
+
+        arrays = LandmarkFrame.ensure(results, None).arrays()
+        for arr in arrays.values():
+            arr[:, 0] = (arr[:, 0] * cw + x0) / W
+            arr[:, 1] = (arr[:, 1] * ch + y0) / H
+            arr[:, 2] *= cw / W  # z shares the x scale
+        self.box = self._next_box(arrays, W, H)
+        return LandmarkFrame(arrays)
+
+    def _next_box(self, arrays, W, H):
+        pts = [arr[:, :2] for arr in arrays.values()]
+        if not pts:
+            return None  # lost the person: search the full frame again
+        pts = np.vstack(pts) * (W, H)
+        (lx, ly), (hx, hy) = pts.min(axis=0), pts.max(axis=0)
+        bw = max(hx - lx, self.min_size * W)
+        bh = max(hy - ly, self.min_size * H)
+        cx, cy = (lx + hx) / 2, (ly + hy) / 2
+        half_w, half_h = bw * (0.5 + self.margin), bh * (0.5 + self.margin)
+        x0, x1 = max(0, int(cx - half_w)), min(W, int(cx + half_w))
+        y0, y1 = max(0, int(cy - half_h)), min(H, int(cy + half_h))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1, y1
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def compare_with_full_frame(make_model, frames, **roi_kwargs):
+    """
+    Run a full-frame model and a RoiInference-wrapped one side by side.
+
+    Args:
+        make_model (callable): Returns a fresh model instance (called twice).
+        frames (iterable): RGB frames.
+        roi_kwargs: Passed to RoiInference.
+
+    Returns:
+        dict: Median latency of both paths (ms) and, per landmark set, the
+        mean / max landmark error of the ROI path in full-frame pixels.
+    """
+    full_model = make_model()
+    roi_model = RoiInference(make_model(), **roi_kwargs)
+    full_ms, roi_ms, errors = [], [], {}
+
+    for rgb in frames:
+        H, W = rgb.shape[:2]
+        t0 = time.perf_counter()
+        ref = LandmarkFrame.ensure(full_model.process(rgb), None).arrays()
+        t1 = time.perf_counter()
+        est = LandmarkFrame.ensure(roi_model.process(rgb), None).arrays()
+        t2 = time.perf_counter()
+        full_ms.append((t1 - t0) * 1000)
+        roi_ms.append((t2 - t1) * 1000)
+
+        for name, a in ref.items():
+            b = est.get(name)
+            if b is not None and a.shape == b.shape:
+                err = np.hypot((a[:, 0] - b[:, 0]) * W, (a[:, 1] - b[:, 1]) * H)
+                errors.setdefault(name, []).append(err)
+
+    full_model.close()
+    roi_model.close()
+    report = {
+        "frames": len(full_ms),
+        "full_ms": float(np.median(full_ms)) if full_ms else None,
+        "roi_ms": float(np.median(roi_ms)) if roi_ms else None,
+    }
+    for name, errs in errors.items():
+        errs = np.concatenate(errs)
+        report[name + "_err_px"] = {"mean": float(errs.mean()), "max": float(errs.max())}
+    return report
+
+
+def _video_frames(path, limit):
+    cap = cv2.VideoCapture(path)
+    n = 0
+    while n < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        n += 1
+        yield cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+    cap.release()
+
+
+def main():
+    import mediapipe as mp
+
+    parser = argparse.ArgumentParser(description="ROI/downscaled vs full-frame inference")
+    parser.add_argument("video")
+    parser.add_argument("--scale", type=float, default=0.5)
+    parser.add_argument("--crop", action="store_true")
+    parser.add_argument("--margin", type=float, default=0.25)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    report = compare_with_full_frame(
+        lambda: mp.solutions.holistic.Holistic(min_detection_confidence=0.5,
+                                               min_tracking_confidence=0.5),
+        _video_frames(args.video, args.frames),
+        scale=args.scale, crop=args.crop, margin=args.margin,
+    )
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Decimated inference: run the model on keyframes only and predict in between.
+
+Landmarks are tracked with an alpha-beta filter (the steady-state form of a
+constant-velocity Kalman filter). On a keyframe the measurement corrects the
+predicted position and velocity; between keyframes positions are
+extrapolated along the velocity. A cheap frame-difference score forces a
+keyframe early when the scene moves a lot.
+"""
+import cv2
+import numpy as np
+
+from src.vision.landmarks import LandmarkFrame
+from src.vision.results import LANDMARK_SETS
+
+
+class LandmarkTracker:
+    """
+    Wraps a model (anything with process(rgb) -> Holistic-shaped results) and
+    returns a LandmarkFrame on every frame.
+
+    Args:
+        model: The wrapped model.
+        every_n (int): Run the model at least every N frames (1 = every frame).
+        motion_threshold (float or None): Mean absolute grey-level difference
+            (0..255, on a thumbnail) since the last keyframe that forces an
+            early keyframe. None disables the check.
+        alpha (float): Position gain of the filter (1 = trust measurements fully).
+        beta (float): Velocity gain of the filter.
+    """
+
+    THUMB_SIZE = (64, 36)
+
+    def __init__(self, model, every_n=3, motion_threshold=8.0, alpha=0.7, beta=0.3):
+        self.model = model
+        self.every_n = max(1, int(every_n))
+        self.motion_threshold = motion_threshold
+        self.alpha = alpha
+        self.beta = beta
+
+        self.pos = {}   # set name -> (N, 4) filtered x, y, z, visibility at last keyframe
+        self.vel = {}   # set name -> (N, 3) per-frame velocity
+        self.since_key = 0
+        self.key_thumb = None
+        self.keyframes = 0
+        self.predicted = 0
+
+    def _thumb(self, rgb):
+        small = cv2.resize(rgb, self.THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+
+    def _is_keyframe(self, thumb):
+        if self.keyframes == 0 or self.since_key + 1 >= self.every_n:
+            return True
+        if thumb is not None and self.key_thumb is not None:
+            motion = cv2.absdiff(thumb, self.key_thumb).mean()
+            return motion > self.motion_threshold
+        return False
+
+    def process(self, rgb):
+        thumb = self._thumb(rgb) if self.motion_threshold is not None else None
+        if self._is_keyframe(thumb):
+            return self._keyframe(rgb, thumb)
+        return self._predict()
+
+    def _keyframe(self, rgb, thumb):
+        measured = LandmarkFrame.ensure(self.model.process(rgb), None).arrays()
+        dt = self.since_key + 1
+
+        for name in LANDMARK_SETS:
+            meas = measured.get(name)
+            prev = self.pos.get(name)
+            if meas is None or prev is None or prev.shape != meas.shape or self.every_n == 1:
+                # (Re)acquired or lost, or no frames to predict (every_n == 1):
+                # take the measurement as is, at rest
+                if meas is None:
+                    self.pos.pop(name, None)
+                    self.vel.pop(name, None)
+                else:
+                    self.pos[name] = meas
+                    self.vel[name] = np.zeros((len(meas), 3), dtype=np.float32)
+                continue
+
+            predicted = prev[:, :3] + self.vel[name] * dt
+            residual = meas[:, :3] - predicted
+            pos = meas.copy()
+            pos[:, :3] = predicted + self.alpha * residual
+            self.vel[name] = self.vel[name] + (self.beta / dt) * residual
+            self.pos[name] = pos
+
+        self.since_key = 0
+        self.key_thumb = thumb
+        self.keyframes += 1
+        return LandmarkFrame(self.pos)
+
+    def _predict(self):
+        self.since_key += 1
+        self.predicted += 1
+        arrays = {}
+        for name, pos in self.pos.items():
+            out = pos.copy()
+            out[:, :3] += self.vel[name] * self.since_key
+            arrays[name] = out
+        return LandmarkFrame(arrays)
+
+    def __getattr__(self, name):
+        # Pass anything else (needs_frame, close, ...) through to the wrapped model
+        return getattr(self.model, name)